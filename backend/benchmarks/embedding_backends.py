@@ -0,0 +1,126 @@
+"""
+Accuracy vs throughput of the embedding backends (EMBEDDINGS_BACKEND) on the sample contracts.
+
+Parses src/data_samples/{english,arabic}/*.docx, chunks them the way indexing does, and
+embeds every chunk with each backend. The torch backend is the reference:
+  - chunks/s:  encode throughput after one warm-up batch (load time reported separately)
+  - cosine:    mean / min cosine between a chunk's vector and its torch vector
+  - recall@k:  overlap of each document's top-k chunks for the analysis topics
+               (analyze.TOPICS) with torch's top-k, i.e. whether retrieval changes
+
+Usage (from backend/):
+  python -m benchmarks.embedding_backends
+  python -m benchmarks.embedding_backends --backends torch int8 --batch-size 64 --top-k 5
+"""
+
+import argparse
+import glob
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.config.settings import get_settings
+from src.services.analyze import TOPICS
+from src.services.chunking import RAG_WINDOW, document_cache
+from src.services.embedding_backends import BACKENDS, load_backend
+from src.services.ocr_service import OCRService
+
+settings = get_settings()
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "data_samples")
+
+
+def _documents(language: str) -> Dict[str, List[str]]:
+    docs: Dict[str, List[str]] = {}
+    for path in sorted(glob.glob(os.path.join(SAMPLES, language, "*.docx"))):
+        text = OCRService.parse_docx(path)["text"]
+        chunks = document_cache.get(text).chunks(*RAG_WINDOW, respect_sections=True)
+        if chunks:
+            docs[os.path.basename(path)] = [c["text"] for c in chunks]
+    return docs
+
+
+def _top_k(queries: np.ndarray, chunks: np.ndarray, k: int) -> List[set]:
+    scores = queries @ chunks.T
+    return [set(np.argsort(-row, kind="stable")[:k].tolist()) for row in scores]
+
+
+def _run(backend, corpus: Dict[str, Dict[str, List[str]]], batch_size: int) -> Dict[str, dict]:
+    backend.encode(["warm up"] * batch_size, batch_size=batch_size)
+    out: Dict[str, dict] = {}
+    for language, docs in corpus.items():
+        texts = [t for chunks in docs.values() for t in chunks]
+        t0 = time.perf_counter()
+        vecs = np.asarray(backend.encode(texts, batch_size=batch_size), dtype=np.float32)
+        elapsed = time.perf_counter() - t0
+        out[language] = {
+            "chunks": vecs,
+            "queries": np.asarray(backend.encode(TOPICS, batch_size=batch_size), dtype=np.float32),
+            "chunks_per_s": len(texts) / elapsed,
+        }
+    return out
+
+
+def _compare(result: dict, reference: dict, docs: Dict[str, List[str]], k: int) -> Dict[str, float]:
+    cos = np.sum(result["chunks"] * reference["chunks"], axis=1)
+    recalls: List[float] = []
+    pos = 0
+    for chunks in docs.values():
+        n = len(chunks)
+        kk = min(k, n)
+        mine = _top_k(result["queries"], result["chunks"][pos:pos + n], kk)
+        ref = _top_k(reference["queries"], reference["chunks"][pos:pos + n], kk)
+        recalls.extend(len(a & b) / kk for a, b in zip(mine, ref))
+        pos += n
+    return {"cos_mean": float(cos.mean()), "cos_min": float(cos.min()), "recall": float(np.mean(recalls))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--model", default=settings.embeddings_model)
+    parser.add_argument("--batch-size", type=int, default=settings.embed_batch_max_size)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = {language: _documents(language) for language in ("english", "arabic")}
+    corpus = {language: docs for language, docs in corpus.items() if docs}
+    if not corpus:
+        raise SystemExit(f"No sample documents under {SAMPLES}")
+    for language, docs in corpus.items():
+        print(f"{language}: {len(docs)} documents, {sum(len(c) for c in docs.values())} chunks")
+
+    # torch is the accuracy reference, so it always runs first
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results: Dict[str, Dict[str, dict]] = {}
+    print(f"\n{'backend':<7} {'language':<8} {'load s':>7} {'chunks/s':>9} {'cos mean':>9} {'cos min':>8} {f'recall@{args.top_k}':>9}")
+    for name in backends:
+        t0 = time.perf_counter()
+        try:
+            backend = load_backend(name, args.model)
+        except Exception as e:
+            print(f"{name:<7} unavailable: {type(e).__name__}: {e}")
+            continue
+        load_s = time.perf_counter() - t0
+        results[name] = _run(backend, corpus, args.batch_size)
+        for language, r in results[name].items():
+            if "torch" in results:
+                acc = _compare(r, results["torch"][language], corpus[language], args.top_k)
+                scores = f"{acc['cos_mean']:>9.4f} {acc['cos_min']:>8.4f} {acc['recall']:>9.3f}"
+            else:
+                scores = f"{'-':>9} {'-':>8} {'-':>9}"
+            print(f"{name:<7} {language:<8} {load_s:>7.2f} {r['chunks_per_s']:>9.1f} {scores}")
+        del backend
+
+    if "torch" in results:
+        base = {language: r["chunks_per_s"] for language, r in results["torch"].items()}
+        for name, by_language in results.items():
+            if name != "torch":
+                speedup = np.mean([r["chunks_per_s"] / base[language] for language, r in by_language.items()])
+                print(f"{name}: {speedup:.2f}x torch throughput")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput/latency benchmark for embedding micro-batching under mixed load.
+
+Simulates concurrent chat queries (one short text each) alongside uploads (a document's
+chunks each) against the shared embedding model:
+  - direct:  one model.encode per request on the worker pools (previous behaviour)
+  - batched: the same requests through query_batcher / document_batcher
+
+Usage (from backend/):
+  python -m benchmarks.embedding_batching
+  python -m benchmarks.embedding_batching --queries 500 --uploads 4 --chunks 200 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from src.services.embedding_batcher import document_batcher, query_batcher
+from src.services.executors import embed_pool, query_pool, shutdown_executors
+from src.services.model_registry import model_registry
+
+
+def _queries(n: int) -> List[str]:
+    topics = ["termination", "liability cap", "governing law", "payment terms", "confidentiality",
+              "indemnity", "force majeure", "renewal", "penalties", "data protection"]
+    return [f"query: what does the contract say about {topics[i % len(topics)]} ({i})?" for i in range(n)]
+
+
+def _document(n_chunks: int, seed: int) -> List[str]:
+    return [f"passage: clause {seed}.{i} the supplier shall deliver the services in accordance with "
+            f"schedule {i % 7} and the client shall pay within {30 + i % 30} days" for i in range(n_chunks)]
+
+
+async def _scenario(mode: str, queries: List[str], docs: List[List[str]], concurrency: int) -> dict:
+    model = await model_registry.load_embedding_model()
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def query(q: str) -> None:
+        async with gate:
+            t0 = time.perf_counter()
+            if mode == "batched":
+                await query_batcher.encode([q])
+            else:
+                await query_pool.run(model.encode, [q], normalize_embeddings=True, convert_to_numpy=True)
+            latencies.append(time.perf_counter() - t0)
+
+    async def upload(chunks: List[str]) -> None:
+        if mode == "batched":
+            await document_batcher.encode(chunks)
+        else:
+            await embed_pool.run(model.encode, chunks, normalize_embeddings=True, convert_to_numpy=True)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[query(q) for q in queries], *[upload(d) for d in docs])
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    texts = len(queries) + sum(len(d) for d in docs)
+    return {
+        "texts_per_s": texts / elapsed,
+        "query_p50_ms": 1000 * statistics.median(latencies),
+        "query_p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "elapsed_s": elapsed,
+    }
+
+
+async def _main(args) -> None:
+    if await model_registry.load_embedding_model() is None:
+        raise SystemExit(f"Embedding model unavailable: {model_registry.last_error}")
+    await model_registry.warm_up()
+    queries = _queries(args.queries)
+    docs = [_document(args.chunks, i) for i in range(args.uploads)]
+
+    print(f"{args.queries} queries (concurrency {args.concurrency}) + {args.uploads} uploads x {args.chunks} chunks")
+    print(f"{'mode':<8} {'texts/s':>9} {'q p50 ms':>9} {'q p95 ms':>9} {'total s':>8}")
+    for mode in ("direct", "batched"):
+        r = await _scenario(mode, queries, docs, args.concurrency)
+        print(f"{mode:<8} {r['texts_per_s']:>9.1f} {r['query_p50_ms']:>9.1f} {r['query_p95_ms']:>9.1f} {r['elapsed_s']:>8.2f}")
+    print("batcher:", {b.name: b.stats() for b in (query_batcher, document_batcher)})
+    await query_batcher.close()
+    await document_batcher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--uploads", type=int, default=2)
+    parser.add_argument("--chunks", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=32, help="chat requests in flight")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args))
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
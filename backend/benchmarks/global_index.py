@@ -0,0 +1,131 @@
+"""
+Recall vs latency benchmark for portfolio-wide search.
+
+Compares, on synthetic clustered 384-d embeddings (~100 chunks per contract):
+  - legacy:   one IndexFlatIP per contract, search each, merge in Python
+  - flat:     GlobalIndex in exact mode (single IndexFlatIP)
+  - hnsw@ef:  GlobalIndex in HNSW mode at several efSearch values (recall@k vs flat)
+
+Usage (from backend/):
+  python -m benchmarks.global_index                     # 10k, 100k, 1M chunks
+  python -m benchmarks.global_index --sizes 10000 100000 --queries 200
+"""
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+import faiss
+
+from src.services.global_index import GlobalIndex
+
+DIM = 384
+CHUNKS_PER_CONTRACT = 100
+
+
+def _synthetic(n: int, rng: np.random.Generator, latent_dim: int = 24, n_clusters: int = 256) -> np.ndarray:
+    """
+    Clustered vectors with low intrinsic dimension (like real sentence embeddings),
+    projected to DIM with a fixed random basis and a little isotropic noise.
+    """
+    basis = np.random.default_rng(0).standard_normal((latent_dim, DIM)).astype(np.float32)
+    centers = np.random.default_rng(1).standard_normal((n_clusters, latent_dim)).astype(np.float32)
+    assign = rng.integers(0, n_clusters, size=n)
+    z = centers[assign] + 0.5 * rng.standard_normal((n, latent_dim)).astype(np.float32)
+    x = z @ basis + 0.5 * rng.standard_normal((n, DIM)).astype(np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+
+def _build(vecs: np.ndarray, hnsw_threshold: int, ef_search: int = 128) -> GlobalIndex:
+    g = GlobalIndex(hnsw_threshold=hnsw_threshold, ef_search=ef_search)
+    # Bulk-load as flat, then convert once (what a restart with many contracts does)
+    g.hnsw_threshold = 1 << 62
+    for c, start in enumerate(range(0, len(vecs), CHUNKS_PER_CONTRACT)):
+        g.add_contract(f"c{c}", f"u{c % 50}", vecs[start:start + CHUNKS_PER_CONTRACT])
+    g.hnsw_threshold = hnsw_threshold
+    if g.ntotal >= hnsw_threshold:
+        g._rebuild(to_hnsw=True)
+    return g
+
+
+def _legacy_search(per_contract: List[faiss.IndexFlatIP], q: np.ndarray, k: int):
+    results = []
+    for cid, index in enumerate(per_contract):
+        D, I = index.search(q.reshape(1, -1), min(k, index.ntotal))
+        for pos, score in zip(I[0].tolist(), D[0].tolist()):
+            if pos >= 0:
+                results.append((cid, pos, float(score)))
+    results.sort(key=lambda t: t[2], reverse=True)
+    return results[:k]
+
+
+def _timed(fn, queries: np.ndarray):
+    out = []
+    t0 = time.perf_counter()
+    for q in queries:
+        out.append(fn(q))
+    ms = (time.perf_counter() - t0) * 1000 / len(queries)
+    return out, ms
+
+
+def _recall(truth, got) -> float:
+    hits = 0
+    total = 0
+    for t, g in zip(truth, got):
+        ts = {(c, p) for c, p, _ in t}
+        hits += len(ts & {(c, p) for c, p, _ in g})
+        total += len(ts)
+    return hits / max(1, total)
+
+
+def run(size: int, n_queries: int, k: int, ef_values: List[int], legacy: bool) -> None:
+    rng = np.random.default_rng(size)
+    vecs = _synthetic(size, rng)
+    queries = _synthetic(n_queries, rng)
+    print(f"\n== {size:,} chunks ({size // CHUNKS_PER_CONTRACT:,} contracts), {n_queries} queries, k={k} ==")
+
+    flat = _build(vecs, hnsw_threshold=1 << 62)
+    truth, ms = _timed(lambda q: flat.search(q, k), queries)
+    print(f"{'flat (exact)':<20} recall=1.000  {ms:8.2f} ms/query")
+
+    if legacy:
+        per_contract = []
+        for start in range(0, size, CHUNKS_PER_CONTRACT):
+            idx = faiss.IndexFlatIP(DIM)
+            idx.add(vecs[start:start + CHUNKS_PER_CONTRACT])
+            per_contract.append(idx)
+        lq = queries[: max(1, min(n_queries, 2_000_000 // size))]
+        _, ms = _timed(lambda q: _legacy_search(per_contract, q, k), lq)
+        print(f"{'legacy per-contract':<20} recall=1.000  {ms:8.2f} ms/query")
+        del per_contract
+
+    t0 = time.perf_counter()
+    hnsw = _build(vecs, hnsw_threshold=0)
+    print(f"{'hnsw build':<20} {time.perf_counter() - t0:8.1f} s")
+    for ef in ef_values:
+        hnsw.ef_search = ef
+        got, ms = _timed(lambda q: hnsw.search(q, k), queries)
+        print(f"{'hnsw ef=' + str(ef):<20} recall={_recall(truth, got):.3f}  {ms:8.2f} ms/query")
+
+    # Owner-filtered query (1 of 50 owners): exact subset path vs filtered HNSW
+    got, ms = _timed(lambda q: hnsw.search(q, k, owner_id="u7"), queries)
+    truth_owner, _ = _timed(lambda q: flat.search(q, k, owner_id="u7"), queries)
+    print(f"{'hnsw owner-filter':<20} recall={_recall(truth_owner, got):.3f}  {ms:8.2f} ms/query")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    ap.add_argument("--no-legacy", action="store_true", help="skip the per-contract loop baseline")
+    args = ap.parse_args()
+    for size in args.sizes:
+        run(size, args.queries, args.k, args.ef, legacy=not args.no_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Event-loop responsiveness under concurrent LLM calls, using the fake LLM backend.
+
+Fires N concurrent ChatService-style calls with a fixed simulated model latency
+and measures (a) wall time and (b) worst event-loop lag seen by a ticker task.
+With the async client the loop stays responsive and wall time ~ ceil(N / concurrency) * latency.
+
+Usage (from backend/):
+  python -m benchmarks.llm_concurrency --calls 32 --latency-ms 500 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.services.llm import FakeBackend, LLMClient
+
+
+async def _ticker(stop: asyncio.Event, interval: float, lags: list) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - t0 - interval)
+
+
+async def run(calls: int, latency: float, concurrency: int) -> None:
+    client = LLMClient(FakeBackend(latency=latency), max_concurrency=concurrency, timeout=latency * 10 + 1)
+    model = client.model("fake-model", {"response_mime_type": "application/json"})
+
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_ticker(stop, 0.01, lags))
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        model.generate_content(contents=[{"role": "user", "parts": [{"text": f"q{i}"}]}])
+        for i in range(calls)
+    ])
+    wall = time.perf_counter() - t0
+    stop.set()
+    await ticker
+
+    print(f"calls={calls} latency={latency * 1000:.0f}ms concurrency={concurrency}")
+    print(f"wall time      {wall:8.3f} s")
+    print(f"max loop lag   {max(lags) * 1000:8.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=32)
+    ap.add_argument("--latency-ms", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=8)
+    args = ap.parse_args()
+    asyncio.run(run(args.calls, args.latency_ms / 1000.0, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
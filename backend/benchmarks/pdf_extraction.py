@@ -0,0 +1,131 @@
+"""
+PDF text extraction benchmark: legacy per-page re-parse vs single pass vs parallel ranges.
+
+Generates text-only PDFs of 10/100/500 pages (no extra dependencies) and times:
+  - legacy:    pypdf page count + extract_text_to_fp(page_numbers=[i]) per page,
+               reopening the file each time (the previous OCRService behaviour)
+  - single:    OCRService.parse_pdf (one extract_pages pass)
+  - parallel:  page ranges parsed in a process pool, then assembled
+
+Usage (from backend/):
+  python -m benchmarks.pdf_extraction
+  python -m benchmarks.pdf_extraction --pages 10 100 --workers 4 --skip-legacy
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+
+from pdfminer.high_level import extract_text_to_fp
+from pdfminer.layout import LAParams
+from pypdf import PdfReader
+
+from src.services.ocr_service import OCRService, parse_pdf_page_range
+
+LINES_PER_PAGE = 45
+WORDS = (
+    "the supplier shall indemnify the customer against third party claims arising from "
+    "breach of confidentiality obligations limitation of liability termination for cause "
+    "governing law arbitration payment terms invoices within thirty days"
+).split()
+
+
+def write_pdf(path: str, pages: int) -> None:
+    """
+    Minimal multi-page PDF with Helvetica text lines.
+    """
+    objs = []
+
+    def add(body: bytes) -> int:
+        objs.append(body)
+        return len(objs)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = len(objs) + 1 + 2 * pages + 1  # reserved after page/content objects
+    kids = []
+    for p in range(pages):
+        lines = []
+        for i in range(LINES_PER_PAGE):
+            words = " ".join(WORDS[(p + i + j) % len(WORDS)] for j in range(12))
+            lines.append(f"BT /F1 10 Tf 50 {780 - i * 16} Td ({p + 1}.{i + 1} {words}) Tj ET")
+        stream = "\n".join(lines).encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+        ))
+    add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    assert len(objs) + 1 == pages_id
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), pages))
+    catalog = len(objs) - 1
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, catalog, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def legacy_extract(path: str) -> int:
+    with open(path, "rb") as f:
+        pages = len(PdfReader(f).pages)
+    page_texts = []
+    for i in range(pages):
+        buf = StringIO()
+        with open(path, "rb") as f2:
+            extract_text_to_fp(f2, buf, laparams=LAParams(), page_numbers=[i])
+        page_texts.append(buf.getvalue() or "")
+    norm_pages = [OCRService._preprocess_text(t) for t in page_texts]
+    text = "".join(norm_pages)
+    OCRService._detect_language(text)
+    return len(text)
+
+
+def parallel_extract(path: str, pool: ProcessPoolExecutor, pages: int, per_task: int) -> int:
+    futures = [
+        pool.submit(parse_pdf_page_range, path, s, min(pages, s + per_task))
+        for s in range(0, pages, per_task)
+    ]
+    norm_pages = [t for f in futures for t in f.result()]
+    return len(OCRService._assemble_pdf(path, norm_pages)["text"])
+
+
+def _time(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--per-task", type=int, default=50)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pool.submit(len, "").result()  # start workers outside the timings
+        OCRService._detect_language("warm up language profiles")
+        print(f"{'pages':>6} {'legacy s':>10} {'single s':>10} {'parallel s':>11}")
+        for n in args.pages:
+            path = os.path.join(tmp, f"doc_{n}.pdf")
+            write_pdf(path, n)
+            legacy = float("nan") if args.skip_legacy else _time(lambda: legacy_extract(path))
+            single = _time(lambda: OCRService.parse_pdf(path))
+            parallel = _time(lambda: parallel_extract(path, pool, n, args.per_task))
+            print(f"{n:>6} {legacy:>10.2f} {single:>10.2f} {parallel:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Startup cost benchmark: import time, lifespan startup, first embedding and memory.
+
+Each scenario runs in a fresh interpreter (scratch database/indexes in a temp dir):
+  - lazy:  EMBEDDINGS_WARMUP=false, the model loads on the first embedding call
+  - warm:  EMBEDDINGS_WARMUP=true (default), loaded and warmed during lifespan
+  - eager: EMBEDDINGS_PRELOAD=true, loaded while importing main (what every worker used to pay
+           at import time; with gunicorn --preload it happens once, before forking)
+
+Usage (from backend/):
+  python -m benchmarks.startup
+  python -m benchmarks.startup --runs 3 --scenarios lazy warm
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SCENARIOS = {
+    "lazy": {"EMBEDDINGS_WARMUP": "false", "EMBEDDINGS_PRELOAD": "false"},
+    "warm": {"EMBEDDINGS_WARMUP": "true", "EMBEDDINGS_PRELOAD": "false"},
+    "eager": {"EMBEDDINGS_WARMUP": "true", "EMBEDDINGS_PRELOAD": "true"},
+}
+
+_CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+from src.services.rag import rag_service
+from src.services.model_registry import model_registry
+with TestClient(main.app) as client:
+    t2 = time.perf_counter()
+    loaded_at_startup = model_registry.embedding_loaded
+    client.portal.call(rag_service.generate_embedding, "termination for convenience")
+    t3 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "startup_s": t2 - t1,
+    "first_embed_ms": 1000 * (t3 - t2),
+    "loaded_at_startup": loaded_at_startup,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def _run(scenario: str) -> dict:
+    with tempfile.TemporaryDirectory(prefix="clm_startup_") as work:
+        env = dict(os.environ)
+        env.update(SCENARIOS[scenario])
+        env.update(
+            DATABASE_URL=f"sqlite+aiosqlite:///{work}/db.sqlite",
+            JOBS_DB_PATH=os.path.join(work, "jobs.db"),
+            UPLOAD_DIR=os.path.join(work, "uploads"),
+            INDEX_DIR=os.path.join(work, "indexes"),
+            ARTIFACT_DIR=os.path.join(work, "artifacts"),
+            LLM_CACHE_PATH="",
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD], env=env, capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    args = parser.parse_args()
+
+    print(f"{'scenario':<8} {'import s':>9} {'startup s':>10} {'1st embed ms':>13} {'loaded@start':>13} {'RSS MB':>8}")
+    for scenario in args.scenarios:
+        runs = [_run(scenario) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in runs) for k in ("import_s", "startup_s", "first_embed_ms", "rss_mb")}
+        print(
+            f"{scenario:<8} {med['import_s']:>9.2f} {med['startup_s']:>10.2f} {med['first_embed_ms']:>13.1f} "
+            f"{str(runs[0]['loaded_at_startup']):>13} {med['rss_mb']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Query plan regression check for the read endpoints.
+
+Seeds a throwaway SQLite database, calls every endpoint through the app, captures the
+SELECTs each one runs and prints their EXPLAIN QUERY PLAN. Fails (exit 1) when one of
+them full-scans a table that grows with usage (contracts, child tables, chat history,
+users); index scans and FTS lookups pass.
+
+Usage (from backend/):
+  python check_query_plans.py              # summary + failures
+  python check_query_plans.py --verbose    # every statement and its plan
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+WORK_DIR = tempfile.mkdtemp(prefix="clm_plans_")
+DB_PATH = os.path.join(WORK_DIR, "plans.db")
+# Before the app modules read their settings: keep everything inside WORK_DIR
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{DB_PATH}",
+    JOBS_DB_PATH=os.path.join(WORK_DIR, "jobs.db"),
+    UPLOAD_DIR=os.path.join(WORK_DIR, "uploads"),
+    INDEX_DIR=os.path.join(WORK_DIR, "indexes"),
+    ARTIFACT_DIR=os.path.join(WORK_DIR, "artifacts"),
+    LLM_CACHE_PATH="",
+)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from src.config.database import engine, init_db
+from src.models.user import User, UserRole
+from src.models.contract import Contract, ContractStatus, FileType, ContractParty, PartyType, PartyRole, KeyDate, DateType
+from src.models.risk import Risk, RiskType, RiskSeverity
+from src.models.chat_history import ChatHistory
+from src.api.routes.auth import create_access_token
+
+HOT_TABLES = {
+    "users", "contracts", "contract_parties", "key_dates", "financial_terms",
+    "risks", "clauses", "chat_history",
+}
+# "SCAN t" is a full table scan; "SCAN t USING [COVERING] INDEX ix" walks an index
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?!\w| USING)")
+
+CONTRACTS_PER_USER = 500
+USERS = 4
+
+
+async def _seed() -> str:
+    await init_db()
+    now = datetime.utcnow()
+    users, contracts, parties, dates, risks, chats = [], [], [], [], [], []
+    for u in range(USERS):
+        uid = f"user-{u}"
+        users.append({"id": uid, "email": f"user{u}@example.com", "name": f"User {u}",
+                      "hashed_password": "x", "role": UserRole.legal_officer})
+        for i in range(CONTRACTS_PER_USER):
+            cid = f"c-{u}-{i:05d}"
+            contracts.append({
+                "id": cid, "title": f"Service agreement {i}", "file_name": f"{i}.pdf",
+                "file_path": f"/tmp/{i}.pdf", "file_type": FileType.pdf, "uploaded_by": uid,
+                "upload_date": now - timedelta(hours=i),
+                "status": list(ContractStatus)[i % len(ContractStatus)],
+                "industry": "energy" if i % 3 else "it", "governing_law": "Qatar",
+            })
+            parties.append({"contract_id": cid, "name": f"Vendor {i}", "type": PartyType.organization,
+                            "role": PartyRole.vendor})
+            dates.append({"contract_id": cid, "date_type": DateType.expiration_date,
+                          "date": now + timedelta(days=i % 90)})
+            risks.append({"contract_id": cid, "risk_type": RiskType.compliance,
+                          "severity": list(RiskSeverity)[i % len(RiskSeverity)], "title": "Risk",
+                          "description": "Seeded"})
+            chats.append({"contract_id": cid if i % 2 else None, "user_id": uid,
+                          "message": "q", "response": "a", "timestamp": now - timedelta(minutes=i)})
+    from src.config.database import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            for model, rows in ((User, users), (Contract, contracts), (ContractParty, parties),
+                                (KeyDate, dates), (Risk, risks), (ChatHistory, chats)):
+                await db.execute(insert(model), rows)
+    await engine.dispose()
+    return "user-0"
+
+
+def _explain(conn: sqlite3.Connection, statement: str, params) -> list:
+    rows = conn.execute("EXPLAIN QUERY PLAN " + statement, tuple(params or ())).fetchall()
+    return [r[-1] for r in rows]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    engine.echo = False
+    user_id = asyncio.run(_seed())
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+    contract_id = "c-0-00007"
+
+    captured = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        head = statement.lstrip().split(None, 1)[0].upper()
+        if head in ("SELECT", "WITH") and not executemany:
+            captured.append((statement, parameters))
+
+    with TestClient(__import__("main").app) as client:
+        first_page = client.get("/api/contracts", params={"page_size": 20}, headers=headers).json()
+        calls = [
+            ("GET /api/auth/me", "GET", "/api/auth/me", {}),
+            ("list", "GET", "/api/contracts", {}),
+            ("list lean", "GET", "/api/contracts", {"fields": "lean", "total": "none"}),
+            ("list cursor", "GET", "/api/contracts", {"cursor": first_page["next_cursor"], "total": "none"}),
+            ("list offset", "GET", "/api/contracts", {"page": 10}),
+            ("list status", "GET", "/api/contracts", {"status": "pending"}),
+            ("list industry+law", "GET", "/api/contracts", {"industry": "it", "governing_law": "Qatar"}),
+            ("list search", "GET", "/api/contracts", {"search": "service"}),
+            ("search", "GET", "/api/contracts/search", {"q": "service agreement"}),
+            ("dashboard", "GET", "/api/contracts/dashboard/stats", {}),
+            ("detail", "GET", f"/api/contracts/{contract_id}", {}),
+            ("chat history", "GET", "/api/chat/history", {}),
+            ("chat history (contract)", "GET", "/api/chat/history", {"contract_id": contract_id}),
+        ]
+        plans = sqlite3.connect(DB_PATH)
+        failures = 0
+        for label, method, url, params in calls:
+            captured.clear()
+            resp = client.request(method, url, params=params, headers=headers)
+            if resp.status_code >= 400:
+                print(f"✗ {label}: HTTP {resp.status_code} {resp.text[:200]}")
+                failures += 1
+                continue
+            bad = []
+            for statement, parameters in captured:
+                detail = _explain(plans, statement, parameters)
+                scans = [d for d in detail
+                         if (m := _FULL_SCAN.match(d.strip())) and m.group(1) in HOT_TABLES]
+                if scans:
+                    bad.append((statement, scans))
+                if args.verbose:
+                    print(f"\n[{label}] {' '.join(statement.split())[:300]}")
+                    for d in detail:
+                        print(f"    {d}")
+            if bad:
+                failures += 1
+                print(f"✗ {label}: full scan of {sorted({s.split()[1] for _, sc in bad for s in sc})}")
+                for statement, scans in bad:
+                    print(f"    {' '.join(statement.split())[:300]}")
+            else:
+                print(f"✓ {label} ({len(captured)} statements)")
+        plans.close()
+
+    print(f"\n{len(calls) - failures}/{len(calls)} endpoints use index access paths")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,37 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
-from src.config.database import init_db
+from src.config.database import init_db, database_stats, engine, read_engine
+from src.config.settings import get_settings
+from src.api.middleware import BodySizeLimitMiddleware
 from src.api.routes import auth, contracts, upload, chat
+from src.services.ingestion import ingestion_service
+from src.services.executors import ExecutorSaturated, executor_stats, shutdown_executors
+from src.services.llm import llm_client
+from src.services.rag import rag_service
+from src.services.analyze import analyze_service
+from src.services.risk_rules import rule_engine
+from src.services.search_index import search_index
+from src.services.user_cache import user_cache
+from src.services.principal_cache import principal_cache
+from src.services.model_registry import model_registry
+from src.services.embedding_batcher import query_batcher, document_batcher
 
 # Load environment variables
 load_dotenv()
+settings = get_settings()
+
+# Pre-fork servers (gunicorn --preload) import this module once in the parent:
+# workers then share the embedding weights copy-on-write
+if settings.embeddings_preload:
+    model_registry.preload()
+
+# Room for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
 
 # Note: Backend services are organized as follows:
 # - src/services/extraction.py - Contract data extraction
@@ -28,12 +51,30 @@ async def lifespan(app: FastAPI):
     
     # Initialize database
     await init_db()
+    await search_index.init()
     print("✅ Database initialized")
+
+    if settings.embeddings_warmup:
+        await model_registry.warm_up()
+        # Embed the static analysis topics once, before the first upload needs them
+        await analyze_service.warm_up()
+
+    # Start background ingestion workers
+    await ingestion_service.start()
+    print("✅ Ingestion workers started")
     
     yield
     
     # Shutdown
     print("👋 Shutting down...")
+    await ingestion_service.stop()
+    await llm_client.close()
+    await query_batcher.close()
+    await document_batcher.close()
+    shutdown_executors()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -43,6 +84,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Reject oversized bodies before they are read / spooled (added first so CORS wraps its 413s)
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.max_file_size + MULTIPART_OVERHEAD)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -52,6 +96,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    # Backpressure: worker pools are full, ask the client to retry shortly
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Server busy ({exc.pool_name}). Please retry shortly."},
+        headers={"Retry-After": "5"},
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(contracts.router, prefix="/api/contracts", tags=["Contracts"])
@@ -70,6 +123,19 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "auth": principal_cache.stats(),
+        "database": database_stats(),
+        "executors": executor_stats(),
+        "ingestion": await ingestion_service.stats(),
+        "llm": llm_client.stats(),
+        "rag": rag_service.stats(),
+        "risk_rules": rule_engine.stats(),
+        "user_cache": user_cache.stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     
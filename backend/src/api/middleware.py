@@ -0,0 +1,47 @@
+"""
+Request body size limit
+- Rejects requests whose Content-Length is over the limit before any body is read
+- Counts bytes as they arrive, so chunked requests without Content-Length stop
+  as soon as they cross the limit instead of being spooled in full
+"""
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    def _too_large(self) -> str:
+        return f"Request body too large (limit {self.max_body_size} bytes)"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_size:
+                    response = JSONResponse(status_code=413, content={"detail": self._too_large()})
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # HTTPException passes through FastAPI's body parsing unchanged
+                    raise HTTPException(status_code=413, detail=self._too_large())
+            return message
+
+        await self.app(scope, limited_receive, send)
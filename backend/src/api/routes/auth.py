@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import logging
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
@@ -11,6 +12,8 @@ from pydantic import BaseModel, EmailStr
 from src.config.database import get_db
 from src.config.settings import get_settings
 from src.models.user import User, UserRole
+from src.services.principal_cache import Principal, principal_cache
+from src.services.executors import auth_pool
 
 # Request models
 class SignupRequest(BaseModel):
@@ -25,10 +28,19 @@ class LoginRequest(BaseModel):
 
 router = APIRouter()
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Password hashing
 # pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# min == max rounds: hashes made at any other cost need_update and are rehashed on login
+_rounds = settings.password_hash_rounds
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=_rounds,
+    pbkdf2_sha256__min_rounds=_rounds,
+    pbkdf2_sha256__max_rounds=_rounds,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 def verify_password(plain_password, hashed_password):
@@ -37,6 +49,14 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    """get_password_hash on the auth pool (the KDF is deliberately slow CPU work)."""
+    return await auth_pool.run(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new hash if the stored one uses outdated parameters), on the auth pool."""
+    return await auth_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -47,7 +67,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+def create_user_token(user: User) -> str:
+    """
+    Access token for `user`; carries its token version plus email/role for signed claims mode.
+    """
+    return create_access_token(
+        data=Principal.from_user(user).claims(),
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """
+    The authenticated principal. A signature check plus a cache lookup; the User row is
+    only read on a cache miss (never in signed claims mode).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -56,21 +89,29 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         user_id: str = payload.get("sub")
-        if user_id is None:
-            print(f"❌ Token validation failed: No user_id in payload")
-            raise credentials_exception
-    except JWTError as e:
-        print(f"❌ JWT Error: {e}")
+        version = int(payload.get("ver", 0))
+    except (JWTError, TypeError, ValueError) as e:
+        logger.debug("Token rejected: %s", e)
         raise credentials_exception
-    
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
-        print(f"❌ User not found in database: {user_id}")
+    if user_id is None or principal_cache.is_revoked(user_id, version):
         raise credentials_exception
-    
-    print(f"✅ User authenticated: {user.email} (ID: {user.id})")
-    return user
+
+    if settings.auth_signed_claims:
+        principal = Principal.from_claims(payload)
+        if principal is not None:
+            return principal
+
+    principal = principal_cache.get(user_id, version)
+    if principal is not None:
+        return principal
+
+    user = await db.get(User, user_id)
+    if user is None or (user.token_version or 0) != version:
+        logger.debug("Token for unknown user or stale version: %s", user_id)
+        raise credentials_exception
+    principal = Principal.from_user(user)
+    principal_cache.set(principal)
+    return principal
 
 @router.post("/signup")
 async def signup(
@@ -89,7 +130,7 @@ async def signup(
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await hash_password(request.password)
     new_user = User(
         email=request.email,
         name=request.name,
@@ -102,10 +143,7 @@ async def signup(
     await db.refresh(new_user)
     
     # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": new_user.id}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(new_user)
     
     return {
         "access_token": access_token,
@@ -131,18 +169,22 @@ async def login(
     result = await db.execute(select(User).where(User.email == request.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(request.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(request.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored hash predates the current KDF parameters; upgrade it while we have the password
+        user.hashed_password = new_hash
+        await db.commit()
     
     # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.id}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user)
     
     return {
         "access_token": access_token,
@@ -157,12 +199,28 @@ async def login(
     }
 
 @router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get current user information."""
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     return {
-        "id": current_user.id,
-        "email": current_user.email,
-        "name": current_user.name,
-        "role": current_user.role.value,
-        "created_at": current_user.created_at.isoformat()
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "role": user.role.value,
+        "created_at": user.created_at.isoformat()
     }
+
+@router.post("/logout")
+async def logout(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """
+    Sign out everywhere: bumps the user's token version, which revokes every token issued so far.
+    """
+    await db.execute(
+        update(User).where(User.id == current_user.id).values(token_version=User.token_version + 1)
+    )
+    await db.commit()
+    version = (await db.execute(select(User.token_version).where(User.id == current_user.id))).scalar_one()
+    principal_cache.invalidate(current_user.id, version)
+    return {"message": "Logged out"}
@@ -3,10 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from typing import Optional, List
 
-from src.config.database import get_db
-from src.models.user import User
+from src.config.database import get_db, get_read_db
 from src.models.chat_history import ChatHistory
 from src.api.routes.auth import get_current_user
+from src.services.principal_cache import Principal
 from src.services.chat import chat_service
 
 router = APIRouter()
@@ -24,8 +24,7 @@ async def _load_previous_messages(
     stmt = (
         select(ChatHistory)
         .where(ChatHistory.user_id == user_id)
-        .order_by(desc(ChatHistory.order_by(desc(ChatHistory.timestamp))
-))
+        .order_by(desc(ChatHistory.timestamp))
         .limit(limit)
     )
     if contract_id:
@@ -33,8 +32,7 @@ async def _load_previous_messages(
             select(ChatHistory)
             .where(ChatHistory.user_id == user_id)
             .where(ChatHistory.contract_id == contract_id)
-            .order_by(desc(ChatHistory.order_by(desc(ChatHistory.timestamp))
-))
+            .order_by(desc(ChatHistory.timestamp))
             .limit(limit)
         )
 
@@ -56,7 +54,7 @@ async def ask_question(
     message: str,
     contract_id: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Ask a question about a specific contract (if contract_id is provided)
@@ -66,6 +64,7 @@ async def ask_question(
       {
         "response": str,
         "sources": List[str],
+        "citations": List[{chunk_id, contract_id, page, start, end, text}],
         "confidence": float
       }
     """
@@ -108,6 +107,7 @@ async def ask_question(
     return {
         "response": ai_response,
         "sources": sources,
+        "citations": result.get("citations", []),
         "confidence": confidence,
     }
 
@@ -116,8 +116,8 @@ async def ask_question(
 async def get_chat_history(
     contract_id: Optional[str] = None,
     limit: int = 50,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Return recent chat history. If contract_id is provided, filter by that contract.
@@ -127,8 +127,7 @@ async def get_chat_history(
     stmt = (
         select(ChatHistory)
         .where(ChatHistory.user_id == current_user.id)
-        .order_by(desc(ChatHistory.order_by(desc(ChatHistory.timestamp))
-))
+        .order_by(desc(ChatHistory.timestamp))
         .limit(limit)
     )
     if contract_id:
@@ -136,8 +135,7 @@ async def get_chat_history(
             select(ChatHistory)
             .where(ChatHistory.user_id == current_user.id)
             .where(ChatHistory.contract_id == contract_id)
-            .order_by(desc(ChatHistory.order_by(desc(ChatHistory.timestamp))
-))
+            .order_by(desc(ChatHistory.timestamp))
             .limit(limit)
         )
 
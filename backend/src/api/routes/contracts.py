@@ -1,18 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_, exists, delete
+from sqlalchemy import select, func, or_, and_, exists, delete, type_coerce, String, case, literal, false
 from sqlalchemy.orm import selectinload
 from typing import Optional, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel
+import base64
 import json
 
-from src.config.database import get_db
-from src.models.contract import Contract, KeyDate, DateType, ContractStatus, ContractParty, PartyType, PartyRole, FinancialTerm, TermType
-from src.models.risk import Risk, RiskSeverity, RiskType
-from src.models.clause import Clause
-from src.models.user import User
+from src.config.database import get_db, get_read_db, engine, primary_session
+from src.models.contract import Contract, KeyDate, DateType, ContractStatus, ContractParty, FinancialTerm
+from src.models.risk import Risk, RiskSeverity, RiskType, RiskSource
 from src.api.routes.auth import get_current_user
+from src.services.principal_cache import Principal
+from src.services.user_cache import user_cache
+from src.services.search_index import search_index
+from src.services.rag import rag_service
 
 router = APIRouter()
 
@@ -37,6 +40,60 @@ class ContractUpdate(BaseModel):
     purpose: Optional[str] = None
     scope: Optional[str] = None
 
+def _sort_key():
+    """
+    Column used for keyset ordering/comparison of upload_date.
+    SQLite stores DATETIME as text and the server default (CURRENT_TIMESTAMP) has no
+    microseconds, so a parsed datetime would not round-trip; compare the stored text.
+    """
+    if engine.dialect.name == "sqlite":
+        return type_coerce(Contract.upload_date, String)
+    return Contract.upload_date
+
+
+def _encode_cursor(upload_key, contract_id: str) -> str:
+    key = upload_key.isoformat() if isinstance(upload_key, datetime) else str(upload_key)
+    raw = json.dumps([key, contract_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, contract_id = json.loads(raw)
+        if engine.dialect.name != "sqlite":
+            key = datetime.fromisoformat(key)
+        return key, str(contract_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _child_count(model):
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(model.contract_id == Contract.id)
+        .correlate(Contract)
+        .scalar_subquery()
+    )
+
+
+def _contract_filters(user_id: str, search, industry, governing_law, status) -> list:
+    filters = [Contract.uploaded_by == user_id]  # only show the user's own contracts
+    if search and search.strip():
+        # Full-text index over title, summary, parties and body (see services/search_index.py)
+        matching = search_index.matching_ids(search)
+        # A search with no word tokens ("-", "%") matches nothing rather than everything
+        filters.append(Contract.id.in_(matching) if matching is not None else false())
+    if industry:
+        filters.append(Contract.industry == industry)
+    if governing_law:
+        filters.append(Contract.governing_law == governing_law)
+    if status:
+        filters.append(Contract.status == status)
+    return filters
+
+
 @router.get("")
 async def list_contracts(
     search: Optional[str] = Query(None),
@@ -45,127 +102,221 @@ async def list_contracts(
     status: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    fields: str = Query("full", pattern="^(full|lean)$"),
+    total: str = Query("exact", pattern="^(exact|cached|none)$"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    List all contracts with optional filters.
-    TODO: Backend team needs to implement:
-    1. Advanced filtering
-    2. Sorting options
-    3. Performance optimization for large datasets
+    List the user's contracts, newest first.
+    - Pagination: pass `cursor` (keyset on (upload_date, id), constant cost at any depth);
+      `page` (OFFSET) is kept for existing clients
+    - fields=lean: scalar columns plus per-contract counts instead of nested rows
+    - total: exact count, cached per user (invalidated on writes), or none
     """
-    query = select(Contract).options(
-        selectinload(Contract.parties),
-        selectinload(Contract.key_dates),
-        selectinload(Contract.financial_terms),
-        selectinload(Contract.risks)
-    )
-    
-    # Filter by current user - only show their contracts
-    query = query.where(Contract.uploaded_by == current_user.id)
-    
-    # Apply filters
-    if search:
+    filters = _contract_filters(current_user.id, search, industry, governing_law, status)
+    sort_key = _sort_key()
+
+    # Total count: a plain COUNT over the filtered contracts (no eager-load options)
+    total_count = None
+    if total != "none":
+        cache_key = ("contracts_total", search, industry, governing_law, status)
+        if total == "cached":
+            total_count = user_cache.get(current_user.id, cache_key)
+        if total_count is None:
+            version = user_cache.version(current_user.id)
+            count = select(func.count(Contract.id)).where(*filters)
+            if total == "cached":
+                # Served to later requests: count on the primary, never on a lagging replica
+                async with primary_session(db) as primary:
+                    total_count = (await primary.execute(count)).scalar()
+                user_cache.set(current_user.id, cache_key, total_count, version)
+            else:
+                total_count = (await db.execute(count)).scalar()
+                if db.bind is engine:
+                    user_cache.set(current_user.id, cache_key, total_count, version)
+
+    if fields == "lean":
+        query = select(
+            Contract.id,
+            Contract.title,
+            Contract.file_name,
+            Contract.file_type,
+            Contract.upload_date,
+            Contract.uploaded_by,
+            Contract.status,
+            Contract.governing_law,
+            Contract.jurisdiction,
+            Contract.industry,
+            Contract.contract_type,
+            Contract.updated_at,
+            _child_count(ContractParty).label("parties_count"),
+            _child_count(KeyDate).label("key_dates_count"),
+            _child_count(FinancialTerm).label("financial_terms_count"),
+            _child_count(Risk).label("risks_count"),
+            sort_key.label("sort_key"),
+        )
+    else:
+        query = select(Contract, sort_key.label("sort_key")).options(
+            selectinload(Contract.parties),
+            selectinload(Contract.key_dates),
+            selectinload(Contract.financial_terms),
+            selectinload(Contract.risks)
+        )
+    query = query.where(*filters).order_by(sort_key.desc(), Contract.id.desc()).limit(page_size)
+
+    if cursor:
+        after_key, after_id = _decode_cursor(cursor)
         query = query.where(
-            or_(
-                Contract.title.ilike(f"%{search}%"),
-                Contract.summary.ilike(f"%{search}%")
-            )
+            or_(sort_key < after_key, and_(sort_key == after_key, Contract.id < after_id))
         )
-    
-    if industry:
-        query = query.where(Contract.industry == industry)
-    
-    if governing_law:
-        query = query.where(Contract.governing_law == governing_law)
-    
-    if status:
-        query = query.where(Contract.status == status)
-    
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    result = await db.execute(count_query)
-    total = result.scalar()
-    
-    # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    
-    result = await db.execute(query)
-    contracts = result.scalars().all()
-    
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) == page_size:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last.sort_key, last.id if fields == "lean" else last[0].id)
+
     # Convert to response format
     items = []
-    for contract in contracts:
-        items.append({
-            "id": contract.id,
-            "title": contract.title,
-            "file_name": contract.file_name,
-            "file_type": contract.file_type.value,
-            "upload_date": contract.upload_date.isoformat(),
-            "uploaded_by": contract.uploaded_by,
-            "status": contract.status.value,
-            "parties": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "type": p.type.value,
-                    "role": p.role.value
-                } for p in contract.parties
-            ],
-            "key_dates": [
-                {
-                    "id": d.id,
-                    "date_type": d.date_type.value,
-                    "date": d.date.isoformat(),
-                    "description": d.description
-                } for d in contract.key_dates
-            ],
-            "financial_terms": [
-                {
-                    "id": t.id,
-                    "term_type": t.term_type.value,
-                    "amount": t.amount,
-                    "currency": t.currency,
-                    "schedule": t.schedule,
-                    "description": t.description
-                } for t in contract.financial_terms
-            ],
-            "governing_law": contract.governing_law,
-            "jurisdiction": contract.jurisdiction,
-            "industry": contract.industry,
-            "contract_type": contract.contract_type,
-            "tags": json.loads(contract.tags) if contract.tags else [],
-            "summary": contract.summary,
-            "purpose": contract.purpose,
-            "scope": contract.scope,
-            "risks": [
-                {
-                    "id": r.id,
-                    "risk_type": r.risk_type.value,
-                    "severity": r.severity.value,
-                    "title": r.title,
-                    "description": r.description,
-                    "recommendation": r.recommendation,
-                    "clause_reference": r.clause_reference
-                } for r in contract.risks
-            ],
-            "updated_at": contract.updated_at.isoformat()
-        })
+    if fields == "lean":
+        for r in rows:
+            items.append({
+                "id": r.id,
+                "title": r.title,
+                "file_name": r.file_name,
+                "file_type": r.file_type.value,
+                "upload_date": r.upload_date.isoformat(),
+                "uploaded_by": r.uploaded_by,
+                "status": r.status.value,
+                "governing_law": r.governing_law,
+                "jurisdiction": r.jurisdiction,
+                "industry": r.industry,
+                "contract_type": r.contract_type,
+                "parties_count": r.parties_count,
+                "key_dates_count": r.key_dates_count,
+                "financial_terms_count": r.financial_terms_count,
+                "risks_count": r.risks_count,
+                "updated_at": r.updated_at.isoformat()
+            })
+    else:
+        for contract, _ in rows:
+            items.append({
+                "id": contract.id,
+                "title": contract.title,
+                "file_name": contract.file_name,
+                "file_type": contract.file_type.value,
+                "upload_date": contract.upload_date.isoformat(),
+                "uploaded_by": contract.uploaded_by,
+                "status": contract.status.value,
+                "parties": [
+                    {
+                        "id": p.id,
+                        "name": p.name,
+                        "type": p.type.value,
+                        "role": p.role.value
+                    } for p in contract.parties
+                ],
+                "key_dates": [
+                    {
+                        "id": d.id,
+                        "date_type": d.date_type.value,
+                        "date": d.date.isoformat(),
+                        "description": d.description
+                    } for d in contract.key_dates
+                ],
+                "financial_terms": [
+                    {
+                        "id": t.id,
+                        "term_type": t.term_type.value,
+                        "amount": t.amount,
+                        "currency": t.currency,
+                        "schedule": t.schedule,
+                        "description": t.description
+                    } for t in contract.financial_terms
+                ],
+                "governing_law": contract.governing_law,
+                "jurisdiction": contract.jurisdiction,
+                "industry": contract.industry,
+                "contract_type": contract.contract_type,
+                "tags": json.loads(contract.tags) if contract.tags else [],
+                "summary": contract.summary,
+                "purpose": contract.purpose,
+                "scope": contract.scope,
+                "risks": [
+                    {
+                        "id": r.id,
+                        "risk_type": r.risk_type.value,
+                        "severity": r.severity.value,
+                        "title": r.title,
+                        "description": r.description,
+                        "recommendation": r.recommendation,
+                        "clause_reference": r.clause_reference,
+                        "source": r.source.value,
+                    } for r in contract.risks
+                ],
+                "updated_at": contract.updated_at.isoformat()
+            })
     
     return {
         "items": items,
-        "total": total,
-        "page": page,
+        "total": total_count,
+        "page": None if cursor else page,
         "page_size": page_size,
-        "total_pages": (total + page_size - 1) // page_size
+        "total_pages": (total_count + page_size - 1) // page_size if total_count is not None else None,
+        "next_cursor": next_cursor
     }
 
+
+@router.get("/search")
+async def search_contracts(
+    q: str = Query(..., min_length=1, max_length=500),
+    mode: str = Query("keyword", pattern="^(keyword|hybrid)$"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Ranked full-text search over the user's contracts with highlighted snippets.
+    mode=hybrid fuses the keyword (BM25) ranking with semantic (vector) matches.
+    """
+    if mode == "hybrid":
+        vector_hits = await rag_service.search_all_contracts(q, user_id=current_user.id, top_k=limit * 5)
+        hits = await search_index.hybrid_search(db, current_user.id, q, vector_hits, limit=limit)
+    else:
+        hits = await search_index.search(db, current_user.id, q, limit=limit)
+
+    contracts = {}
+    if hits:
+        result = await db.execute(
+            select(Contract.id, Contract.title, Contract.status, Contract.upload_date).where(
+                Contract.uploaded_by == current_user.id,
+                Contract.id.in_([h["contract_id"] for h in hits])
+            )
+        )
+        contracts = {r.id: r for r in result.all()}
+
+    results = []
+    for h in hits:
+        c = contracts.get(h["contract_id"])
+        if c is None:
+            continue
+        results.append({
+            **h,
+            "title": c.title,
+            "status": c.status.value,
+            "upload_date": c.upload_date.isoformat()
+        })
+    return {"query": q, "mode": mode, "results": results}
+
 @router.get("/{contract_id}")
 async def get_contract(
     contract_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get detailed information about a specific contract.
@@ -243,104 +394,105 @@ async def get_contract(
                 "title": r.title,
                 "description": r.description,
                 "recommendation": r.recommendation,
-                "clause_reference": r.clause_reference
+                "clause_reference": r.clause_reference,
+                "source": r.source.value,
             } for r in contract.risks
         ],
+        "clauses": [
+            {
+                "id": c.id,
+                "contract_id": c.contract_id,
+                "clause_type": c.clause_type,
+                "content": c.content,
+                "section_number": c.section_number,
+                "is_standard": c.is_standard,
+                "risk_level": c.risk_level.value if c.risk_level else None
+            } for c in contract.clauses
+        ],
         "updated_at": contract.updated_at.isoformat()
     }
 
 @router.get("/dashboard/stats")
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get dashboard statistics for the current user.
+    One round-trip (conditional aggregates + the 5 most recent uploads), cached per user
+    until a write path invalidates it or the TTL passes. Misses read the primary: a
+    lagging replica right after an invalidation would otherwise be cached for the TTL.
     """
-    # Total contracts for current user
-    total_result = await db.execute(
-        select(func.count(Contract.id)).where(Contract.uploaded_by == current_user.id)
-    )
-    total_contracts = total_result.scalar()
-    
-    # Pending reviews (pending status = awaiting review) for current user
-    pending_result = await db.execute(
-        select(func.count(Contract.id)).where(
-            Contract.uploaded_by == current_user.id,
-            Contract.status == "pending"
-        )
+    cached = user_cache.get(current_user.id, "dashboard_stats")
+    if cached is not None:
+        return cached
+    version = user_cache.version(current_user.id)
+
+    now = datetime.utcnow()
+    thirty_days_from_now = now + timedelta(days=30)
+
+    # Per-contract EXISTS probes use the contract_id indexes; already scoped to the user's rows
+    high_risk = exists().where(
+        Risk.contract_id == Contract.id,
+        Risk.severity.in_([RiskSeverity.high, RiskSeverity.critical])
     )
-    pending_reviews = pending_result.scalar()
-    
-    # High risk contracts - count contracts with at least one high or critical severity risk
-    high_risk_subquery = (
-        select(Risk.contract_id)
-        .where(
-            or_(
-                Risk.severity == RiskSeverity.high,
-                Risk.severity == RiskSeverity.critical
-            )
-        )
-        .distinct()
+    expiring = exists().where(
+        KeyDate.contract_id == Contract.id,
+        KeyDate.date_type == DateType.expiration_date,
+        KeyDate.date >= now,
+        KeyDate.date <= thirty_days_from_now
     )
-    high_risk_result = await db.execute(
-        select(func.count(Contract.id)).where(
-            Contract.uploaded_by == current_user.id,
-            Contract.id.in_(high_risk_subquery)
+    counts = (
+        select(
+            func.count(Contract.id).label("total_contracts"),
+            func.coalesce(func.sum(case((Contract.status == ContractStatus.pending, 1), else_=0)), 0).label("pending_reviews"),
+            func.coalesce(func.sum(case((high_risk, 1), else_=0)), 0).label("high_risk_contracts"),
+            func.coalesce(func.sum(case((expiring, 1), else_=0)), 0).label("expiring_soon"),
         )
+        .where(Contract.uploaded_by == current_user.id)
+        .cte("counts")
     )
-    high_risk_contracts = high_risk_result.scalar()
-    
-    # Expiring soon - contracts expiring in next 30 days
-    now = datetime.utcnow()
-    thirty_days_from_now = now + timedelta(days=30)
-    
-    expiring_subquery = (
-        select(KeyDate.contract_id)
-        .where(
-            KeyDate.date_type == DateType.expiration_date,
-            KeyDate.date >= now,
-            KeyDate.date <= thirty_days_from_now
-        )
-        .distinct()
+    recent = (
+        select(Contract.id, Contract.title, Contract.file_name, Contract.status, Contract.upload_date)
+        .where(Contract.uploaded_by == current_user.id)
+        .order_by(Contract.upload_date.desc())
+        .limit(5)
+        .subquery("recent")
     )
-    expiring_result = await db.execute(
-        select(func.count(Contract.id)).where(
-            Contract.uploaded_by == current_user.id,
-            Contract.id.in_(expiring_subquery)
-        )
+    # counts has exactly one row; the outer join repeats it next to each recent upload
+    query = (
+        select(counts, recent)
+        .select_from(counts.outerjoin(recent, literal(True)))
+        .order_by(recent.c.upload_date.desc())
     )
-    expiring_soon = expiring_result.scalar()
-    
-    # Recent uploads for current user
-    recent_query = select(Contract).where(
-        Contract.uploaded_by == current_user.id
-    ).order_by(Contract.upload_date.desc()).limit(5)
-    recent_result = await db.execute(recent_query)
-    recent_contracts = recent_result.scalars().all()
-    
-    return {
-        "total_contracts": total_contracts,
-        "pending_reviews": pending_reviews,
-        "high_risk_contracts": high_risk_contracts,
-        "expiring_soon": expiring_soon,
+    async with primary_session(db) as primary:
+        rows = (await primary.execute(query)).all()
+    first = rows[0]
+
+    stats = {
+        "total_contracts": first.total_contracts,
+        "pending_reviews": first.pending_reviews,
+        "high_risk_contracts": first.high_risk_contracts,
+        "expiring_soon": first.expiring_soon,
         "recent_uploads": [
             {
-                "id": c.id,
-                "title": c.title,
-                "file_name": c.file_name,
-                "status": c.status.value,
-                "upload_date": c.upload_date.isoformat()
-            } for c in recent_contracts
+                "id": r.id,
+                "title": r.title,
+                "file_name": r.file_name,
+                "status": r.status.value,
+                "upload_date": r.upload_date.isoformat()
+            } for r in rows if r.id is not None
         ]
     }
+    user_cache.set(current_user.id, "dashboard_stats", stats, version)
+    return stats
 
 @router.patch("/{contract_id}")
 async def update_contract(
     contract_id: str,
     update_data: ContractUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update contract details.
@@ -367,8 +519,10 @@ async def update_contract(
         else:
             setattr(contract, field, value)
     
+    await search_index.index_contract(db, contract.id)
     await db.commit()
     await db.refresh(contract)
+    user_cache.invalidate(current_user.id)
     
     return {
         "id": contract.id,
@@ -382,7 +536,7 @@ async def add_risk(
     contract_id: str,
     risk_data: RiskCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Add a risk to a contract.
@@ -406,12 +560,14 @@ async def add_risk(
         title=risk_data.title,
         description=risk_data.description,
         recommendation=risk_data.recommendation,
-        clause_reference=risk_data.clause_reference
+        clause_reference=risk_data.clause_reference,
+        source=RiskSource.user,
     )
     
     db.add(new_risk)
     await db.commit()
     await db.refresh(new_risk)
+    user_cache.invalidate(current_user.id)
     
     return {
         "id": new_risk.id,
@@ -422,6 +578,7 @@ async def add_risk(
         "description": new_risk.description,
         "recommendation": new_risk.recommendation,
         "clause_reference": new_risk.clause_reference,
+        "source": new_risk.source.value,
         "message": "Risk added successfully"
     }
 
@@ -430,7 +587,7 @@ async def delete_risk(
     contract_id: str,
     risk_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Delete a risk from a contract.
@@ -453,6 +610,7 @@ async def delete_risk(
     )
     result = await db.execute(delete_query)
     await db.commit()
+    user_cache.invalidate(current_user.id)
     
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Risk not found")
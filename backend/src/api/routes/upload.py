@@ -1,29 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-import os, uuid
+from sqlalchemy import select
+import os
 
 from src.config.database import get_db
 from src.config.settings import get_settings
 from src.models.contract import Contract, FileType, ContractStatus
 
 from src.api.routes.auth import get_current_user 
-from src.models.user import User  
+from src.services.principal_cache import Principal
 
-from src.services.ocr_service import OCRService
-from src.services.rag import rag_service
-from src.services.analyze import analyze_service
+from src.services.ingestion import ingestion_service
+from src.services.user_cache import user_cache
+from src.services.search_index import search_index
+from src.utils.files import save_upload, UploadTooLarge
 
 router = APIRouter()
 settings = get_settings()
 
-@router.post("/upload")
+@router.post("/upload", status_code=202)
 async def upload_contract(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),  
+    current_user: Principal = Depends(get_current_user),  
 ):
     """
-    Upload a contract (PDF/DOCX) and run the AI analysis pipeline in ONE LLM call.
+    Upload a contract (PDF/DOCX) and queue it for background analysis.
+    Returns 202 immediately; poll GET /api/contracts/{contract_id}/status for progress.
     Required auth: Bearer Token → assigns actual user ID to uploaded_by.
     """
     if file.content_type not in [
@@ -33,71 +36,103 @@ async def upload_contract(
     ]:
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and DOCX are allowed.")
 
+    if await ingestion_service.backlog() >= settings.ingest_max_backlog:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many contracts waiting for analysis. Please retry shortly.",
+            headers={"Retry-After": "30"},
+        )
+
     file_type = FileType.pdf if file.content_type == "application/pdf" else FileType.docx
     ext = ".pdf" if file_type == FileType.pdf else ".docx"
-    unique_name = f"{uuid.uuid4()}{ext}"
-    file_path = os.path.join(settings.upload_dir, unique_name)
 
-    os.makedirs(settings.upload_dir, exist_ok=True)
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Stream to disk in fixed-size chunks (constant memory), hashing on the way
+    try:
+        stored = await save_upload(
+            file,
+            dest_dir=settings.upload_dir,
+            ext=ext,
+            max_bytes=settings.max_file_size,
+            chunk_size=settings.upload_chunk_size,
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if stored.size == 0:
+        os.remove(stored.path)
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
     contract = Contract(
         title=os.path.splitext(file.filename)[0],
         file_name=file.filename,
-        file_path=file_path,
+        file_path=stored.path,
         file_type=file_type,
+        content_hash=stored.sha256,
         uploaded_by=str(current_user.id),  
         status=ContractStatus.pending,
     )
     db.add(contract)
+    await db.flush()
+    await search_index.index_contract(db, contract.id)  # title searchable right away
     await db.commit()
     await db.refresh(contract)
 
-    try:
-        if file_type == FileType.pdf:
-            parsed = await OCRService.extract_text_from_pdf(file_path)
-        else:
-            parsed = await OCRService.extract_text_from_docx(file_path)
-
-        text = parsed.get("text", "") or ""
-        pages = int(parsed.get("pages", 0) or 0)
-        language = parsed.get("language", "en")
-        page_offsets = parsed.get("page_offsets")
-
-        if not text.strip():
-            raise HTTPException(status_code=422, detail="Unable to extract text from file")
-
-        await rag_service.index_contract(
-            contract_id=str(contract.id),
-            text=text,
-            language=language,
-            page_offsets=page_offsets,
+    # Same bytes already processed (by anyone): reuse parsed text, embeddings and analysis
+    job_id = None
+    donor_id = await ingestion_service.find_donor(db, stored.sha256, exclude_id=contract.id)
+    if donor_id is not None:
+        job_id = await ingestion_service.complete_duplicate(contract, donor_id)
+        if job_id is not None:
+            contract.status = ContractStatus.completed
+            await db.commit()
+    if job_id is None:
+        job_id = await ingestion_service.enqueue(contract)
+    user_cache.invalidate(current_user.id)
+
+    return {
+        "contract_id": contract.id,
+        "job_id": job_id,
+        "file_name": contract.file_name,
+        "file_size": stored.size,
+        "sha256": stored.sha256,
+        "status": contract.status.value,
+        "status_url": f"/api/contracts/{contract.id}/status",
+        "deduplicated": contract.status == ContractStatus.completed,
+        "message": (
+            "Identical file already analyzed; results reused."
+            if contract.status == ContractStatus.completed
+            else "Contract queued for analysis."
+        ),
+    }
+
+
+@router.get("/{contract_id}/status")
+async def get_upload_status(
+    contract_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Processing status of an uploaded contract: contract status plus the latest
+    ingestion job's stage, progress, attempts and error. Includes the analysis once completed.
+    """
+    result = await db.execute(
+        select(Contract).where(
+            Contract.id == contract_id,
+            Contract.uploaded_by == current_user.id
         )
-
-        combined = await analyze_service.analyze(contract_id=str(contract.id))
-
-        contract.status = ContractStatus.completed
-        await db.commit()
-        await db.refresh(contract)
-
-        return {
-            "contract_id": contract.id,
-            "file_name": contract.file_name,
-            "status": contract.status.value,
-            "pages": pages,
-            "language": language,
-            "message": "Contract analyzed successfully.",
-            "analysis": combined,
-        }
-
-    except HTTPException:
-        contract.status = ContractStatus.failed
-        await db.commit()
-        raise
-
-    except Exception as e:
-        contract.status = ContractStatus.failed
-        await db.commit()
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {type(e).__name__}: {str(e)}")
\ No newline at end of file
+    )
+    contract = result.scalar_one_or_none()
+    if not contract:
+        raise HTTPException(status_code=404, detail="Contract not found")
+
+    job = await ingestion_service.get_status(contract.id)
+    job_result = (job or {}).pop("result", None) or {}
+
+    return {
+        "contract_id": contract.id,
+        "status": contract.status.value,
+        "job": job,
+        "pages": job_result.get("pages"),
+        "language": job_result.get("language"),
+        "analysis": job_result.get("analysis"),
+    }
@@ -1,25 +1,159 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+"""
+Database engines and sessions
+- Engines are built from Settings: SQL echo is off unless DB_ECHO is set
+- Postgres: sized connection pool with recycle and pre-ping
+- SQLite: pooled connections with WAL journaling, synchronous=NORMAL and a busy timeout
+  applied on connect, so concurrent writers wait instead of failing with "database is locked"
+- Optional read replica (DATABASE_READ_URL) behind get_read_db for GET routes; without
+  one, get_read_db is get_db and a request keeps using a single session
+- primary_session(db): reads whose results get cached go to the primary, so a lagging
+  replica can't pin stale data in a cache for its whole TTL
+- Pool checkout wait times are recorded per engine and reported on /metrics
+"""
+
+from typing import Any, AsyncIterator, Dict
+from contextlib import asynccontextmanager
+import threading
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-import os
-from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from sqlalchemy import event, inspect, text
 
-load_dotenv()
+from src.config.settings import get_settings
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./clm_database.db")
+settings = get_settings()
 
-# Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True
-)
+DATABASE_URL = settings.database_url
+
+
+class PoolMetrics:
+    """
+    Checkout counts and the time callers waited for a pooled connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(1000 * self.wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+class _TimedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited (pool exhaustion shows up here
+    long before it turns into pool timeouts).
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        if settings.sqlite_journal_mode:
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        if settings.sqlite_synchronous:
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    finally:
+        cursor.close()
+
+
+def create_engine_from_settings(url: str) -> AsyncEngine:
+    """
+    Async engine for `url` configured from Settings (pool, pragmas, echo, metrics).
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {"echo": settings.db_echo, "future": True}
+    sqlite = parsed.get_backend_name() == "sqlite"
+    in_memory = sqlite and parsed.database in (None, "", ":memory:")
+
+    if in_memory:
+        options["poolclass"] = StaticPool  # one shared connection, or each session sees an empty DB
+    else:
+        options.update(
+            poolclass=_TimedPool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+        )
+        if not sqlite:
+            options.update(pool_recycle=settings.db_pool_recycle_seconds, pool_pre_ping=settings.db_pool_pre_ping)
 
-# Create async session factory
+    new_engine = create_async_engine(url, **options)
+    pool = new_engine.sync_engine.pool
+    if isinstance(pool, _TimedPool):
+        pool.metrics = PoolMetrics()
+    if sqlite:
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas)
+    return new_engine
+
+
+def pool_stats(target: AsyncEngine) -> Dict[str, Any]:
+    pool = target.sync_engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, _TimedPool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            **pool.metrics.stats(),
+        )
+    return stats
+
+
+# Create async engines (read_engine is engine when no replica is configured)
+engine = create_engine_from_settings(DATABASE_URL)
+read_engine = create_engine_from_settings(settings.database_read_url) if settings.database_read_url else engine
+
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
 
 # Base class for models
 Base = declarative_base()
@@ -32,6 +166,60 @@ async def get_db():
         finally:
             await session.close()
 
+async def _get_replica_db():
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+# Dependency for read-only routes; may lag the primary by the replication delay
+get_read_db = _get_replica_db if read_engine is not engine else get_db
+
+@asynccontextmanager
+async def primary_session(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    `db` itself unless it is bound to the replica; then a short-lived primary session.
+    """
+    if db.bind is engine:
+        yield db
+    else:
+        async with AsyncSessionLocal() as session:
+            yield session
+
+def database_stats() -> Dict[str, Any]:
+    stats = {"primary": pool_stats(engine)}
+    if read_engine is not engine:
+        stats["replica"] = pool_stats(read_engine)
+    return stats
+
+# Columns added after tables may already exist; create_all() never alters a table
+ADDITIVE_COLUMNS = [
+    # (table, column, DDL type)
+    ("contracts", "content_hash", "VARCHAR(64)"),
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    # Rows that predate it can't be told apart: keep them as user rows rather than delete them
+    ("risks", "source", "VARCHAR(8) NOT NULL DEFAULT 'user'"),
+]
+
+def _migrate(sync_conn):
+    insp = inspect(sync_conn)
+    tables = set(insp.get_table_names())
+    for table, column, ddl in ADDITIVE_COLUMNS:
+        if table in tables and column not in {c["name"] for c in insp.get_columns(table)}:
+            sync_conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    # The inspector caches reflected columns; re-inspect so the index pass sees the ALTERs
+    insp = inspect(sync_conn)
+    # Indexes declared on the models but missing from tables created before them
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {ix["name"] for ix in insp.get_indexes(table.name)}
+        columns = {c["name"] for c in insp.get_columns(table.name)}
+        for index in table.indexes:
+            if index.name not in existing and {c.name for c in index.columns} <= columns:
+                index.create(sync_conn)
+
 # Initialize database
 async def init_db():
     async with engine.begin() as conn:
@@ -44,3 +232,4 @@ async def init_db():
         
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate)
@@ -4,11 +4,25 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite+aiosqlite:///./clm_database.db"
+    database_read_url: str = ""        # optional read replica for GET routes
+    db_echo: bool = False              # log every SQL statement (development only)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800  # Postgres: reconnect before server/proxy idle timeouts
+    db_pool_pre_ping: bool = True        # Postgres: drop dead connections on checkout
+    sqlite_journal_mode: str = "wal"     # readers don't block the writer
+    sqlite_synchronous: str = "normal"   # safe with WAL, far fewer fsyncs than FULL
+    sqlite_busy_timeout_ms: int = 5000   # wait for the write lock instead of "database is locked"
     
     # JWT
     secret_key: str = "your-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    auth_signed_claims: bool = False          # trust email/role in the token: no user lookup at all
+    principal_cache_ttl_seconds: int = 300    # authenticated user cache (0 = look up on every request)
+    principal_cache_max_entries: int = 10000
+    password_hash_rounds: int = 29000         # pbkdf2_sha256 iterations; hashes at other costs are rehashed on login
     
     # API
     api_host: str = "0.0.0.0"
@@ -16,10 +30,72 @@ class Settings(BaseSettings):
     
     # Gemini AI
     gemini_api_key: str = ""
+
+    # LLM client
+    llm_backend: str = "gemini"       # gemini | fake
+    llm_max_concurrency: int = 8
+    llm_timeout_seconds: float = 60.0
+    llm_max_retries: int = 2
+    llm_fake_latency_ms: int = 0      # fake backend only
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./llm_cache.db"  # empty = memory tier only
+    llm_cache_ttl_seconds: int = 604800     # 7 days
+    llm_cache_max_entries: int = 20000      # SQLite tier
+    llm_cache_memory_entries: int = 512     # in-memory LRU tier
     
     # File Upload
     upload_dir: str = "./uploads"
     max_file_size: int = 10485760  # 10MB
+    upload_chunk_size: int = 1048576  # bytes read/written per step while streaming to disk
+    artifact_dir: str = "./artifacts"  # parsed text / analysis cached by content hash
+
+    # RAG / Vector store
+    index_dir: str = "./indexes"
+    embeddings_model: str = "intfloat/multilingual-e5-small"
+    embeddings_backend: str = "torch"      # torch | int8 (quantized, CPU) | onnx (needs onnxruntime)
+    embeddings_onnx_dir: str = "./models"  # ONNX exports of EMBEDDINGS_MODEL, created on first use
+    embeddings_warmup: bool = True         # load + warm the embedding model during startup (else on first use)
+    embeddings_preload: bool = False       # load at import of main, before a pre-fork server forks workers
+    embeddings_retry_seconds: float = 60.0 # after a failed load, wait this long before trying again
+    global_index_hnsw_threshold: int = 50000  # chunks; below this portfolio search is exact
+    global_index_hnsw_m: int = 32
+    global_index_ef_search: int = 128
+    query_embedding_cache_size: int = 1024  # LRU of query text -> embedding
+    chunk_cache_size: int = 64              # tokenized documents kept for re-chunking
+
+    # Read caches
+    user_cache_ttl_seconds: int = 60   # list totals / dashboard stats per user (0 = off)
+    user_cache_max_users: int = 1024
+
+    # Risk analysis
+    risk_rules_path: str = ""  # optional JSON rules file merged over the built-in rules
+
+    # Background ingestion
+    jobs_db_path: str = "./jobs.db"
+    ingest_workers: int = 2           # concurrent contracts in flight
+    ingest_max_attempts: int = 3
+    ingest_retry_backoff_seconds: float = 5.0
+    ingest_max_backlog: int = 200     # queued jobs before uploads get 503
+    ingest_lease_seconds: float = 60.0  # a running job's owner must renew within this, else it is retried
+
+    # Worker pools (see services/executors.py)
+    parse_pool_workers: int = 2       # processes for PDF/DOCX parsing
+    parse_pool_max_queue: int = 16
+    embed_pool_workers: int = 1       # threads for document embedding
+    embed_pool_max_queue: int = 8
+    query_pool_workers: int = 2       # threads for query embedding (chat/search)
+    query_pool_max_queue: int = 64
+    auth_pool_workers: int = 2        # threads for password hashing (hashlib releases the GIL)
+    auth_pool_max_queue: int = 32
+
+    # Embedding micro-batching (see services/embedding_batcher.py)
+    embed_batch_max_size: int = 64          # texts per forward pass
+    embed_batch_max_wait_ms: float = 5.0    # how long a request waits for others to join its batch
+    embed_batch_max_pending: int = 256      # queued requests per lane before 503
+
+    # PDF parsing
+    pdf_parallel_min_pages: int = 200  # split into page ranges across parse workers (0 = never)
+    pdf_pages_per_task: int = 50
     
     class Config:
         env_file = ".env"
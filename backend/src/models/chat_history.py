@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from src.config.database import Base
 import uuid
@@ -7,8 +7,14 @@ class ChatHistory(Base):
     __tablename__ = "chat_history"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    contract_id = Column(String, ForeignKey("contracts.id"), nullable=True)  # Null for general questions
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=True, index=True)  # Null for general questions
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     message = Column(Text, nullable=False)
     response = Column(Text, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        # A user's recent messages (overall / about one contract), newest first
+        Index("ix_chat_history_user_ts", "user_id", "timestamp"),
+        Index("ix_chat_history_user_contract_ts", "user_id", "contract_id", "timestamp"),
+    )
@@ -13,7 +13,7 @@ class Clause(Base):
     __tablename__ = "clauses"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False, index=True)
     clause_type = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     section_number = Column(String)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, Float
+from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.config.database import Base
@@ -23,14 +23,15 @@ class Contract(Base):
     file_name = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_type = Column(Enum(FileType), nullable=False)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the uploaded bytes
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
     uploaded_by = Column(String, ForeignKey("users.id"), nullable=False)
-    status = Column(Enum(ContractStatus), nullable=False, default=ContractStatus.pending)
+    status = Column(Enum(ContractStatus), nullable=False, default=ContractStatus.pending, index=True)
     
     # Extracted data
-    governing_law = Column(String)
+    governing_law = Column(String, index=True)
     jurisdiction = Column(String)
-    industry = Column(String)
+    industry = Column(String, index=True)
     contract_type = Column(String)
     tags = Column(Text)  # JSON string array
     
@@ -48,6 +49,13 @@ class Contract(Base):
     risks = relationship("Risk", back_populates="contract", cascade="all, delete-orphan")
     clauses = relationship("Clause", back_populates="contract", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of a user's contracts, newest first
+        Index("ix_contracts_owner_upload", "uploaded_by", "upload_date", "id"),
+        # Status filter and pending count within a user's contracts
+        Index("ix_contracts_owner_status", "uploaded_by", "status"),
+    )
+
 class PartyType(enum.Enum):
     individual = "individual"
     organization = "organization"
@@ -62,7 +70,7 @@ class ContractParty(Base):
     __tablename__ = "contract_parties"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     type = Column(Enum(PartyType), nullable=False)
     role = Column(Enum(PartyRole), nullable=False)
@@ -80,13 +88,18 @@ class KeyDate(Base):
     __tablename__ = "key_dates"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False, index=True)
     date_type = Column(Enum(DateType), nullable=False)
-    date = Column(DateTime, nullable=False)
+    date = Column(DateTime, nullable=False, index=True)
     description = Column(Text)
     
     contract = relationship("Contract", back_populates="key_dates")
 
+    __table_args__ = (
+        # Upcoming deadlines of one type ("expiring in 30 days"), covering contract_id
+        Index("ix_key_dates_type_date", "date_type", "date", "contract_id"),
+    )
+
 class TermType(enum.Enum):
     payment = "payment"
     penalty = "penalty"
@@ -97,7 +110,7 @@ class FinancialTerm(Base):
     __tablename__ = "financial_terms"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False, index=True)
     term_type = Column(Enum(TermType), nullable=False)
     amount = Column(Float, nullable=False)
     currency = Column(String, default="USD")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from src.config.database import Base
 import enum
@@ -17,16 +17,26 @@ class RiskSeverity(enum.Enum):
     high = "high"
     critical = "critical"
 
+class RiskSource(enum.Enum):
+    analysis = "analysis"  # written by the ingestion analysis; replaced when it re-runs
+    user = "user"          # added through the API; never touched by re-analysis
+
 class Risk(Base):
     __tablename__ = "risks"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False, index=True)
     risk_type = Column(Enum(RiskType), nullable=False)
-    severity = Column(Enum(RiskSeverity), nullable=False)
+    severity = Column(Enum(RiskSeverity), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     recommendation = Column(Text)
     clause_reference = Column(String)
+    source = Column(Enum(RiskSource), nullable=False, default=RiskSource.user, server_default=RiskSource.user.value)
     
     contract = relationship("Contract", back_populates="risks")
+
+    __table_args__ = (
+        # Contracts with a high/critical risk
+        Index("ix_risks_severity_contract", "severity", "contract_id"),
+    )
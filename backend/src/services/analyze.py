@@ -1,9 +1,10 @@
 from typing import Dict, Any, List
 import json
-import google.generativeai as genai
 
 from src.config.settings import get_settings
+from src.services.llm import llm_client
 from src.services.rag import rag_service
+from src.services.chunking import document_cache, RAG_WINDOW
 from src.services.extraction import EXTRACTION_SCHEMA  
 
 settings = get_settings()
@@ -64,35 +65,44 @@ BOUNDS = {
 
 class AnalyzeService:
     def __init__(self):
-      if settings.gemini_api_key:
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel(
-          model_name="gemini-2.5-flash",
-          generation_config={
-            "response_mime_type": "application/json",
-            "max_output_tokens": 1024
-          }
-        )
-      else:
-        self.model = None
+      self.model = llm_client.model(
+        "gemini-2.5-flash",
+        generation_config={
+          "response_mime_type": "application/json",
+          "max_output_tokens": 1024
+        }
+      )
+
+    async def warm_up(self) -> None:
+      # Topic embeddings are static: compute once per process, not once per upload
+      await rag_service.pin_queries(TOPICS)
 
     async def build_evidence(self, contract_id: str) -> List[dict]:
-      # RAG topic coverage (better than first N chunks)
+      # RAG topic coverage (better than first N chunks); all topics in one batched search
       seen, hits = set(), []
-      for t in TOPICS:
-        for h in await rag_service.search_contract(contract_id, t, top_k=2):
+      for topic_hits in await rag_service.search_contract_many(contract_id, TOPICS, top_k=2):
+        for h in topic_hits:
           if h["chunk_id"] in seen:
             continue
           seen.add(h["chunk_id"])
-          hits.append({"chunk_id": h["chunk_id"], "page": h.get("page", 0), "text": h["text"]})
+          hits.append({"chunk_id": h["chunk_id"], "page": h.get("page", 0), "text": h["text"],
+                       "start": h.get("start"), "end": h.get("end")})
           if len(hits) >= 24:
             return hits
+      if not hits:
+        # Not searchable (no embedding model / index): first chunks of the same view
+        doc = document_cache.peek(contract_id)
+        if doc is not None:
+          hits = [
+            {"chunk_id": c["chunk_id"], "page": c["page"], "text": c["text"], "start": c["start"], "end": c["end"]}
+            for c in doc.chunks(*RAG_WINDOW, respect_sections=True, limit=20)
+          ]
       return hits
 
     async def analyze(self, *, contract_id: str, fallback_chunks: List[dict] = None) -> Dict[str, Any]:
       if not self.model:
         # Fallback shape if Gemini is not configured
-        return {"extracted": {}, "risks": {"risks": [], "non_standard": [], "missing_clauses": []}, "summary": {"summary": "AI service not configured.", "highlights": []}}
+        return {"extracted": {}, "risks": {"risks": [], "non_standard": [], "missing_clauses": []}, "summary": {"summary": "AI service not configured.", "highlights": []}, "degraded": True}
 
       chunks = await self.build_evidence(contract_id)
       if not chunks and fallback_chunks:
@@ -106,7 +116,7 @@ class AnalyzeService:
       prompt_parts = [{"text": SYSTEM_ANALYZE}, {"text": json.dumps(payload, ensure_ascii=False)}]
 
       try:
-        resp = self.model.generate_content(contents=[{"role":"user","parts":prompt_parts}])
+        resp = await self.model.generate_content(contents=[{"role":"user","parts":prompt_parts}])
         data = json.loads(resp.text)
         return {
           "extracted": data.get("extracted", {}),
@@ -117,7 +127,8 @@ class AnalyzeService:
         return {
           "extracted": {},
           "risks": {"risks": [{"title": "LLM error", "severity":"low", "finding": str(e)}], "non_standard": [], "missing_clauses": []},
-          "summary": {"summary": "Summary unavailable.", "highlights": []}
+          "summary": {"summary": "Summary unavailable.", "highlights": []},
+          "degraded": True  # not cached as a content artifact
         }
 
 analyze_service = AnalyzeService()
\ No newline at end of file
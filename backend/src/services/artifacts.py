@@ -0,0 +1,72 @@
+"""
+Artifact Store
+- Content-addressed cache of per-file processing results, keyed by the upload's SHA-256
+- parsed:   OCRService output (text, pages, language, page_offsets)
+- analysis: AnalyzeService output (extracted, risks, summary)
+- Shared by every contract with the same bytes, so re-uploads skip parsing and Gemini calls
+
+Layout:
+  <root>/<hash[:2]>/<hash>/<name>.json   {"version": ..., "data": {...}}
+"""
+
+from typing import Any, Dict, Optional
+import json
+import os
+import uuid
+
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+PARSED = "parsed"
+ANALYSIS = "analysis"
+
+# Bump when parsing/analysis output changes shape, so stale artifacts are ignored
+ARTIFACT_VERSION = 2
+
+
+class ArtifactStore:
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, content_hash: str, name: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash, f"{name}.json")
+
+    def get(self, content_hash: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        if not content_hash:
+            return None
+        try:
+            with open(self._path(content_hash, name), "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if doc.get("version") != ARTIFACT_VERSION:
+            return None
+        return doc.get("data")
+
+    def put(self, content_hash: Optional[str], name: str, data: Dict[str, Any]) -> None:
+        """
+        Atomic write (temp file + rename); concurrent writers of the same hash are harmless.
+        """
+        if not content_hash:
+            return
+        path = self._path(content_hash, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": ARTIFACT_VERSION, "data": data}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def has(self, content_hash: Optional[str], name: str) -> bool:
+        return bool(content_hash) and os.path.isfile(self._path(content_hash, name))
+
+
+artifact_store = ArtifactStore(settings.artifact_dir)
@@ -1,8 +1,8 @@
 from typing import Dict, List, Optional, Any
 import json
 
-import google.generativeai as genai
 from src.config.settings import get_settings
+from src.services.llm import llm_client
 from src.services.rag import rag_service
 
 settings = get_settings()
@@ -18,6 +18,20 @@ def _cap_snippet(s: str, n: int = 260) -> str:
     s = (s or "").strip().replace("\n", " ")
     return s if len(s) <= n else s[: n - 1] + "…"
 
+def _citation(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Structured citation: start/end locate the chunk in the normalized contract text,
+    so the UI can jump to the span without searching for the snippet.
+    """
+    return {
+        "chunk_id": chunk["chunk_id"],
+        "contract_id": chunk.get("contract_id"),
+        "page": chunk.get("page", 0),
+        "start": chunk.get("start"),
+        "end": chunk.get("end"),
+        "text": _cap_snippet(chunk.get("text", "")),
+    }
+
 
 class ChatService:
     """
@@ -29,28 +43,25 @@ class ChatService:
     _MAX_OUTPUT_TOKENS = 768
 
     def __init__(self):
-        if settings.gemini_api_key:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(
-                model_name="gemini-2.5-flash",
-                generation_config={
-                    "response_mime_type": "application/json",
-                    "max_output_tokens": self._MAX_OUTPUT_TOKENS,
-                },
-            )
-        else:
-            self.model = None
+        self.model = llm_client.model(
+            "gemini-2.5-flash",
+            generation_config={
+                "response_mime_type": "application/json",
+                "max_output_tokens": self._MAX_OUTPUT_TOKENS,
+            },
+        )
 
     async def answer_question(
         self,
         question: str,
         contract_id: Optional[str] = None,
         contract_text: Optional[str] = None,
-        context: Optional[Dict] = None
+        context: Optional[Dict] = None,
+        user_id: Optional[str] = None
     ) -> Dict:
         """
         Generic entrypoint. If contract_id is provided, search only that contract;
-        otherwise do a global search across all indexed contracts.
+        otherwise do a global search across the user's indexed contracts.
         """
         if not self.model:
             return {
@@ -63,7 +74,7 @@ class ChatService:
         if contract_id:
             hits = await rag_service.search_contract(str(contract_id), question, top_k=8)
         else:
-            hits = await rag_service.search_all_contracts(question, top_k=10)
+            hits = await rag_service.search_all_contracts(question, user_id=user_id, top_k=10)
 
         if not hits:
             if contract_text and contract_text.strip():
@@ -82,22 +93,31 @@ class ChatService:
             chunks_payload = [
                 {
                     "chunk_id": h["chunk_id"],
+                    "contract_id": h.get("contract_id", contract_id),
                     "page": h.get("page", 0),
                     "text": h["text"],
                     "score": h.get("score", 0.0),
+                    "start": h.get("start"),
+                    "end": h.get("end"),
                 }
                 for h in hits
             ]
+        # Chunk ids restart at c_00000 in every contract, so portfolio prompts qualify them
+        # with the contract id; citations are resolved back through by_ref
+        by_ref: Dict[str, Dict[str, Any]] = {}
+        for c in chunks_payload:
+            ref = c["chunk_id"] if contract_id or not c.get("contract_id") else f"{c['contract_id']}:{c['chunk_id']}"
+            by_ref.setdefault(ref, c)
 
         payload = {
             "question": question,
             "chunks": [
                 {
-                    "chunk_id": c["chunk_id"],
+                    "chunk_id": ref,
                     "page": c.get("page", 0),
                     "text": c["text"],
                 }
-                for c in chunks_payload
+                for ref, c in by_ref.items()
             ],
         }
 
@@ -106,25 +126,27 @@ class ChatService:
                 {"text": SYSTEM_QA_INSTRUCTIONS},
                 {"text": json.dumps(payload, ensure_ascii=False)},
             ]
-            resp = self.model.generate_content(contents=[{"role": "user", "parts": prompt_parts}])
+            resp = await self.model.generate_content(contents=[{"role": "user", "parts": prompt_parts}])
             data = json.loads(resp.text)
 
             # Guardrail: validate citations come back with valid chunk_ids
             citations = self._filter_citations(
                 proposed=data.get("citations"),
-                allowed_chunk_ids={c["chunk_id"] for c in chunks_payload},
+                allowed_chunk_ids=set(by_ref),
                 max_items=self._MAX_CITATIONS,
             )
 
             # If model returned no valid citations, fall back to top chunks as sources
             if not citations:
+                top = chunks_payload[: min(3, len(chunks_payload))]
                 fallback = [
                     f"{c['chunk_id']} p.{c.get('page',0)}: {_cap_snippet(c['text'])}"
-                    for c in chunks_payload[: min(3, len(chunks_payload))]
+                    for c in top
                 ]
                 return {
                     "answer": data.get("answer") or "I had trouble generating an answer from the context.",
                     "sources": self.format_sources(fallback),
+                    "citations": [_citation(c) for c in top],
                     "confidence": float(data.get("confidence", 0.0)),
                 }
 
@@ -140,6 +162,7 @@ class ChatService:
             return {
                 "answer": answer,
                 "sources": sources,
+                "citations": [_citation(by_ref[c["chunk_id"]]) for c in citations],
                 "confidence": max(0.0, min(1.0, confidence)),
             }
 
@@ -152,6 +175,7 @@ class ChatService:
             return {
                 "answer": "I had trouble generating an answer from the context. Here are the most relevant excerpts.",
                 "sources": self.format_sources(fallbacks),
+                "citations": [_citation(c) for c in chunks_payload[:3]],
                 "confidence": 0.0,
             }
 
@@ -173,9 +197,9 @@ class ChatService:
         previous_messages: Optional[List[Dict]] = None
     ) -> Dict:
         """
-        Portfolio-wide Q&A. Uses global search across all indexed contracts.
+        Portfolio-wide Q&A. Uses global search across the user's indexed contracts.
         """
-        return await self.answer_question(question=question, contract_id=None)
+        return await self.answer_question(question=question, contract_id=None, user_id=user_id)
 
     async def get_conversation_context(
         self,
@@ -0,0 +1,167 @@
+"""
+Clause Scanner
+- Finds every clause signal (liability, confidentiality, indemnity, ...) in one scan of
+  a lowercased copy of the contract instead of one case-insensitive re.search per check
+- Each pattern is compiled once; its literal prefix ("anchor") is located with str.find
+  (C-speed substring search) and the full pattern is only verified at those positions
+- Patterns without a usable anchor (top-level alternation, a leading group or class) fall
+  back to a plain re search, so custom rules are never rejected or partially matched
+- Works for Arabic patterns too (no case, so lowercasing leaves them unchanged)
+- Reports match offsets, which map onto chunk ids for evidence_chunks
+- Signals come from the risk rule registry (see services/risk_rules.py)
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+import re
+
+# Regex syntax that ends a pattern's literal prefix
+_META = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*?{")
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            if pattern[i + 1:i + 2] == "^":
+                i += 1
+            if pattern[i + 1:i + 2] == "]":
+                i += 1  # a leading "]" is a literal
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def _anchor(pattern: str) -> Tuple[Optional[str], bool]:
+    """
+    (literal prefix, is_whole_pattern) of a pattern; leading \\b assertions are skipped.
+    The prefix is None when no literal is common to every match (top-level "|",
+    or a leading group/class).
+    """
+    if _has_top_level_alternation(pattern):
+        return None, False
+    body = pattern
+    while body.startswith(r"\b"):
+        body = body[2:]
+    i = 0
+    while i < len(body) and body[i] not in _META:
+        i += 1
+    literal = body[:i]
+    if i < len(body) and body[i] in _QUANTIFIERS:
+        literal = literal[:-1]  # "x?" makes the last literal char optional
+    if not literal:
+        return None, False
+    return literal.lower(), (literal == pattern and i == len(body))
+
+
+@dataclass
+class _Term:
+    anchor: Optional[str]                # None: no anchor, search with `verify` alone
+    verify: Optional["re.Pattern[str]"]  # None when the anchor is the whole pattern
+
+
+@dataclass
+class ClauseHits:
+    """
+    Offsets (into the scanned text) of the first matches of every signal.
+    """
+
+    offsets: Dict[str, List[int]] = field(default_factory=dict)
+
+    def __contains__(self, signal: str) -> bool:
+        return bool(self.offsets.get(signal))
+
+    def get(self, signal: str) -> List[int]:
+        return self.offsets.get(signal, [])
+
+
+class ClauseScanner:
+    """
+    Multi-pattern scanner compiled from {signal: [pattern, ...]}.
+    Patterns are lowercase regexes; those starting with a literal (optionally after \\b)
+    are the fast path.
+    """
+
+    def __init__(self, signals: Dict[str, Iterable[str]]):
+        self.signals: Dict[str, List[_Term]] = {}
+        for name, patterns in signals.items():
+            terms = []
+            for p in patterns:
+                anchor, literal = _anchor(p)
+                terms.append(_Term(anchor, None if literal else re.compile(p, re.IGNORECASE)))
+            self.signals[name] = terms
+
+    @staticmethod
+    def prepare(text: str) -> str:
+        """
+        Lowercased text with the same length as the input, so offsets line up.
+        """
+        low = (text or "").lower()
+        if len(low) != len(text or ""):
+            # A few code points (e.g. U+0130) lowercase to two; keep those as-is
+            low = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        return low
+
+    def _find(self, low: str, term: _Term, limit: Optional[int], end: int) -> List[int]:
+        out: List[int] = []
+        find, verify = low.find, term.verify
+        if term.anchor is None:
+            for m in verify.finditer(low, 0, len(low)):
+                if m.start() > end:
+                    break
+                out.append(m.start())
+                if limit is not None and len(out) >= limit:
+                    break
+            return out
+        i = find(term.anchor, 0, end)
+        while i != -1:
+            if verify is None or verify.match(low, i):
+                out.append(i)
+                if limit is not None and len(out) >= limit:
+                    break
+            i = find(term.anchor, i + 1, end)
+        return out
+
+    def scan(
+        self,
+        text: str,
+        limit: Optional[int] = 3,
+        only: Optional[Iterable[str]] = None,
+        prepared: Optional[str] = None,
+    ) -> ClauseHits:
+        """
+        First `limit` match offsets per signal (all of them when limit is None).
+        Pass `prepared` (from prepare()) to reuse one lowercased copy across scans.
+        """
+        low = prepared if prepared is not None else self.prepare(text)
+        names = self.signals.keys() if only is None else only
+        hits = ClauseHits()
+        for name in names:
+            found: List[int] = []
+            bound = len(low)
+            for term in self.signals[name]:
+                # str.find's end bounds the whole anchor; only its start must precede `bound`
+                found.extend(self._find(low, term, limit, bound + len(term.anchor or "")))
+                if limit is not None and len(found) >= limit:
+                    found.sort()
+                    del found[limit:]
+                    # Later terms only matter if they match before the current limit-th hit
+                    bound = found[-1]
+            found.sort()
+            hits.offsets[name] = found
+        return hits
@@ -0,0 +1,182 @@
+"""
+Embedding Backends
+- One interface for the embedding model, selected per deployment with EMBEDDINGS_BACKEND:
+  - torch: full-precision SentenceTransformer (default, previous behaviour)
+  - int8:  the same model with its Linear layers dynamically quantized to int8
+           (torch.quantization.quantize_dynamic); CPU only, no extra dependencies
+  - onnx:  ONNX Runtime over the model's transformer, exported once to EMBEDDINGS_ONNX_DIR
+           on first use; tokenization and pooling replicate the SentenceTransformer pipeline.
+           Needs `pip install onnxruntime`
+- Every backend exposes SentenceTransformer's encode(texts, batch_size, normalize_embeddings,
+  convert_to_numpy), so the batcher and RAG code don't care which one is loaded
+- Accuracy vs throughput of each backend: python -m benchmarks.embedding_backends
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import os
+
+import numpy as np
+
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+class EmbeddingBackend:
+    """
+    Backend interface: normalized sentence embeddings as a float32 (n, dim) array.
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        normalize_embeddings: bool = True,
+        convert_to_numpy: bool = True,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name, "model": self.model_name}
+
+
+class TorchBackend(EmbeddingBackend):
+
+    name = "torch"
+    device: Optional[str] = None  # SentenceTransformer's choice (cuda if available)
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device=self.device)
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True, convert_to_numpy=True, **kwargs):
+        return self.model.encode(
+            texts,
+            batch_size=batch_size or 32,
+            normalize_embeddings=normalize_embeddings,
+            convert_to_numpy=True,
+            **kwargs,
+        )
+
+
+class Int8Backend(TorchBackend):
+
+    name = "int8"
+    device = "cpu"  # quantized kernels are CPU only
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        import torch
+
+        # Weights stored as int8, activations quantized on the fly; embeddings stay float32
+        torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class OnnxBackend(EmbeddingBackend):
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, model_dir: str):
+        super().__init__(model_name)
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        os.makedirs(model_dir, exist_ok=True)
+        self.path = os.path.join(model_dir, model_name.replace("/", "__") + ".onnx")
+        if not (os.path.exists(self.path) and os.path.exists(self.path + ".json")):
+            self._export()
+        with open(self.path + ".json", "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.pooling = config["pooling"]
+        self.max_seq_length = int(config["max_seq_length"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.session = ort.InferenceSession(self.path, providers=["CPUExecutionProvider"])
+        self._inputs = [i.name for i in self.session.get_inputs()]
+
+    def _export(self) -> None:
+        """
+        Export the SentenceTransformer's transformer module to ONNX (dynamic batch and
+        sequence axes) plus a sidecar with the pooling mode and max sequence length.
+        """
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        st = SentenceTransformer(self.model_name, device="cpu")
+        transformer = st[0].auto_model.eval()
+        pooling = st[1]
+        config = {
+            "pooling": "cls" if getattr(pooling, "pooling_mode_cls_token", False) else "mean",
+            "max_seq_length": st.max_seq_length,
+        }
+        dummy = st.tokenizer(["export"], return_tensors="pt")
+        names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+        axes = {n: {0: "batch", 1: "sequence"} for n in names}
+        axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        tmp = self.path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(dummy[n] for n in names),
+                tmp,
+                input_names=names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=axes,
+                opset_version=14,
+            )
+        os.replace(tmp, self.path)
+        with open(self.path + ".json", "w", encoding="utf-8") as f:
+            json.dump(config, f)
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True, convert_to_numpy=True, **kwargs):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batch_size = batch_size or 32
+        # Similar lengths per batch means less padding (SentenceTransformer does the same)
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            enc = self.tokenizer(
+                [texts[i] for i in idx], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np",
+            )
+            feeds = {n: enc[n].astype(np.int64) for n in self._inputs if n in enc}
+            hidden = self.session.run(None, feeds)[0]
+            if self.pooling == "cls":
+                vecs = hidden[:, 0]
+            else:
+                mask = enc["attention_mask"][..., None].astype(np.float32)
+                vecs = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            for i, v in zip(idx, vecs):
+                out[i] = v
+        X = np.stack(out).astype(np.float32)
+        if normalize_embeddings:
+            X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-12
+        return X
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "path": self.path, "pooling": self.pooling}
+
+
+def load_backend(kind: str, model_name: str) -> EmbeddingBackend:
+    kind = (kind or "torch").lower()
+    if kind == "torch":
+        return TorchBackend(model_name)
+    if kind == "int8":
+        return Int8Backend(model_name)
+    if kind == "onnx":
+        return OnnxBackend(model_name, settings.embeddings_onnx_dir)
+    raise ValueError(f"Unknown EMBEDDINGS_BACKEND: {kind} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,209 @@
+"""
+Embedding Batcher
+- In-process micro-batching actor in front of the shared embedding model: concurrent
+  encode() calls are queued, merged into batches of up to EMBED_BATCH_MAX_SIZE texts and
+  run as one model.encode (one forward pass) on the lane's worker pool
+- A batch is dispatched when it is full or EMBED_BATCH_MAX_WAIT_MS after its oldest request
+  arrived; while every worker is busy, new requests keep joining the next batch, so
+  throughput follows batch size rather than request count under load
+- Large requests (a document's chunks) are split across batches in arrival order, so
+  other callers are not stuck behind one whole document
+- Two lanes with their own pools: query_batcher (chat/search/analysis queries, query_pool)
+  and document_batcher (ingestion, embed_pool), so interactive latency never queues
+  behind bulk indexing
+- Backpressure: more than EMBED_BATCH_MAX_PENDING queued requests raise ExecutorSaturated (503)
+"""
+
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import time
+
+import numpy as np
+
+from src.config.settings import get_settings
+from src.services.executors import BoundedExecutor, ExecutorSaturated, embed_pool, query_pool
+from src.services.model_registry import model_registry
+
+settings = get_settings()
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: asyncio.Future
+    enqueued: float
+    dispatched: int = 0  # texts already handed to a batch
+    filled: int = 0      # texts whose vectors are back
+    parts: Dict[int, np.ndarray] = field(default_factory=dict)  # start offset -> vectors
+
+
+class EmbeddingBatcher:
+
+    def __init__(self, name: str, pool: BoundedExecutor, max_batch: int, max_wait_ms: float, max_pending: int):
+        self.name = name
+        self.pool = pool
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_pending = max(1, max_pending)
+        self._queue: Deque[_Request] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.max_batch_seen = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        # First use, or a new event loop (tests, scripts): start a fresh actor on it
+        self._loop = loop
+        self._queue.clear()
+        self._wakeup = asyncio.Event()
+        # One batch in flight per pool worker; the rest of the pool's queue stays free
+        self._slots = asyncio.Semaphore(self.pool.max_workers)
+        self._task = loop.create_task(self._run())
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Normalized embeddings for texts, shape (len(texts), dim), batched with concurrent callers.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        self._ensure_started()
+        if len(self._queue) >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated(self.pool.name)
+        req = _Request(list(texts), self._loop.create_future(), time.perf_counter())
+        self._queue.append(req)
+        self.requests += 1
+        self._wakeup.set()
+        return await req.future
+
+    def _queued_texts(self) -> int:
+        return sum(len(r.texts) - r.dispatched for r in self._queue)
+
+    def _take(self) -> List[Tuple[_Request, int, int]]:
+        """
+        Up to max_batch texts from the head of the queue, as (request, start, end) slices.
+        """
+        items: List[Tuple[_Request, int, int]] = []
+        room = self.max_batch
+        now = time.perf_counter()
+        while self._queue and room > 0:
+            req = self._queue[0]
+            if req.future.done():  # caller went away
+                self._queue.popleft()
+                continue
+            if req.dispatched == 0:
+                self.queue_seconds += now - req.enqueued
+            n = min(room, len(req.texts) - req.dispatched)
+            items.append((req, req.dispatched, req.dispatched + n))
+            req.dispatched += n
+            room -= n
+            if req.dispatched == len(req.texts):
+                self._queue.popleft()
+        return items
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._queue:
+                continue
+            # Let concurrent callers join until the batch is full or the oldest has waited max_wait
+            deadline = self._queue[0].enqueued + self.max_wait
+            while self._queued_texts() < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                self._wakeup.clear()
+
+            await self._slots.acquire()
+            items = self._take()
+            if not items:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._encode(items))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+            if self._queue:
+                self._wakeup.set()
+
+    async def _encode(self, items: List[Tuple[_Request, int, int]]) -> None:
+        texts = [t for req, start, end in items for t in req.texts[start:end]]
+        try:
+            model = await model_registry.load_embedding_model()
+            if model is None:
+                raise RuntimeError(f"Embedding model unavailable: {model_registry.last_error}")
+            vecs = await self.pool.run(
+                model.encode, texts, batch_size=len(texts), normalize_embeddings=True, convert_to_numpy=True
+            )
+            vecs = np.asarray(vecs, dtype=np.float32)
+        except Exception as e:
+            for req, _, _ in items:
+                if not req.future.done():
+                    req.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        self.batches += 1
+        self.texts += len(texts)
+        self.max_batch_seen = max(self.max_batch_seen, len(texts))
+        pos = 0
+        for req, start, end in items:
+            part = vecs[pos:pos + end - start]
+            pos += end - start
+            if req.future.done():
+                continue
+            req.parts[start] = part
+            req.filled += end - start
+            if req.filled == len(req.texts):
+                parts = [req.parts[k] for k in sorted(req.parts)]
+                req.future.set_result(parts[0] if len(parts) == 1 else np.concatenate(parts))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for req in self._queue:
+            if not req.future.done():
+                req.future.cancel()
+        self._queue.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool": self.pool.name,
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch_seen,
+            "avg_queue_ms": round(1000 * self.queue_seconds / self.requests, 3) if self.requests else 0.0,
+            "pending": len(self._queue),
+            "rejected": self.rejected,
+        }
+
+
+query_batcher = EmbeddingBatcher(
+    "query", query_pool,
+    settings.embed_batch_max_size, settings.embed_batch_max_wait_ms, settings.embed_batch_max_pending,
+)
+document_batcher = EmbeddingBatcher(
+    "document", embed_pool,
+    settings.embed_batch_max_size, settings.embed_batch_max_wait_ms, settings.embed_batch_max_pending,
+)
@@ -0,0 +1,119 @@
+"""
+Executors
+- Bounded worker pools for CPU-heavy work that must not run on the event loop
+- parse_pool: process pool for PDF/DOCX parsing
+- embed_pool: thread pool for document embedding (ingestion)
+- query_pool: separate thread pool for query embedding, so chat latency doesn't
+  queue behind bulk uploads
+- auth_pool: small thread pool for password hashing/verification (signup, login), so a
+  login burst uses at most its workers' worth of CPU and never blocks the event loop
+- Queue-depth metrics and backpressure: submissions beyond workers + max_queue
+  raise ExecutorSaturated, which the API maps to 503
+"""
+
+from typing import Any, Callable, Dict, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import functools
+import time
+
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a pool already has workers + max_queue tasks in flight."""
+
+    def __init__(self, pool_name: str):
+        super().__init__(f"{pool_name} pool is saturated")
+        self.pool_name = pool_name
+
+
+class BoundedExecutor:
+    """
+    run_in_executor with an admission limit and counters. The underlying pool is
+    created lazily so importing this module in a worker process is cheap.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[Executor] = None
+
+        self.inflight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def _get(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    @property
+    def saturated(self) -> bool:
+        return self.inflight >= self.max_workers + self.max_queue
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.saturated:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name)
+
+        self.inflight += 1
+        t0 = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get(), functools.partial(fn, *args, **kwargs))
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.inflight -= 1
+            self.total_seconds += time.perf_counter() - t0
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.completed + self.failed
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(self.inflight, self.max_workers),
+            "queued": max(0, self.inflight - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_ms": round(1000 * self.total_seconds / done, 2) if done else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parse_pool = BoundedExecutor("parse", "process", settings.parse_pool_workers, settings.parse_pool_max_queue)
+embed_pool = BoundedExecutor("embed", "thread", settings.embed_pool_workers, settings.embed_pool_max_queue)
+query_pool = BoundedExecutor("query", "thread", settings.query_pool_workers, settings.query_pool_max_queue)
+auth_pool = BoundedExecutor("auth", "thread", settings.auth_pool_workers, settings.auth_pool_max_queue)
+
+_POOLS = (parse_pool, embed_pool, query_pool, auth_pool)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {p.name: p.stats() for p in _POOLS}
+
+
+def shutdown_executors() -> None:
+    for p in _POOLS:
+        p.shutdown()
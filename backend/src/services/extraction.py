@@ -9,9 +9,9 @@ import json
 import re
 import math
 
-import google.generativeai as genai
-
 from src.config.settings import get_settings
+from src.services.llm import llm_client
+from src.services.chunking import document_cache, EXTRACTION_WINDOW
 
 settings = get_settings()
 
@@ -31,31 +31,6 @@ def _find_governing_law(full_text: str) -> Optional[str]:
     return m.group(1).strip() if m else None
 
 
-def _chunk_text(text: str, approx_tokens: int = 600, stride: int = 90) -> List[Dict[str, Any]]:
-    """
-    Approximate token chunking by words. Keeps context via overlap.
-    """
-    words = (text or "").split()
-    if not words:
-        return []
-    chunks = []
-    step = max(1, approx_tokens - stride)
-    i = 0
-    cidx = 0
-    while i < len(words):
-        seg = " ".join(words[i : i + approx_tokens])
-        if seg.strip():
-            chunks.append({
-                "chunk_id": f"c_{cidx:05d}",
-                "page": 0,
-                "section": None,
-                "text": seg
-            })
-            cidx += 1
-        i += step
-    return chunks
-
-
 EXTRACTION_SCHEMA = {
     "type": "object",
     "properties": {
@@ -88,14 +63,8 @@ class ExtractionService:
     """
 
     def __init__(self):
-        if not settings.gemini_api_key:
-            self.model = None
-            return
-
-        genai.configure(api_key=settings.gemini_api_key)
-
-        self.model = genai.GenerativeModel(
-            model_name="gemini-2.5-flash",
+        self.model = llm_client.model(
+            "gemini-2.5-flash",
             generation_config={"response_mime_type": "application/json"}
         )
 
@@ -125,8 +94,7 @@ class ExtractionService:
                 "confidence_overall": 0.0
             }
 
-        chunks = _chunk_text(text, approx_tokens=600, stride=90)
-        llm_chunks = chunks[:40]
+        llm_chunks = document_cache.get(text, key=doc_id).chunks(*EXTRACTION_WINDOW, limit=40)
 
         payload = {
             "schema": EXTRACTION_SCHEMA,
@@ -140,7 +108,7 @@ class ExtractionService:
                 {"text": SYSTEM_EXTRACT_INSTRUCTIONS},
                 {"text": json.dumps(payload, ensure_ascii=False)}
             ]
-            resp = self.model.generate_content(contents=[{"role": "user", "parts": prompt_parts}])
+            resp = await self.model.generate_content(contents=[{"role": "user", "parts": prompt_parts}])
             data = json.loads(resp.text)
         except Exception as e:
             data = {
@@ -0,0 +1,228 @@
+"""
+Global ANN Index
+- One FAISS index over every indexed chunk (all contracts, all owners)
+- Exact IndexFlatIP for small corpora, HNSW once the corpus grows past a threshold
+- Row id -> (contract_id, chunk position) mapping and owner filtering via IDSelector
+- Deletes are tombstones; the index is compacted when too many rows are dead
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import faiss
+
+
+class GlobalIndex:
+    """
+    Portfolio-wide vector index. Row ids are assigned sequentially, so the FAISS
+    label of a vector is its row number and no IndexIDMap is needed.
+    """
+
+    # Owners with at most this many live rows are searched exactly (selector-filtered
+    # brute force) instead of a filtered HNSW walk, which loses recall on tiny subsets.
+    EXACT_SUBSET_MAX = 20_000
+    # Compact (rebuild without tombstones) when this fraction of rows is dead.
+    COMPACT_RATIO = 0.3
+
+    def __init__(self, hnsw_threshold: int = 50_000, hnsw_m: int = 32, ef_search: int = 128):
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+
+        self.dim: Optional[int] = None
+        self._index: Optional[faiss.Index] = None
+        # Row metadata lives in capacity-doubling buffers; only [:ntotal] is meaningful
+        self._row_contract = np.empty(0, dtype=np.int32)   # row -> contract slot
+        self._row_pos = np.empty(0, dtype=np.int32)        # row -> chunk position
+        self._deleted = np.empty(0, dtype=bool)
+        self._n_deleted = 0
+
+        self._slots: List[str] = []                  # slot -> contract_id
+        self._slot_of: Dict[str, int] = {}
+        self._rows_of: Dict[str, np.ndarray] = {}    # contract_id -> live row ids
+        self._owner_of: Dict[str, Optional[str]] = {}
+        self._contracts_by_owner: Dict[Optional[str], set] = {}
+
+    # ---------------- properties ---------------- #
+
+    @property
+    def ntotal(self) -> int:
+        return 0 if self._index is None else int(self._index.ntotal)
+
+    @property
+    def nlive(self) -> int:
+        return self.ntotal - self._n_deleted
+
+    @property
+    def is_hnsw(self) -> bool:
+        return isinstance(self._index, faiss.IndexHNSWFlat)
+
+    def __contains__(self, contract_id: str) -> bool:
+        return str(contract_id) in self._rows_of
+
+    # ---------------- writes ---------------- #
+
+    def add_contract(self, contract_id: str, owner_id: Optional[str], vecs: np.ndarray) -> None:
+        """
+        Add (or replace) all chunk vectors of one contract. `vecs` must be L2-normalized.
+        """
+        cid = str(contract_id)
+        if cid in self._rows_of:
+            self.remove_contract(cid)
+
+        vecs = np.ascontiguousarray(vecs, dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[0] == 0:
+            return
+        if self._index is None:
+            self.dim = int(vecs.shape[1])
+            self._index = faiss.IndexFlatIP(self.dim)
+        elif vecs.shape[1] != self.dim:
+            raise ValueError(f"Embedding dim {vecs.shape[1]} does not match global index dim {self.dim}")
+
+        slot = self._slot_of.get(cid)
+        if slot is None:
+            slot = len(self._slots)
+            self._slots.append(cid)
+            self._slot_of[cid] = slot
+
+        start = self.ntotal
+        n = vecs.shape[0]
+        self._reserve(start + n)
+        self._index.add(vecs)
+        self._row_contract[start:start + n] = slot
+        self._row_pos[start:start + n] = np.arange(n, dtype=np.int32)
+        self._deleted[start:start + n] = False
+
+        owner = str(owner_id) if owner_id is not None else None
+        self._rows_of[cid] = np.arange(start, start + n, dtype=np.int64)
+        self._owner_of[cid] = owner
+        self._contracts_by_owner.setdefault(owner, set()).add(cid)
+
+        if not self.is_hnsw and self.ntotal >= self.hnsw_threshold:
+            self._rebuild(to_hnsw=True)
+
+    def remove_contract(self, contract_id: str) -> bool:
+        cid = str(contract_id)
+        rows = self._rows_of.pop(cid, None)
+        if rows is None:
+            return False
+        owner = self._owner_of.pop(cid, None)
+        self._contracts_by_owner.get(owner, set()).discard(cid)
+        self._deleted[rows] = True
+        self._n_deleted += len(rows)
+
+        if self.ntotal and self._n_deleted / self.ntotal >= self.COMPACT_RATIO:
+            self._rebuild(to_hnsw=self.nlive >= self.hnsw_threshold)
+        return True
+
+    def _reserve(self, size: int) -> None:
+        cap = len(self._deleted)
+        if size <= cap:
+            return
+        new_cap = max(size, 2 * cap, 1024)
+        for name in ("_row_contract", "_row_pos", "_deleted"):
+            old = getattr(self, name)
+            buf = np.zeros(new_cap, dtype=old.dtype)
+            buf[:cap] = old
+            setattr(self, name, buf)
+
+    def _rebuild(self, to_hnsw: bool) -> None:
+        """
+        Rebuild the FAISS index from live rows only, renumbering rows densely.
+        """
+        live = np.flatnonzero(~self._deleted[:self.ntotal])
+        vecs = self._reconstruct(live) if len(live) else np.empty((0, self.dim), dtype=np.float32)
+
+        if to_hnsw:
+            index = faiss.IndexHNSWFlat(self.dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self.ef_search
+        else:
+            index = faiss.IndexFlatIP(self.dim)
+        if len(live):
+            index.add(vecs)
+
+        remap = np.full(self.ntotal, -1, dtype=np.int64)
+        remap[live] = np.arange(len(live), dtype=np.int64)
+        self._rows_of = {cid: remap[rows] for cid, rows in self._rows_of.items()}
+        self._row_contract = self._row_contract[live]
+        self._row_pos = self._row_pos[live]
+        self._deleted = np.zeros(len(live), dtype=bool)
+        self._n_deleted = 0
+        self._index = index
+
+    def _reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        return self._index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+
+    # ---------------- reads ---------------- #
+
+    def _owner_rows(self, owner_id: str) -> np.ndarray:
+        cids = self._contracts_by_owner.get(str(owner_id)) or ()
+        if not cids:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._rows_of[c] for c in cids])
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        owner_id: Optional[str] = None,
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Top-k across the portfolio (optionally only contracts owned by `owner_id`).
+        Returns [(contract_id, chunk_position, score)] sorted by score desc.
+        """
+        if self._index is None or self.nlive == 0 or top_k <= 0:
+            return []
+        q = np.ascontiguousarray(query, dtype=np.float32).reshape(1, -1)
+
+        if owner_id is not None:
+            rows = self._owner_rows(owner_id)
+            if len(rows) == 0:
+                return []
+            if not self.is_hnsw or len(rows) <= self.EXACT_SUBSET_MAX:
+                return self._exact_subset(q, rows, top_k)
+            sel = faiss.IDSelectorBatch(rows)
+        elif self._n_deleted:
+            dead = np.flatnonzero(self._deleted[:self.ntotal]).astype(np.int64)
+            sel = faiss.IDSelectorNot(faiss.IDSelectorBatch(dead))
+        else:
+            sel = None
+
+        if self.is_hnsw:
+            params = faiss.SearchParametersHNSW(efSearch=max(self.ef_search, top_k))
+        else:
+            params = faiss.SearchParameters()
+        if sel is not None:
+            params.sel = sel
+
+        k = min(top_k, self.nlive)
+        D, I = self._index.search(q, k, params=params)
+        return self._label(I[0], D[0])
+
+    def _exact_subset(self, q: np.ndarray, rows: np.ndarray, top_k: int) -> List[Tuple[str, int, float]]:
+        """
+        Brute force over `rows` only: a selector-filtered scan of the flat vectors
+        (the HNSW graph's own storage once the index is HNSW), without copying them out.
+        """
+        flat = faiss.downcast_index(self._index.storage) if self.is_hnsw else self._index
+        params = faiss.SearchParameters()
+        params.sel = faiss.IDSelectorBatch(np.ascontiguousarray(rows, dtype=np.int64))
+        k = min(top_k, len(rows))
+        D, I = flat.search(q, k, params=params)
+        return self._label(I[0], D[0])
+
+    def _label(self, rows: np.ndarray, scores: np.ndarray) -> List[Tuple[str, int, float]]:
+        out: List[Tuple[str, int, float]] = []
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            if row < 0 or self._deleted[row]:
+                continue
+            cid = self._slots[self._row_contract[row]]
+            out.append((cid, int(self._row_pos[row]), float(score)))
+        return out
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "type": "hnsw" if self.is_hnsw else ("flat" if self._index is not None else "empty"),
+            "rows": self.ntotal,
+            "live_rows": self.nlive,
+            "contracts": len(self._rows_of),
+        }
@@ -0,0 +1,438 @@
+"""
+Ingestion Service
+- Durable local job queue (SQLite) for uploaded contracts
+- Asyncio worker pool that moves a contract pending -> processing -> completed/failed
+- PDF/DOCX parsing runs in the shared parse process pool (see OCRService / executors.py)
+- Bounded concurrency, retries with exponential backoff, per-job stage/progress
+- Running jobs are leased to the process that claimed them and renewed by a heartbeat;
+  only jobs whose lease expired (owner crashed or stopped) are taken over, so several
+  workers can share JOBS_DB_PATH without running a job twice
+- Content-addressed reuse: parsed text, embeddings and analysis of identical
+  bytes (same SHA-256) are reused instead of recomputed (see artifacts.py)
+- Analysis results are written to the normalized tables (see persistence.py)
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+import uuid
+
+import aiosqlite
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import AsyncSessionLocal
+from src.config.settings import get_settings
+from src.models.contract import Contract, ContractStatus
+from src.services.ocr_service import OCRService
+from src.services.rag import rag_service
+from src.services.analyze import analyze_service
+from src.services.artifacts import artifact_store, PARSED, ANALYSIS
+from src.services.persistence import save_analysis
+from src.services.search_index import search_index
+from src.services.user_cache import user_cache
+
+settings = get_settings()
+
+# Job states (contract status is tracked separately on the Contract row)
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id TEXT PRIMARY KEY,
+    contract_id TEXT NOT NULL,
+    owner_id TEXT,
+    file_path TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    state TEXT NOT NULL,
+    stage TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    error TEXT,
+    result TEXT,
+    run_after REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_state_run_after ON ingest_jobs(state, run_after);
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_contract_id ON ingest_jobs(contract_id);
+"""
+
+# Columns added after the first release of the queue (jobs.db files that predate them)
+_ADDITIVE_COLUMNS = [
+    ("lease_owner", "TEXT"),
+    ("lease_expires", "REAL"),
+]
+
+
+class PermanentJobError(Exception):
+    """Raised for failures that retrying cannot fix (e.g. no extractable text)."""
+
+
+class JobQueue:
+    """
+    Minimal SQLite-backed job queue. One connection, serialized by an asyncio lock.
+    Claimed jobs carry a lease (owner + expiry) that the owner renews while it works.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        self.path = path
+        self.lease_seconds = max(1.0, lease_seconds)
+        # Unique per process (and per start), so a restarted worker never matches an old lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        if self._conn is not None:
+            return
+        self._conn = await aiosqlite.connect(self.path, isolation_level=None)
+        self._conn.row_factory = aiosqlite.Row
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.executescript(_SCHEMA)
+        cur = await self._conn.execute("PRAGMA table_info(ingest_jobs)")
+        columns = {row[1] for row in await cur.fetchall()}
+        for column, ddl in _ADDITIVE_COLUMNS:
+            if column not in columns:
+                await self._conn.execute(f"ALTER TABLE ingest_jobs ADD COLUMN {column} {ddl}")
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def enqueue(self, contract_id: str, owner_id: str, file_path: str, file_type: str) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        async with self._lock:
+            await self._conn.execute(
+                "INSERT INTO ingest_jobs (id, contract_id, owner_id, file_path, file_type, state, stage, "
+                "progress, attempts, max_attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', 0, 0, ?, ?, ?, ?)",
+                (job_id, contract_id, owner_id, file_path, file_type, QUEUED,
+                 settings.ingest_max_attempts, now, now, now),
+            )
+        return job_id
+
+    async def record_done(self, contract_id: str, owner_id: str, file_path: str, file_type: str,
+                          result: Dict[str, Any]) -> str:
+        """
+        Insert an already-finished job (work reused from a duplicate upload).
+        """
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        async with self._lock:
+            await self._conn.execute(
+                "INSERT INTO ingest_jobs (id, contract_id, owner_id, file_path, file_type, state, stage, "
+                "progress, attempts, max_attempts, result, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'completed', 1, 0, 0, ?, ?, ?, ?)",
+                (job_id, contract_id, owner_id, file_path, file_type, DONE,
+                 json.dumps(result, ensure_ascii=False), now, now, now),
+            )
+        return job_id
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest runnable job, mark it running and lease it to this
+        process. Runnable: queued and due, or running under a lease that has expired.
+        """
+        now = time.time()
+        async with self._lock:
+            cur = await self._conn.execute(
+                "UPDATE ingest_jobs SET state = ?, attempts = attempts + 1, error = NULL, "
+                "lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = (SELECT id FROM ingest_jobs WHERE (state = ? AND run_after <= ?) "
+                "OR (state = ? AND (lease_expires IS NULL OR lease_expires < ?)) "
+                "ORDER BY created_at LIMIT 1) RETURNING *",
+                (RUNNING, self.owner, now + self.lease_seconds, now, QUEUED, now, RUNNING, now),
+            )
+            row = await cur.fetchone()
+        return dict(row) if row else None
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        async with self._lock:
+            await self._conn.execute(f"UPDATE ingest_jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+
+    async def renew(self, job_id: str) -> bool:
+        """
+        Heartbeat: extend this process' lease on a running job. False if the lease was lost.
+        """
+        now = time.time()
+        async with self._lock:
+            cur = await self._conn.execute(
+                "UPDATE ingest_jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (now + self.lease_seconds, now, job_id, RUNNING, self.owner),
+            )
+        return cur.rowcount > 0
+
+    async def requeue_expired(self) -> int:
+        """
+        Crash recovery: running jobs whose lease has expired (their owner is gone) go back
+        to the queue. Jobs a live sibling process is still renewing are left alone.
+        """
+        now = time.time()
+        async with self._lock:
+            cur = await self._conn.execute(
+                "UPDATE ingest_jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE state = ? AND (lease_expires IS NULL OR lease_expires < ?)",
+                (QUEUED, now, RUNNING, now),
+            )
+        return cur.rowcount
+
+    async def latest_for_contract(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            cur = await self._conn.execute(
+                "SELECT * FROM ingest_jobs WHERE contract_id = ? ORDER BY created_at DESC LIMIT 1",
+                (contract_id,),
+            )
+            row = await cur.fetchone()
+        return dict(row) if row else None
+
+    async def count_state(self, state: str) -> int:
+        async with self._lock:
+            cur = await self._conn.execute("SELECT COUNT(*) FROM ingest_jobs WHERE state = ?", (state,))
+            row = await cur.fetchone()
+        return row[0]
+
+    async def counts(self) -> Dict[str, int]:
+        async with self._lock:
+            cur = await self._conn.execute("SELECT state, COUNT(*) FROM ingest_jobs GROUP BY state")
+            rows = await cur.fetchall()
+        return {r[0]: r[1] for r in rows}
+
+
+class IngestionService:
+    """
+    Owns the queue and the asyncio workers.
+    """
+
+    def __init__(self):
+        self.queue = JobQueue(settings.jobs_db_path, settings.ingest_lease_seconds)
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    async def start(self) -> None:
+        await self.queue.open()
+        await self.queue.requeue_expired()
+        self._stopping = False
+        for i in range(max(1, settings.ingest_workers)):
+            self._workers.append(asyncio.create_task(self._worker_loop(i)))
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        for t in self._workers:
+            t.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        await self.queue.close()
+
+    async def enqueue(self, contract: Contract) -> str:
+        job_id = await self.queue.enqueue(
+            contract_id=str(contract.id),
+            owner_id=str(contract.uploaded_by),
+            file_path=contract.file_path,
+            file_type=contract.file_type.value,
+        )
+        self._wakeup.set()
+        return job_id
+
+    async def find_donor(self, db: AsyncSession, content_hash: Optional[str],
+                         exclude_id: Optional[str] = None) -> Optional[str]:
+        """
+        Id of an already-completed contract with the same bytes whose index is on disk.
+        Any owner qualifies: only derived data is shared, never the contract row.
+        """
+        if not content_hash:
+            return None
+        query = (
+            select(Contract.id)
+            .where(Contract.content_hash == content_hash, Contract.status == ContractStatus.completed)
+            .order_by(Contract.upload_date)
+            .limit(5)
+        )
+        if exclude_id is not None:
+            query = query.where(Contract.id != str(exclude_id))
+        for cid in (await db.execute(query)).scalars():
+            if rag_service.vector_store.exists(cid):
+                return cid
+        return None
+
+    async def complete_duplicate(self, contract: Contract, donor_id: str) -> Optional[str]:
+        """
+        Finish a new contract straight from a donor's artifacts: clone its index for the
+        new owner, write the analysis rows and record a completed job. Returns None (caller should enqueue)
+        unless parsed text, analysis and index are all available.
+        """
+        parsed = artifact_store.get(contract.content_hash, PARSED)
+        analysis = artifact_store.get(contract.content_hash, ANALYSIS)
+        if parsed is None or analysis is None:
+            return None
+        if not await rag_service.clone_contract(donor_id, str(contract.id), str(contract.uploaded_by)):
+            return None
+        await save_analysis(str(contract.id), analysis, body=parsed.get("text", ""))
+        result = {
+            "pages": int(parsed.get("pages", 0) or 0),
+            "language": parsed.get("language", "en"),
+            "analysis": analysis,
+            "reused_from": donor_id,
+        }
+        return await self.queue.record_done(
+            contract_id=str(contract.id),
+            owner_id=str(contract.uploaded_by),
+            file_path=contract.file_path,
+            file_type=contract.file_type.value,
+            result=result,
+        )
+
+    async def backlog(self) -> int:
+        """
+        Jobs waiting to run (used for upload backpressure).
+        """
+        return await self.queue.count_state(QUEUED)
+
+    async def get_status(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.queue.latest_for_contract(str(contract_id))
+        if job is None:
+            return None
+        return {
+            "job_id": job["id"],
+            "state": job["state"],
+            "stage": job["stage"],
+            "progress": job["progress"],
+            "attempts": job["attempts"],
+            "max_attempts": job["max_attempts"],
+            "error": job["error"],
+            "result": json.loads(job["result"]) if job["result"] else None,
+        }
+
+    # ---------------- worker ---------------- #
+
+    async def _worker_loop(self, worker_no: int) -> None:
+        while not self._stopping:
+            job = await self.queue.claim()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    # Poll periodically too, so delayed retries become runnable
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._wakeup.set()  # there may be more; let idle siblings look
+            await self._run_job(job)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await self.queue.renew(job_id):
+                return
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id, contract_id = job["id"], job["contract_id"]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await self._set_contract_status(contract_id, ContractStatus.processing)
+            result = await self._process(job)
+            await self.queue.update(job_id, state=DONE, stage="completed", progress=1.0,
+                                    result=json.dumps(result, ensure_ascii=False))
+            await self._set_contract_status(contract_id, ContractStatus.completed)
+        except asyncio.CancelledError:
+            # Shutdown mid-job: the lease lapses and the job is picked up again
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            retryable = not isinstance(e, PermanentJobError) and job["attempts"] < job["max_attempts"]
+            if retryable:
+                backoff = settings.ingest_retry_backoff_seconds * (2 ** (job["attempts"] - 1))
+                backoff *= 1 + random.random() * 0.25
+                await self.queue.update(job_id, state=QUEUED, error=error, run_after=time.time() + backoff)
+                await self._set_contract_status(contract_id, ContractStatus.pending)
+            else:
+                await self.queue.update(job_id, state=FAILED, error=error)
+                await self._set_contract_status(contract_id, ContractStatus.failed)
+        finally:
+            heartbeat.cancel()
+
+    async def _process(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job_id, contract_id = job["id"], job["contract_id"]
+        content_hash = await self._content_hash(contract_id)
+
+        await self.queue.update(job_id, stage="parsing", progress=0.1)
+        parsed = artifact_store.get(content_hash, PARSED)
+        if parsed is None:
+            if job["file_type"] == "pdf":
+                parsed = await OCRService.extract_text_from_pdf(job["file_path"])
+            else:
+                parsed = await OCRService.extract_text_from_docx(job["file_path"])
+
+        text = parsed.get("text", "") or ""
+        pages = int(parsed.get("pages", 0) or 0)
+        language = parsed.get("language", "en")
+        if not text.strip():
+            raise PermanentJobError("Unable to extract text from file")
+        if not artifact_store.has(content_hash, PARSED):
+            artifact_store.put(content_hash, PARSED, parsed)
+
+        await self.queue.update(job_id, stage="indexing", progress=0.4)
+        async with AsyncSessionLocal() as db:
+            donor_id = await self.find_donor(db, content_hash, exclude_id=contract_id)
+        reused = donor_id is not None and await rag_service.clone_contract(donor_id, contract_id, job["owner_id"])
+        if not reused:
+            await rag_service.index_contract(
+                contract_id=contract_id,
+                text=text,
+                language=language,
+                page_offsets=parsed.get("page_offsets"),
+                owner_id=job["owner_id"],
+            )
+
+        await self.queue.update(job_id, stage="analyzing", progress=0.6)
+        analysis = artifact_store.get(content_hash, ANALYSIS)
+        if analysis is None:
+            analysis = await analyze_service.analyze(contract_id=contract_id)
+            if not analysis.get("degraded"):
+                artifact_store.put(content_hash, ANALYSIS, analysis)
+
+        await self.queue.update(job_id, stage="saving", progress=0.9)
+        if not analysis.get("degraded"):
+            await save_analysis(contract_id, analysis, body=text)
+        else:
+            await search_index.refresh(contract_id, body=text)  # searchable even without analysis
+
+        return {"pages": pages, "language": language, "analysis": analysis}
+
+    async def _content_hash(self, contract_id: str) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            contract = await db.get(Contract, contract_id)
+            return contract.content_hash if contract is not None else None
+
+    async def _set_contract_status(self, contract_id: str, status: ContractStatus) -> None:
+        async with AsyncSessionLocal() as db:
+            contract = await db.get(Contract, contract_id)
+            if contract is None:
+                return
+            contract.status = status
+            await db.commit()
+            user_cache.invalidate(contract.uploaded_by)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"workers": len(self._workers), "jobs": await self.queue.counts()}
+
+
+ingestion_service = IngestionService()
@@ -0,0 +1,301 @@
+"""
+LLM Client
+- Single async entrypoint for every model call (extraction, risks, summary, chat, analyze)
+- Bounded concurrency (semaphore), per-call timeout, retries with exponential backoff + jitter
+- Pluggable backends: Gemini (default) and a local fake for tests/benchmarks
+- Response cache keyed by prompt fingerprint (see llm_cache.py); identical
+  requests already in flight share one backend call. If the request making that call is
+  cancelled (client went away), the waiting requests retry instead of failing with it
+
+Services get a model handle that mirrors GenerativeModel.generate_content, but awaitable:
+    self.model = llm_client.model("gemini-2.5-flash", generation_config={...})
+    resp = await self.model.generate_content(contents=[...])
+    resp.text
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import json
+import random
+
+from src.config.settings import get_settings
+from src.services.llm_cache import LLMCache, fingerprint
+
+settings = get_settings()
+
+# Exception class names (from google.api_core and friends) worth retrying
+_RETRYABLE_ERRORS = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "Aborted",
+}
+
+
+class _LeaderCancelled(Exception):
+    """Set on a coalesced call whose leader was cancelled; followers retry on their own."""
+
+
+class LLMResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMBackend:
+    """
+    Backend interface: produce the raw response text for one request.
+    """
+
+    name = "base"
+
+    async def generate(
+        self,
+        model_name: str,
+        generation_config: Dict[str, Any],
+        contents: List[Dict[str, Any]],
+    ) -> str:
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """
+    google-generativeai backend. Imports and configures the SDK once, on first use
+    (not at import time), and reuses GenerativeModel instances per (model, generation_config).
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        self._api_key = api_key
+        self._genai = None
+        self._models: Dict[str, Any] = {}
+
+    def _sdk(self):
+        if self._genai is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=self._api_key)
+            self._genai = genai
+        return self._genai
+
+    def _model(self, model_name: str, generation_config: Dict[str, Any]):
+        key = model_name + json.dumps(generation_config, sort_keys=True)
+        model = self._models.get(key)
+        if model is None:
+            model = self._sdk().GenerativeModel(model_name=model_name, generation_config=generation_config)
+            self._models[key] = model
+        return model
+
+    async def generate(self, model_name, generation_config, contents) -> str:
+        model = self._model(model_name, generation_config)
+        if hasattr(model, "generate_content_async"):
+            resp = await model.generate_content_async(contents=contents)
+        else:
+            resp = await asyncio.to_thread(model.generate_content, contents=contents)
+        return resp.text
+
+
+class FakeBackend(LLMBackend):
+    """
+    Local stand-in: sleeps for `latency` seconds, then returns `responder(model_name, contents)`
+    (default: an empty JSON object, which every service handles with its own defaults).
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        responder: Optional[Callable[[str, List[Dict[str, Any]]], str]] = None,
+    ):
+        self.latency = latency
+        self.responder = responder or (lambda model_name, contents: "{}")
+        self.calls = 0
+
+    async def generate(self, model_name, generation_config, contents) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.responder(model_name, contents)
+
+
+class LLMClient:
+    """
+    Wraps a backend with a concurrency limit, timeout and retry policy.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[LLMBackend],
+        max_concurrency: int = 8,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.backend_calls = 0
+        self.coalesced = 0
+
+    @property
+    def configured(self) -> bool:
+        return self.backend is not None
+
+    def model(self, model_name: str, generation_config: Optional[Dict[str, Any]] = None) -> Optional["LLMModel"]:
+        """
+        Handle for a model, or None when no backend is configured (services treat that as "AI off").
+        """
+        if self.backend is None:
+            return None
+        return LLMModel(self, model_name, generation_config or {})
+
+    async def generate(
+        self,
+        model_name: str,
+        generation_config: Dict[str, Any],
+        contents: List[Dict[str, Any]],
+        use_cache: bool = True,
+    ) -> LLMResponse:
+        if self.backend is None:
+            raise RuntimeError("LLM backend not configured")
+
+        if self.cache is None or not use_cache:
+            return LLMResponse(await self._call(model_name, generation_config, contents))
+
+        key = fingerprint(model_name, generation_config, contents)
+        text = await self.cache.get(key)
+        if text is not None:
+            return LLMResponse(text)
+
+        pending = self._inflight.get(key)
+        while pending is not None:
+            self.coalesced += 1
+            try:
+                return LLMResponse(await asyncio.shield(pending))
+            except _LeaderCancelled:
+                # The first follower to wake up becomes the new leader; the rest join it
+                pending = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._call(model_name, generation_config, contents)
+            if _cacheable(generation_config, text):
+                await self.cache.put(key, model_name, text)
+            future.set_result(text)
+            return LLMResponse(text)
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _call(
+        self,
+        model_name: str,
+        generation_config: Dict[str, Any],
+        contents: List[Dict[str, Any]],
+    ) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.backend_calls += 1
+                    return await asyncio.wait_for(
+                        self.backend.generate(model_name, generation_config, contents),
+                        timeout=self.timeout,
+                    )
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                # Full jitter: sleep U(0, base * 2^attempt)
+                await asyncio.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+                attempt += 1
+
+    async def close(self) -> None:
+        if self.cache is not None:
+            await self.cache.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name if self.backend is not None else None,
+            "backend_calls": self.backend_calls,
+            "coalesced": self.coalesced,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+class LLMModel:
+    """
+    Bound (client, model, generation_config) handle used by the services.
+    """
+
+    def __init__(self, client: LLMClient, model_name: str, generation_config: Dict[str, Any]):
+        self.client = client
+        self.model_name = model_name
+        self.generation_config = generation_config
+
+    async def generate_content(self, contents: List[Dict[str, Any]], use_cache: bool = True) -> LLMResponse:
+        return await self.client.generate(self.model_name, self.generation_config, contents, use_cache=use_cache)
+
+
+def _is_retryable(e: Exception) -> bool:
+    if isinstance(e, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return type(e).__name__ in _RETRYABLE_ERRORS
+
+
+def _cacheable(generation_config: Dict[str, Any], text: str) -> bool:
+    """
+    Never cache empty output, or JSON-mode output that doesn't parse (a retry may do better).
+    """
+    if not text or not text.strip():
+        return False
+    if generation_config.get("response_mime_type") == "application/json":
+        try:
+            json.loads(text)
+        except ValueError:
+            return False
+    return True
+
+
+def _build_cache() -> Optional[LLMCache]:
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMCache(
+        path=settings.llm_cache_path or None,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_entries=settings.llm_cache_max_entries,
+        memory_entries=settings.llm_cache_memory_entries,
+    )
+
+
+def _build_backend() -> Optional[LLMBackend]:
+    backend = (settings.llm_backend or "gemini").lower()
+    if backend == "fake":
+        return FakeBackend(latency=settings.llm_fake_latency_ms / 1000.0)
+    if backend == "gemini":
+        return GeminiBackend(settings.gemini_api_key) if settings.gemini_api_key else None
+    raise ValueError(f"Unknown LLM_BACKEND: {settings.llm_backend}")
+
+
+llm_client = LLMClient(
+    backend=_build_backend(),
+    max_concurrency=settings.llm_max_concurrency,
+    timeout=settings.llm_timeout_seconds,
+    max_retries=settings.llm_max_retries,
+    cache=_build_cache(),
+)
@@ -0,0 +1,167 @@
+"""
+LLM Response Cache
+- Keyed by a SHA-256 fingerprint of model name + generation config + prompt contents
+- Two tiers: in-memory LRU (hot) in front of a persistent SQLite table (survives restarts)
+- TTL on every entry, size-bound eviction (LRU by last access) in both tiers
+- Hit/miss counters for /metrics
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import time
+
+import aiosqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access);
+"""
+
+# Run disk eviction every N writes rather than on each one
+_EVICT_EVERY = 64
+
+
+def fingerprint(model_name: str, generation_config: Dict[str, Any], contents: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(
+        {"model": model_name, "config": generation_config, "contents": contents},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+
+    def __init__(self, path: Optional[str], ttl_seconds: float, max_entries: int, memory_entries: int):
+        self.path = path
+        self.ttl = float(ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self.memory_entries = max(0, memory_entries)
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self._writes_since_evict = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    async def _db(self) -> Optional[aiosqlite.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None:
+            conn = await aiosqlite.connect(self.path, isolation_level=None)
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def _remember(self, key: str, expires_at: float, text: str) -> None:
+        if self.memory_entries == 0:
+            return
+        self._memory[key] = (expires_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        hit = self._memory.get(key)
+        if hit is not None:
+            expires_at, text = hit
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+            del self._memory[key]
+
+        async with self._lock:
+            db = await self._db()
+            row = None
+            if db is not None:
+                cur = await db.execute("SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,))
+                row = await cur.fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        await db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                    else:
+                        await db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, row[1], row[0])
+        return row[0]
+
+    async def put(self, key: str, model_name: str, text: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl
+        self._remember(key, expires_at, text)
+        self.writes += 1
+
+        async with self._lock:
+            db = await self._db()
+            if db is None:
+                return
+            await db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, text, now, expires_at, now),
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= _EVICT_EVERY:
+                self._writes_since_evict = 0
+                await self._evict(db, now)
+
+    async def _evict(self, db: aiosqlite.Connection, now: float) -> None:
+        cur = await db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        removed = max(0, cur.rowcount)
+        cur = await db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        removed += max(0, cur.rowcount)
+        self.evictions += removed
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        async with self._lock:
+            db = await self._db()
+            if db is not None:
+                await db.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
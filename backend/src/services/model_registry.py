@@ -0,0 +1,118 @@
+"""
+Model Registry
+- Owns the process' embedding model; nothing heavy is imported or loaded at import time,
+  so `import main`, scripts and tools that never embed stay fast
+- embedding_model(): the one shared embedding backend (EMBEDDINGS_MODEL run by
+  EMBEDDINGS_BACKEND: torch, int8 or onnx), loaded on first use and reused by every service
+- load_embedding_model(): the same from async code; a cold load runs in a thread, so the
+  first request after a lazy start doesn't block the event loop
+- warm_up(): load + one tiny encode during lifespan (EMBEDDINGS_WARMUP), before traffic arrives
+- preload(): load weights in the parent of a pre-fork server (EMBEDDINGS_PRELOAD with
+  gunicorn --preload) so workers share them copy-on-write; no inference in the parent,
+  torch's thread pools do not survive fork
+- A failed load is retried after EMBEDDINGS_RETRY_SECONDS, not on every call
+"""
+
+from typing import Any, Dict, Optional
+import asyncio
+import threading
+import time
+
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+
+class ModelRegistry:
+
+    def __init__(self, embeddings_model: str, embeddings_backend: str = "torch", retry_seconds: float = 60.0):
+        self.embeddings_model = embeddings_model
+        self.embeddings_backend = embeddings_backend
+        self.retry_seconds = retry_seconds
+        self._embedding: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._failed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.import_seconds: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.warmed = False
+        self.preloaded = False
+
+    @property
+    def embedding_loaded(self) -> bool:
+        return self._embedding is not None
+
+    def embedding_model(self) -> Optional[Any]:
+        """
+        The shared embedding model, loading it if needed; None if it can't be loaded.
+        Blocking on a cold load: from async code use load_embedding_model().
+        """
+        if self._embedding is not None:
+            return self._embedding
+        with self._lock:
+            if self._embedding is not None:
+                return self._embedding
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_seconds:
+                return None
+            t0 = time.perf_counter()
+            try:
+                from src.services.embedding_backends import load_backend
+
+                t1 = time.perf_counter()
+                model = load_backend(self.embeddings_backend, self.embeddings_model)
+            except Exception as e:
+                self._failed_at = time.monotonic()
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(
+                    f"⚠️  Embedding model unavailable ({self.embeddings_model}, "
+                    f"{self.embeddings_backend}): {self.last_error}"
+                )
+                return None
+            self.import_seconds = t1 - t0
+            self.load_seconds = time.perf_counter() - t1
+            self._failed_at = None
+            self.last_error = None
+            self._embedding = model
+            return model
+
+    async def load_embedding_model(self) -> Optional[Any]:
+        if self._embedding is not None:
+            return self._embedding
+        return await asyncio.to_thread(self.embedding_model)
+
+    async def warm_up(self) -> bool:
+        """
+        Load the embedding model and run one encode (first-call allocations, kernels).
+        """
+        model = await self.load_embedding_model()
+        if model is None:
+            return False
+        await asyncio.to_thread(model.encode, ["warm up"], normalize_embeddings=True, convert_to_numpy=True)
+        self.warmed = True
+        return True
+
+    def preload(self) -> bool:
+        """
+        Load weights in the current (parent) process before workers are forked.
+        """
+        self.preloaded = self.embedding_model() is not None
+        return self.preloaded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "embedding": {
+                "model": self.embeddings_model,
+                "backend": self.embeddings_backend,
+                "loaded": self.embedding_loaded,
+                "preloaded": self.preloaded,
+                "warmed": self.warmed,
+                "import_s": round(self.import_seconds, 3) if self.import_seconds is not None else None,
+                "load_s": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+                "last_error": self.last_error,
+            },
+        }
+
+
+model_registry = ModelRegistry(
+    settings.embeddings_model, settings.embeddings_backend, settings.embeddings_retry_seconds,
+)
@@ -1,83 +1,128 @@
-import os
-from typing import Dict, Any
-from io import BytesIO
+from typing import Dict, Any, List, Optional, Iterable
 
-from pdfminer.high_level import extract_text
 from pypdf import PdfReader
 from docx import Document
 from langdetect import detect
 
-from pdfminer.high_level import extract_text_to_fp
-from pdfminer.layout import LAParams
-from io import StringIO
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTContainer, LTText, LTTextBox, LTItem
 
+from src.config.settings import get_settings
 from src.utils.text import normalize_ar_digits, strip_tatweel, clean_spaces
 from src.utils.text import strip_long_underscores
+
+settings = get_settings()
+
+# Separator between pages in the joined text (page_offsets account for it)
+PAGE_SEP = "\n"
+# Below this many characters the text layer is treated as missing (scanned PDF)
+MIN_TEXT_CHARS = 50
+
+
 class OCRService:
 
     @staticmethod
     async def extract_text_from_pdf(file_path: str) -> Dict[str, Any]:
         """
-        Extract text from a PDF. If text layer missing (scanned PDF),
-        fallback to OCR service (future extension: Azure / Doctr).
+        Async entrypoint; parses in the parse process pool (see parse_pdf).
+        Large PDFs are split into page ranges parsed in parallel worker processes.
+        """
+        import asyncio
+        from src.services.executors import parse_pool
+
+        min_pages = settings.pdf_parallel_min_pages
+        if min_pages > 0:
+            pages = await parse_pool.run(count_pdf_pages, file_path)
+            if pages >= min_pages:
+                step = max(1, settings.pdf_pages_per_task)
+                # At most one range per worker in flight, so a long PDF never overruns the pool's queue
+                slots = asyncio.Semaphore(parse_pool.max_workers)
+
+                async def parse_range(start: int) -> List[str]:
+                    async with slots:
+                        return await parse_pool.run(parse_pdf_page_range, file_path, start, min(pages, start + step))
+
+                tasks = [asyncio.ensure_future(parse_range(start)) for start in range(0, pages, step)]
+                try:
+                    parts = await asyncio.gather(*tasks)
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    raise
+                norm_pages = [t for part in parts for t in part]
+                return OCRService._assemble_pdf(file_path, norm_pages)
+
+        return await parse_pool.run(parse_document, file_path, "pdf")
+
+    @staticmethod
+    async def extract_text_from_docx(file_path: str) -> Dict[str, Any]:
+        """
+        Async entrypoint; parses in the parse process pool (see parse_docx).
+        """
+        from src.services.executors import parse_pool
+        return await parse_pool.run(parse_document, file_path, "docx")
+
+    @staticmethod
+    def parse_pdf(file_path: str) -> Dict[str, Any]:
+        """
+        Extract text from a PDF in a single pdfminer pass over the pages.
+        If text layer missing (scanned PDF), fallback to OCR service (future extension: Azure / Doctr).
         Returns: { text: str, pages: int, language: str, page_offsets: List[int] }
         page_offsets[i] = starting character offset of page i within the normalized full text.
         """
         try:
-            # Count pages with pypdf
-            with open(file_path, "rb") as f:
-                reader = PdfReader(f)
-                pages = len(reader.pages)
-
-            # Per-page extraction with pdfminer to compute page_offsets
-            page_texts = []
-            for i in range(pages):
-                buf = StringIO()
-                with open(file_path, "rb") as f2:
-                    extract_text_to_fp(f2, buf, laparams=LAParams(), page_numbers=[i])
-                page_texts.append(buf.getvalue() or "")
-
-            # Normalize each page then join to single text
-            norm_pages = [OCRService._preprocess_text(t) for t in page_texts]
-            text = "".join(norm_pages) or ""
-
-            # Fallback to whole-file text if result is too small (handles odd PDFs)
-            if len(text.strip()) < 50:
-                text = extract_text(file_path) or ""
-                if len(text.strip()) < 50:
-                    text = await OCRService._fallback_ocr_pdf(file_path)
-                text = OCRService._preprocess_text(text)
-                # If we didn’t build page-wise text, just return no offsets
-                page_offsets = []
-            else:
-                # Build page_offsets over normalized pages
-                page_offsets = []
-                acc = 0
-                for pt in norm_pages:
-                    page_offsets.append(acc)
-                    acc += len(pt)
-
-            language = OCRService._detect_language(text)
-
-            return {
-                "text": text,
-                "pages": pages,
-                "language": language,
-                "page_offsets": page_offsets,  # may be [] if unknown
-            }
-
+            norm_pages = OCRService.extract_page_texts(file_path)
+            return OCRService._assemble_pdf(file_path, norm_pages)
         except Exception as e:
             raise Exception(f"PDF extraction error: {str(e)}")
 
     @staticmethod
-    async def extract_text_from_docx(file_path: str) -> Dict[str, Any]:
+    def extract_page_texts(file_path: str, page_numbers: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Normalized text per page. The document is opened and parsed once; pages are
+        streamed with a shared LAParams (same output as pdfminer's text converter).
+        """
+        laparams = LAParams()
+        out: List[str] = []
+        pages = set(page_numbers) if page_numbers is not None else None
+        for layout in extract_pages(file_path, page_numbers=pages, laparams=laparams):
+            out.append(OCRService._preprocess_text(_layout_text(layout)))
+        return out
+
+    @staticmethod
+    def _assemble_pdf(file_path: str, norm_pages: List[str]) -> Dict[str, Any]:
+        """
+        Join normalized pages, computing page_offsets on the way; OCR fallback when empty.
+        """
+        page_offsets: List[int] = []
+        acc = 0
+        for i, pt in enumerate(norm_pages):
+            page_offsets.append(acc)
+            acc += len(pt) + (len(PAGE_SEP) if i < len(norm_pages) - 1 else 0)
+        text = PAGE_SEP.join(norm_pages)
+
+        if len(text.strip()) < MIN_TEXT_CHARS:
+            # No usable text layer: OCR; page boundaries are unknown
+            text = OCRService._preprocess_text(OCRService._fallback_ocr_pdf(file_path) or "")
+            page_offsets = []
+
+        return {
+            "text": text,
+            "pages": len(norm_pages),
+            "language": OCRService._detect_language(text),
+            "page_offsets": page_offsets,  # may be [] if unknown
+        }
+
+    @staticmethod
+    def parse_docx(file_path: str) -> Dict[str, Any]:
         """
         Extract from a DOCX.
         Returns: { text: str, pages: int (est), language: str }
         """
         try:
             doc = Document(file_path)
-            text = " ".join([p.text for p in doc.paragraphs])
+            # One paragraph per line, so headings stay detectable for chunking
+            text = "\n".join([p.text for p in doc.paragraphs])
             text = OCRService._preprocess_text(text)
 
             pages = max(1, len(text) // 2000)
@@ -96,7 +141,7 @@ class OCRService:
     # ---------------- INTERNAL HELPERS ---------------- #
 
     @staticmethod
-    async def _fallback_ocr_pdf(file_path: str) -> str:
+    def _fallback_ocr_pdf(file_path: str) -> str:
         """
         Future OCR fallback logic (Azure Document Intelligence or Doctr).
         Currently returns empty string until OCR added.
@@ -127,4 +172,45 @@ class OCRService:
             lang = detect(text)
             return "ar" if lang.startswith("ar") else "en"
         except Exception:
-            return "en"
\ No newline at end of file
+            return "en"
+
+
+def parse_document(file_path: str, file_type: str) -> Dict[str, Any]:
+    """
+    Synchronous, picklable entrypoint for worker processes.
+    file_type: 'pdf' or 'docx'
+    """
+    if file_type == "pdf":
+        return OCRService.parse_pdf(file_path)
+    return OCRService.parse_docx(file_path)
+
+
+def count_pdf_pages(file_path: str) -> int:
+    with open(file_path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def parse_pdf_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    Normalized texts for pages [start, end); used for parallel parsing of large PDFs.
+    """
+    return OCRService.extract_page_texts(file_path, range(start, end))
+
+
+def _layout_text(item: LTItem) -> str:
+    """
+    Text of a pdfminer layout tree, rendered like pdfminer's TextConverter.
+    """
+    parts: List[str] = []
+
+    def render(it: LTItem) -> None:
+        if isinstance(it, LTContainer):
+            for child in it:
+                render(child)
+        elif isinstance(it, LTText):
+            parts.append(it.get_text())
+        if isinstance(it, LTTextBox):
+            parts.append("\n")
+
+    render(item)
+    return "".join(parts)
@@ -0,0 +1,323 @@
+"""
+Analysis Persistence
+- Maps the analysis JSON (extracted / risks / summary) onto the normalized tables:
+  ContractParty, KeyDate, FinancialTerm, Risk, Clause and the Contract summary columns
+- One transaction per contract: delete the previous derived rows, then one batched
+  insert() per table; re-running it for the same analysis leaves the same rows
+- Risks are marked source=analysis; only those are replaced, risks users added stay
+- Called by the ingestion worker and the duplicate-upload path, so list/detail/dashboard
+  reads are plain DB queries and analysis runs once per contract
+- Also refreshes the contract's full-text search entry in the same transaction
+- The LLM output is loosely shaped; anything that cannot be mapped is skipped, not guessed
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime
+import re
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import AsyncSessionLocal
+from src.models.contract import (
+    Contract, ContractParty, PartyType, PartyRole, KeyDate, DateType, FinancialTerm, TermType,
+)
+from src.models.risk import Risk, RiskType, RiskSeverity, RiskSource
+from src.models.clause import Clause, RiskLevel
+from src.services.search_index import search_index
+
+_DERIVED = (ContractParty, KeyDate, FinancialTerm, Risk, Clause)
+
+_ROLE_WORDS = {
+    PartyRole.client: ("client", "customer", "buyer", "purchaser", "licensee", "employer"),
+    PartyRole.vendor: ("vendor", "supplier", "provider", "contractor", "seller", "licensor", "consultant"),
+    PartyRole.partner: ("partner",),
+}
+_INDIVIDUAL_WORDS = ("individual", "person", "natural")
+
+_TERM_WORDS = [
+    (TermType.penalty, ("penalt", "late", "liquidated", "interest")),
+    (TermType.deposit, ("deposit", "advance", "retainer", "security")),
+    (TermType.payment, ("payment", "fee", "price", "total", "value", "amount", "invoice", "rate", "compensation")),
+]
+_CURRENCIES = {"$": "USD", "€": "EUR", "£": "GBP", "ر.ق": "QAR"}
+_CURRENCY_RE = re.compile(r"\b(USD|QAR|SAR|AED|EUR|GBP)\b|(\$|€|£|ر\.ق)", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?")
+
+_SEVERITIES = {s.value for s in RiskSeverity}
+
+
+# ---------------- value helpers ---------------- #
+
+def _text(value: Any, *keys: str) -> Optional[str]:
+    """
+    A string from a value that may be a string or a dict holding one under `keys`.
+    """
+    if isinstance(value, dict):
+        for k in keys:
+            if value.get(k) not in (None, ""):
+                return _text(value[k])
+        return None
+    if value is None or isinstance(value, (list, bool)):
+        return None
+    s = str(value).strip()
+    return s or None
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    raw = _text(value, "iso", "normalized", "value", "date", "raw")
+    if not raw:
+        return None
+    for candidate in (raw, raw[:10]):
+        try:
+            return datetime.fromisoformat(candidate.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _NUMBER_RE.search(str(value or ""))
+    return float(m.group(0).replace(",", "")) if m else None
+
+
+def _currency(*values: Any) -> Optional[str]:
+    for v in values:
+        m = _CURRENCY_RE.search(str(v or ""))
+        if m:
+            return m.group(1).upper() if m.group(1) else _CURRENCIES[m.group(2)]
+    return None
+
+
+def _match_words(text: str, table: Iterable, default: Any) -> Any:
+    low = (text or "").lower()
+    for value, words in table:
+        if any(w in low for w in words):
+            return value
+    return default
+
+
+def _items(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return value
+    return [value] if value else []
+
+
+# ---------------- mappers ---------------- #
+
+def _party_rows(contract_id: str, parties: Any) -> List[Dict[str, Any]]:
+    rows, seen = [], set()
+    for p in _items(parties):
+        name = _text(p, "name", "party", "legal_name")
+        if not name or name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        info = p if isinstance(p, dict) else {}
+        descriptor = " ".join(str(info.get(k) or "") for k in ("role", "type", "description"))
+        rows.append({
+            "contract_id": contract_id,
+            "name": name[:255],
+            "type": PartyType.individual
+            if any(w in str(info.get("type") or "").lower() for w in _INDIVIDUAL_WORDS)
+            else PartyType.organization,
+            "role": _match_words(descriptor, _ROLE_WORDS.items(), PartyRole.other),
+        })
+    return rows
+
+
+def _date_rows(contract_id: str, dates: Any) -> List[Dict[str, Any]]:
+    if isinstance(dates, list):
+        pairs = [(_text(d, "type", "date_type", "name") or "other", d) for d in dates]
+    elif isinstance(dates, dict):
+        pairs = list(dates.items())
+    else:
+        return []
+    known = {t.value for t in DateType}
+    rows = []
+    for key, value in pairs:
+        for v in _items(value):
+            when = _parse_date(v)
+            if when is None:
+                continue
+            key_norm = str(key).strip().lower().replace(" ", "_")
+            rows.append({
+                "contract_id": contract_id,
+                "date_type": DateType(key_norm) if key_norm in known else DateType.other,
+                "date": when,
+                "description": _text(v, "raw", "description") if isinstance(v, dict) else str(key),
+            })
+    return rows
+
+
+def _term_rows(contract_id: str, terms: Any) -> List[Dict[str, Any]]:
+    default_currency = None
+    if isinstance(terms, dict):
+        default_currency = _text(terms.get("currency"))
+        pairs = [(k, v) for k, value in terms.items() if k != "currency" for v in _items(value)]
+    else:
+        pairs = [("", v) for v in _items(terms)]
+    rows = []
+    for key, v in pairs:
+        info = v if isinstance(v, dict) else {}
+        if info:
+            amount = _parse_amount(info.get("amount", info.get("value")))
+        elif isinstance(v, (int, float)) or _currency(v):
+            amount = _parse_amount(v)
+        else:
+            amount = None  # free text such as "Net 30" is not an amount
+        if amount is None:
+            continue
+        label = " ".join(str(x or "") for x in (key, info.get("type"), info.get("term_type"), info.get("description")))
+        description = _text(info, "description", "raw", "text") if info else None
+        rows.append({
+            "contract_id": contract_id,
+            "term_type": _match_words(label, _TERM_WORDS, TermType.other),
+            "amount": amount,
+            "currency": (
+                _text(info, "currency") or _currency(info.get("amount"), info.get("raw"), v) or default_currency or "USD"
+            )[:8],
+            "schedule": _text(info, "schedule", "frequency", "due"),
+            "description": description or (str(key) or None),
+        })
+    return rows
+
+
+def _severity(item: Dict[str, Any], default: str = "medium") -> RiskSeverity:
+    sev = str(item.get("severity") or default).strip().lower()
+    return RiskSeverity(sev if sev in _SEVERITIES else default)
+
+
+def _risk_rows(contract_id: str, risks: Any) -> List[Dict[str, Any]]:
+    if not isinstance(risks, dict):
+        return []
+    rows = []
+    for key, risk_type in (("risks", RiskType.compliance), ("non_standard", RiskType.non_standard)):
+        for item in _items(risks.get(key)):
+            if not isinstance(item, dict):
+                item = {"title": str(item)}
+            title = _text(item, "title", "id", "finding")
+            if not title:
+                continue
+            evidence = [str(c) for c in _items(item.get("evidence_chunks"))]
+            rows.append({
+                "contract_id": contract_id,
+                "risk_type": risk_type,
+                "severity": _severity(item),
+                "title": title[:255],
+                "description": _text(item, "finding", "description", "why") or title,
+                "recommendation": _text(item, "recommendation"),
+                "clause_reference": ",".join(evidence)[:255] or None,
+                "source": RiskSource.analysis,
+            })
+    for item in _items(risks.get("missing_clauses")):
+        clause = _text(item, "clause", "title", "name")
+        if not clause:
+            continue
+        if not isinstance(item, dict):
+            item = {}
+        rows.append({
+            "contract_id": contract_id,
+            "risk_type": RiskType.missing_clause,
+            "severity": _severity(item),
+            "title": f"Missing clause: {clause}"[:255],
+            "description": _text(item, "why", "finding", "description") or clause,
+            "recommendation": _text(item, "recommendation"),
+            "clause_reference": None,
+            "source": RiskSource.analysis,
+        })
+    return rows
+
+
+def _clause_rows(contract_id: str, risks: Any) -> List[Dict[str, Any]]:
+    """
+    Non-standard clauses flagged by the review, kept as Clause rows (is_standard=False).
+    """
+    if not isinstance(risks, dict):
+        return []
+    levels = {"low": RiskLevel.low, "medium": RiskLevel.medium, "high": RiskLevel.high, "critical": RiskLevel.high}
+    rows = []
+    for item in _items(risks.get("non_standard")):
+        if not isinstance(item, dict):
+            continue
+        content = _text(item, "snippet", "text", "finding", "description")
+        if not content:
+            continue
+        evidence = _items(item.get("evidence_chunks"))
+        rows.append({
+            "contract_id": contract_id,
+            "clause_type": (_text(item, "clause", "title", "id") or "non_standard")[:255],
+            "content": content,
+            "section_number": str(evidence[0]) if evidence else None,
+            "is_standard": False,
+            "risk_level": levels.get(_severity(item).value),
+        })
+    return rows
+
+
+def _contract_values(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    extracted = analysis.get("extracted") or {}
+    summary = analysis.get("summary") or {}
+    law = extracted.get("governing_law")
+    values = {
+        "summary": _text(summary, "summary"),
+        "purpose": _text(summary, "purpose"),
+        "scope": _text(summary, "scope"),
+        "governing_law": _text(law, "law", "governing_law", "value", "name"),
+        "jurisdiction": _text(law, "jurisdiction", "venue", "forum") if isinstance(law, dict) else None,
+    }
+    if _text(extracted.get("contract_type")):
+        values["contract_type"] = _text(extracted.get("contract_type"))
+    return values
+
+
+def analysis_rows(contract_id: str, analysis: Dict[str, Any]) -> Dict[Any, List[Dict[str, Any]]]:
+    """
+    {model: [row dict, ...]} for every derived table.
+    """
+    extracted = analysis.get("extracted") or {}
+    risks = analysis.get("risks") or {}
+    return {
+        ContractParty: _party_rows(contract_id, extracted.get("parties")),
+        KeyDate: _date_rows(contract_id, extracted.get("dates")),
+        FinancialTerm: _term_rows(contract_id, extracted.get("financial_terms")),
+        Risk: _risk_rows(contract_id, risks),
+        Clause: _clause_rows(contract_id, risks),
+    }
+
+
+async def persist_analysis(db: AsyncSession, contract_id: str, analysis: Dict[str, Any],
+                           body: Optional[str] = None) -> Dict[str, int]:
+    """
+    Replace the contract's derived rows with the ones in `analysis` and reindex it for
+    search (with `body` as its text, when given). Caller commits. Returns row counts per table.
+    """
+    rows = analysis_rows(contract_id, analysis or {})
+    for model in _DERIVED:
+        stmt = delete(model).where(model.contract_id == contract_id)
+        if model is Risk:
+            stmt = stmt.where(Risk.source == RiskSource.analysis)
+        await db.execute(stmt)
+    counts = {}
+    for model, batch in rows.items():
+        if batch:
+            # executemany: one statement per table, not one ORM flush per object
+            await db.execute(insert(model), batch)
+        counts[model.__tablename__] = len(batch)
+    values = {k: v for k, v in _contract_values(analysis or {}).items() if v is not None}
+    if values:
+        await db.execute(update(Contract).where(Contract.id == contract_id).values(**values))
+    await search_index.index_contract(db, contract_id, body=body)
+    return counts
+
+
+async def save_analysis(contract_id: str, analysis: Dict[str, Any], body: Optional[str] = None) -> Dict[str, int]:
+    """
+    persist_analysis in its own session and transaction.
+    """
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            return await persist_analysis(db, contract_id, analysis, body=body)
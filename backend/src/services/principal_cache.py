@@ -0,0 +1,117 @@
+"""
+Principal Cache
+- The authenticated user as routes see it (Principal: id, email, role, token_version),
+  so get_current_user does not load the User row on every request
+- TTL-bound LRU keyed by (user id, token version); a token minted before the user's
+  current version never matches a cached entry
+- invalidate(user_id, token_version) drops the user's entries and records the minimum
+  valid version, so revoked tokens are refused without a DB lookup
+- Signed claims mode (AUTH_SIGNED_CLAIMS): role/email come from the verified token and
+  authentication is only the signature check; revocation then relies on this process'
+  version floor and the token expiry
+"""
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+
+from src.config.settings import get_settings
+from src.models.user import User, UserRole
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: str
+    email: str
+    role: UserRole
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role, token_version=user.token_version or 0)
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> Optional["Principal"]:
+        """
+        Principal from verified token claims; None if they lack email/role (older tokens).
+        """
+        try:
+            return cls(
+                id=str(claims["sub"]),
+                email=str(claims["email"]),
+                role=UserRole(claims["role"]),
+                token_version=int(claims.get("ver", 0)),
+            )
+        except (KeyError, ValueError):
+            return None
+
+    def claims(self) -> Dict[str, Any]:
+        return {"sub": self.id, "ver": self.token_version, "email": self.email, "role": self.role.value}
+
+
+class PrincipalCache:
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl = float(ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Principal]]" = OrderedDict()
+        self._min_version: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revoked = 0
+        self.invalidations = 0
+
+    def is_revoked(self, user_id: str, token_version: int) -> bool:
+        if token_version < self._min_version.get(str(user_id), 0):
+            self.revoked += 1
+            return True
+        return False
+
+    def get(self, user_id: str, token_version: int) -> Optional[Principal]:
+        key: Hashable = (str(user_id), int(token_version))
+        hit = self._entries.get(key)
+        if hit is None or hit[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return hit[1]
+
+    def set(self, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        key = (principal.id, principal.token_version)
+        self._entries[key] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, token_version: Optional[int] = None) -> None:
+        """
+        Forget the user's cached principals (role/email changed, tokens revoked).
+        With token_version, tokens below it are refused from now on.
+        """
+        user_id = str(user_id)
+        for key in [k for k in self._entries if k[0] == user_id]:
+            del self._entries[key]
+        if token_version is not None:
+            self._min_version[user_id] = max(self._min_version.get(user_id, 0), int(token_version))
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "mode": "signed_claims" if settings.auth_signed_claims else "cached_lookup",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "revoked": self.revoked,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(settings.principal_cache_ttl_seconds, settings.principal_cache_max_entries)
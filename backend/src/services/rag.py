@@ -1,30 +1,31 @@
 """
 RAG (Retrieval-Augmented Generation) Service
-- Chunking, embeddings (multilingual), FAISS vector index
+- Chunking (shared engine, see chunking.py), embeddings (multilingual), FAISS vector index
 - Per-contract semantic search and context assembly
+- Indexes persisted on disk (see vector_store.py), loaded lazily after restarts; contracts
+  indexed, re-indexed or deleted by another worker process are picked up on the next read
+- One global ANN index for portfolio-wide search (see global_index.py)
+- Embedding runs in worker threads (see executors.py), never on the event loop, and
+  concurrent calls are micro-batched into shared forward passes (see embedding_batcher.py)
+- Query embeddings cached (LRU + pinned static queries); multi-query search runs
+  as one matrix search per contract
+- The embedding model comes from the shared model registry (loaded lazily, once per process)
 """
 
 from typing import List, Dict, Optional, Tuple, Any
-import os
-import math
+from collections import OrderedDict
 import numpy as np
 import faiss
 
-import google.generativeai as genai
-from sentence_transformers import SentenceTransformer
-
 from src.config.settings import get_settings
+from src.services.vector_store import VectorStore
+from src.services.global_index import GlobalIndex
+from src.services.embedding_batcher import document_batcher, query_batcher
+from src.services.chunking import document_cache, RAG_WINDOW
+from src.services.model_registry import model_registry
 
 settings = get_settings()
 
-DEFAULT_EMBEDDINGS_MODEL = getattr(
-    settings, "embeddings_model", "intfloat/multilingual-e5-small"
-)
-
-def _normalize_embeddings(X: np.ndarray) -> np.ndarray:
-    norms = np.linalg.norm(X, axis=1, keepdims=True) + 1e-12
-    return X / norms
-
 def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     denom = (np.linalg.norm(a) * np.linalg.norm(b)) + 1e-12
     return float(np.dot(a, b) / denom)
@@ -33,54 +34,16 @@ def _word_chunks(
     text: str,
     approx_tokens: int = 220,
     overlap: int = 30,
-    page_offsets: Optional[List[int]] = None
+    page_offsets: Optional[List[int]] = None,
+    key: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Rough token-aware chunking by words with overlap.
-    If page_offsets is provided (list of starting char positions per page in normalized text),
-    we approximate the chunk's page from its starting char.
+    Token-aware chunking by words with overlap, aligned to detected section headings
+    (see chunking.py). page_offsets (starting char per page in the normalized text)
+    gives each chunk its page; start/end are the chunk's exact character span.
     """
-    words = (text or "").split()
-    if not words:
-        return []
-
-    # Prefix char lengths to estimate starting char at word index i
-    prefix = [0]
-    for w in words:
-        prefix.append(prefix[-1] + len(w) + 1)  # +1 for space/newline approx
-
-    def page_for_char(start_char: int) -> int:
-        if not page_offsets:
-            return 0
-        page = 0
-        for p, off in enumerate(page_offsets):
-            if off <= start_char:
-                page = p
-            else:
-                break
-        return page
-
-    chunks: List[Dict[str, Any]] = []
-    step = max(1, approx_tokens - overlap)
-    i = 0
-    cid = 0
-    while i < len(words):
-        j = min(len(words), i + approx_tokens)
-        seg = " ".join(words[i:j]).strip()
-        if seg:
-            start_char = prefix[i]
-            page = page_for_char(start_char)
-            chunks.append(
-                {
-                    "chunk_id": f"c_{cid:05d}",
-                    "page": page,
-                    "section": None,
-                    "text": seg,
-                }
-            )
-            cid += 1
-        i += step
-    return chunks
+    doc = document_cache.get(text, key=key)
+    return doc.chunks(approx_tokens, overlap, page_offsets=page_offsets, respect_sections=True)
 
 
 class RAGService:
@@ -89,27 +52,96 @@ class RAGService:
     - Build per-contract FAISS index
     - Semantic search within a contract
     - Global search across all indexed contracts
+    - Persist indexes to disk; `_store` is an in-memory cache over them
     """
 
     def __init__(self):
-        if getattr(settings, "gemini_api_key", None):
-            genai.configure(api_key=settings.gemini_api_key)
-
-        self.model_name = DEFAULT_EMBEDDINGS_MODEL
-        self.model: Optional[SentenceTransformer] = None
-        try:
-            self.model = SentenceTransformer(self.model_name)
-        except Exception:
-            self.model = None
-
+        self.model_name = model_registry.embeddings_model
+        self.backend = model_registry.embeddings_backend
+        self.vector_store = VectorStore(getattr(settings, "index_dir", "./indexes"))
         self._store: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, Any] = {}  # contract_id -> on-disk version of the cached entry
+        self._generation: Any = self.vector_store.generation()
+        self._all_loaded = False
+        # query text -> normalized embedding; pinned entries are never evicted
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_size = max(0, getattr(settings, "query_embedding_cache_size", 1024))
+        self._pinned: Dict[str, np.ndarray] = {}
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        self.global_index = GlobalIndex(
+            hnsw_threshold=getattr(settings, "global_index_hnsw_threshold", 50000),
+            hnsw_m=getattr(settings, "global_index_hnsw_m", 32),
+            ef_search=getattr(settings, "global_index_ef_search", 128),
+        )
+
+    async def _embedder(self) -> Optional[Any]:
+        return await model_registry.load_embedding_model()
+
+    def _get_entry(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for a contract, loading it from disk on first access.
+        """
+        self._refresh()
+        cid = str(contract_id)
+        entry = self._store.get(cid)
+        if entry is None:
+            version = self.vector_store.version(cid)  # before load: a racing rewrite just reloads again
+            entry = self.vector_store.load(cid)
+            if entry is not None:
+                self._store[cid] = entry
+                self._versions[cid] = version
+        return entry
+
+    def _refresh(self) -> None:
+        """
+        If the store changed since the last check (any process), drop cached entries whose
+        files were rewritten or deleted; they are reloaded on demand and by _load_all.
+        """
+        generation = self.vector_store.generation()
+        if generation == self._generation:
+            return
+        self._generation = generation
+        on_disk = set(self.vector_store.list_contract_ids())
+        for cid in list(self._store):
+            if cid not in on_disk or self.vector_store.version(cid) != self._versions.get(cid):
+                self._forget(cid)
+        # New contracts from other processes join the global index on the next portfolio search
+        self._all_loaded = False
+
+    def _forget(self, cid: str) -> None:
+        self._store.pop(cid, None)
+        self._versions.pop(cid, None)
+        self.global_index.remove_contract(cid)
+
+    def _remember(self, cid: str, entry: Dict[str, Any], vecs: np.ndarray) -> None:
+        self._store[cid] = entry
+        self._versions[cid] = self.vector_store.version(cid)
+        self.global_index.add_contract(cid, entry.get("owner_id"), vecs)
+
+    def _load_all(self) -> None:
+        """
+        Pull every persisted index into the cache and the global index (again after
+        another process changed the store).
+        """
+        self._refresh()
+        if self._all_loaded:
+            return
+        for cid in self.vector_store.list_contract_ids():
+            entry = self._get_entry(cid)
+            if entry is None or cid in self.global_index:
+                continue
+            index = entry["index"]
+            self.global_index.add_contract(cid, entry.get("owner_id"), index.reconstruct_n(0, index.ntotal))
+        self._all_loaded = True
 
     async def index_contract(
         self,
         contract_id: str,
         text: str,
         language: str = "en",
-        page_offsets: Optional[List[int]] = None,  # <-- NEW
+        page_offsets: Optional[List[int]] = None,
+        owner_id: Optional[str] = None,
     ) -> bool:
         """
         Build/replace the FAISS index for a contract.
@@ -121,63 +153,153 @@ class RAGService:
         if not text or not text.strip():
             return False
 
-        if self.model is None:
-            try:
-                self.model = SentenceTransformer(self.model_name)
-            except Exception:
-                return False
+        if await self._embedder() is None:
+            return False
 
         # Page-aware chunking (uses page_offsets when provided)
-        chunks = _word_chunks(text, approx_tokens=220, overlap=30, page_offsets=page_offsets)
+        chunks = _word_chunks(text, *RAG_WINDOW, page_offsets=page_offsets, key=str(contract_id))
         if not chunks:
             chunks = [{"chunk_id": "c_00000", "page": 0, "section": None, "text": text[:2000]}]
 
         # Embed chunks (cosine via normalized + IndexFlatIP)
         texts = [c["text"] for c in chunks]
-        vecs = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        vecs = await document_batcher.encode(texts)
         dim = vecs.shape[1]
 
         index = faiss.IndexFlatIP(dim)
         index.add(vecs)
 
-        # Store in-memory index
-        self._store[str(contract_id)] = {
-            "index": index,
-            "embeddings": vecs,
-            "chunks": chunks,
+        # Persist first (atomic), then update the in-memory cache
+        meta = {
             "language": language,
+            "model": self.model_name,
+            "backend": self.backend,  # provenance only; all backends share the model's vector space
+            "dim": int(dim),
+            "owner_id": str(owner_id) if owner_id is not None else None,
+        }
+        self.vector_store.save(str(contract_id), index, chunks, meta)
+        self._remember(str(contract_id), {"index": index, "chunks": chunks, **meta}, vecs)
+        return True
+
+    async def clone_contract(self, source_id: str, contract_id: str, owner_id: Optional[str] = None) -> bool:
+        """
+        Index contract_id by copying source_id's chunks and embeddings (same file bytes).
+        Only the owner differs, so portfolio search stays scoped per user. Returns False
+        if the source has no usable index (missing, or built with another embedding model).
+        """
+        src = self._get_entry(source_id)
+        if src is None or src.get("model") != self.model_name:
+            return False
+
+        vecs = src["index"].reconstruct_n(0, src["index"].ntotal)
+        index = faiss.IndexFlatIP(vecs.shape[1])
+        index.add(vecs)
+
+        chunks = list(src["chunks"])
+        meta = {
+            "language": src.get("language", "en"),
+            "model": self.model_name,
+            "backend": src.get("backend", self.backend),
+            "dim": int(vecs.shape[1]),
+            "owner_id": str(owner_id) if owner_id is not None else None,
         }
+        self.vector_store.save(str(contract_id), index, chunks, meta)
+        self._remember(str(contract_id), {"index": index, "chunks": chunks, **meta}, vecs)
         return True
 
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Normalized embeddings for queries, shape (len(queries), dim).
+        Served from the pinned set / LRU cache; misses are encoded in one batch.
+        """
+        vecs: List[Optional[np.ndarray]] = []
+        missing: List[str] = []
+        for q in queries:
+            v = self._pinned.get(q)
+            if v is None:
+                v = self._query_cache.get(q)
+                if v is not None:
+                    self._query_cache.move_to_end(q)
+            if v is None:
+                missing.append(q)
+            vecs.append(v)
+
+        self.query_cache_hits += len(queries) - len(missing)
+        self.query_cache_misses += len(missing)
+        if missing:
+            unique = list(dict.fromkeys(missing))
+            encoded = await query_batcher.encode(unique)
+            fresh = {}
+            for q, v in zip(unique, np.asarray(encoded, dtype=np.float32)):
+                v.setflags(write=False)
+                fresh[q] = v
+                self._cache_query(q, v)
+            vecs = [fresh[q] if v is None else v for q, v in zip(queries, vecs)]
+        return np.stack(vecs)
+
+    def _cache_query(self, query: str, vec: np.ndarray) -> None:
+        if self._query_cache_size == 0:
+            return
+        self._query_cache[query] = vec
+        self._query_cache.move_to_end(query)
+        while len(self._query_cache) > self._query_cache_size:
+            self._query_cache.popitem(last=False)
+
+    async def pin_queries(self, queries: List[str]) -> int:
+        """
+        Embed static queries (e.g. analysis topics) once and keep them for the process lifetime.
+        """
+        if not queries or await self._embedder() is None:
+            return 0
+        vecs = await self.embed_queries(list(queries))
+        for q, v in zip(queries, vecs):
+            self._pinned[q] = v
+            self._query_cache.pop(q, None)
+        return len(self._pinned)
+
     async def search_contract(self, contract_id: str, query: str, top_k: int = 5) -> List[Dict]:
         """
         Return top_k relevant chunks for a single contract.
-        Each result: {chunk_id, text, score, page, section}
+        Each result: {chunk_id, text, score, page, section, start, end}
+        (start/end: character span in the normalized contract text; None for old indexes)
         """
-        entry = self._store.get(str(contract_id))
-        if entry is None or self.model is None:
+        results = await self.search_contract_many(contract_id, [query], top_k=top_k)
+        return results[0] if results else []
+
+    async def search_contract_many(self, contract_id: str, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        """
+        search_contract for several queries at once: one (n_queries x dim) index.search.
+        Returns one result list per query, in order ([] for each if the contract isn't indexed).
+        """
+        entry = self._get_entry(contract_id)
+        if entry is None or await self._embedder() is None:
+            return [[] for _ in queries]
+        if not queries:
             return []
 
-        q = self.model.encode([query], normalize_embeddings=True, convert_to_numpy=True)
-        D, I = entry["index"].search(q, min(top_k, len(entry["chunks"])))
-        idxs = I[0].tolist()
-        sims = D[0].tolist()
+        Q = await self.embed_queries(queries)
+        D, I = entry["index"].search(Q, min(top_k, len(entry["chunks"])))
 
-        results: List[Dict] = []
-        for pos, score in zip(idxs, sims):
-            if pos < 0:
-                continue
-            c = entry["chunks"][pos]
-            results.append(
-                {
-                    "chunk_id": c["chunk_id"],
-                    "text": c["text"],
-                    "score": float(score),
-                    "page": c.get("page", 0),
-                    "section": c.get("section"),
-                }
-            )
-        return results
+        out: List[List[Dict]] = []
+        for idxs, sims in zip(I.tolist(), D.tolist()):
+            results: List[Dict] = []
+            for pos, score in zip(idxs, sims):
+                if pos < 0:
+                    continue
+                c = entry["chunks"][pos]
+                results.append(
+                    {
+                        "chunk_id": c["chunk_id"],
+                        "text": c["text"],
+                        "score": float(score),
+                        "page": c.get("page", 0),
+                        "section": c.get("section"),
+                        "start": c.get("start"),
+                        "end": c.get("end"),
+                    }
+                )
+            out.append(results)
+        return out
 
     async def search_all_contracts(
         self,
@@ -186,27 +308,18 @@ class RAGService:
         top_k: int = 10
     ) -> List[Dict]:
         """
-        Global search across all contracts. Returns top_k across all indices.
-        Each result: {contract_id, chunk_id, text, score, page, section}
+        Global search across all contracts (only `user_id`'s contracts if given).
+        One vectorized search over the global index instead of one search per contract.
+        Each result: {contract_id, chunk_id, text, score, page, section, start, end}
         """
-        if self.model is None or not self._store:
+        if await self._embedder() is None:
+            return []
+        self._load_all()
+        if self.global_index.nlive == 0:
             return []
 
-        q = self.model.encode([query], normalize_embeddings=True, convert_to_numpy=True)[0] 
-        results: List[Tuple[str, int, float]] = []  
-
-        for cid, entry in self._store.items():
-            index: faiss.IndexFlatIP = entry["index"]
-            chunks = entry["chunks"]
-            k = min(top_k, len(chunks))
-            D, I = index.search(q.reshape(1, -1), k)
-            for pos, score in zip(I[0].tolist(), D[0].tolist()):
-                if pos < 0:
-                    continue
-                results.append((cid, pos, float(score)))
-
-        results.sort(key=lambda t: t[2], reverse=True)
-        results = results[:top_k]
+        q = (await self.embed_queries([query]))[0]
+        results: List[Tuple[str, int, float]] = self.global_index.search(q, top_k=top_k, owner_id=user_id)
 
         out: List[Dict] = []
         for cid, pos, score in results:
@@ -219,6 +332,8 @@ class RAGService:
                     "score": score,
                     "page": c.get("page", 0),
                     "section": c.get("section"),
+                    "start": c.get("start"),
+                    "end": c.get("end"),
                 }
             )
         return out
@@ -227,18 +342,15 @@ class RAGService:
         """
         Backwards-compatible API (character-based), wraps the word-based chunker.
         """
-        return _word_chunks(text, approx_tokens=220, overlap=30)
+        return _word_chunks(text, *RAG_WINDOW)
 
     async def generate_embedding(self, text: str) -> Optional[List[float]]:
         """
         Generate a single embedding vector for arbitrary text.
         """
-        if self.model is None:
-            try:
-                self.model = SentenceTransformer(self.model_name)
-            except Exception:
-                return None
-        v = self.model.encode([text], normalize_embeddings=True, convert_to_numpy=True)[0]
+        if await self._embedder() is None:
+            return None
+        v = (await self.embed_queries([text]))[0]
         return v.tolist()
 
     def calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
@@ -275,13 +387,31 @@ class RAGService:
 
         return "\n\n".join(buf)
 
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.query_cache_hits + self.query_cache_misses
+        return {
+            "models": model_registry.stats(),
+            "embedding_batches": {b.name: b.stats() for b in (query_batcher, document_batcher)},
+            "contracts_cached": len(self._store),
+            "chunk_documents": document_cache.stats(),
+            "query_cache": {
+                "entries": len(self._query_cache),
+                "pinned": len(self._pinned),
+                "hits": self.query_cache_hits,
+                "misses": self.query_cache_misses,
+                "hit_rate": round(self.query_cache_hits / lookups, 4) if lookups else 0.0,
+            },
+            "global_index": self.global_index.stats(),
+        }
+
     async def remove_contract_from_index(self, contract_id: str) -> bool:
         """
-        Remove a contract from memory index.
+        Remove a contract from the memory cache and from disk.
         """
-        if str(contract_id) in self._store:
-            del self._store[str(contract_id)]
-            return True
-        return False
+        in_memory = str(contract_id) in self._store
+        self._forget(str(contract_id))
+        document_cache.forget(str(contract_id))
+        on_disk = self.vector_store.delete(str(contract_id))
+        return in_memory or on_disk
 
 rag_service = RAGService()
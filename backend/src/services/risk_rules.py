@@ -0,0 +1,375 @@
+"""
+Risk Rules
+- Declarative registry of the deterministic risk checks: each rule names its clause
+  signals (patterns per language), when it fires, severity, finding and recommendation
+- Built-in rules below; RISK_RULES_PATH points at an optional JSON file that adds rules,
+  overrides fields of built-ins by id, or disables them ("enabled": false), no code changes needed
+- Rules are loaded and compiled into one ClauseScanner once per process and evaluated
+  together over a single lowercased copy of the contract and its cached chunk index
+- Per-rule evaluation time and hit rate are exposed through /metrics
+
+JSON file: {"replace_defaults": false, "rules": [{...rule...}, ...]}
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import json
+import re
+import time
+
+from src.config.settings import get_settings
+from src.services.chunking import ChunkedDocument, RISK_WINDOW
+from src.services.clauses import ClauseScanner
+
+settings = get_settings()
+
+TARGETS = ("risks", "non_standard", "missing_clauses")
+SEVERITIES = ("low", "medium", "high", "critical")
+
+# Findings point at the first few matches of a signal
+EVIDENCE_HITS = 3
+
+
+@dataclass
+class RiskRule:
+    """
+    when="missing": fires unless every signal matches (evidence = signals that did match)
+    when="present": fires when every signal matches (evidence = their matches)
+    signals: {signal: {language: [pattern, ...]}}; every variant is searched (contracts mix languages)
+    languages: contract languages the rule applies to (None = all), e.g. ["ar"] for a local check
+    check: optional named filter over the hit offsets (see CHECKS), with check_args
+    """
+
+    id: str
+    target: str
+    title: str
+    finding: str
+    signals: Dict[str, Dict[str, List[str]]]
+    severity: str = "medium"
+    recommendation: Optional[str] = None
+    when: str = "missing"
+    check: Optional[str] = None
+    check_args: Dict[str, Any] = field(default_factory=dict)
+    question: Optional[str] = None  # appended to the LLM checklist under `category`
+    category: Optional[str] = None
+    languages: Optional[List[str]] = None
+    enabled: bool = True
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "RiskRule":
+        known = set(cls.__dataclass_fields__)
+        unknown = set(raw) - known
+        if unknown:
+            raise ValueError(f"Risk rule {raw.get('id')!r}: unknown fields {sorted(unknown)}")
+        missing = {"id", "target", "title", "finding", "signals"} - set(raw)
+        if missing:
+            raise ValueError(f"Risk rule {raw.get('id')!r}: missing fields {sorted(missing)}")
+        rule = cls(**raw)
+        rule.validate()
+        return rule
+
+    def validate(self) -> None:
+        if self.target not in TARGETS:
+            raise ValueError(f"Risk rule {self.id!r}: target must be one of {TARGETS}")
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Risk rule {self.id!r}: severity must be one of {SEVERITIES}")
+        if self.when not in ("missing", "present"):
+            raise ValueError(f"Risk rule {self.id!r}: when must be 'missing' or 'present'")
+        if not self.signals or not all(isinstance(v, dict) and v for v in self.signals.values()):
+            raise ValueError(f"Risk rule {self.id!r}: signals must map names to {{language: [patterns]}}")
+        if self.check is not None and self.check not in CHECKS:
+            raise ValueError(f"Risk rule {self.id!r}: unknown check {self.check!r}")
+
+    def applies_to(self, language: Optional[str]) -> bool:
+        return self.languages is None or (language or "en") in self.languages
+
+    def finding_item(self, evidence_chunks: List[str]) -> Dict[str, Any]:
+        if self.target == "missing_clauses":
+            return {"clause": self.title, "why": self.finding}
+        return {
+            "id": self.id,
+            "title": self.title,
+            "severity": self.severity,
+            "finding": self.finding,
+            "evidence_chunks": evidence_chunks,
+            "recommendation": self.recommendation,
+        }
+
+
+# ---------------- checks ---------------- #
+
+_BUYER_RE = re.compile(r"customer|client|buyer", re.IGNORECASE)
+_SELLER_RE = re.compile(r"supplier|vendor|provider|contractor|licensor", re.IGNORECASE)
+
+
+def _one_party_nearby(text: str, offsets: List[int], ends: List[int], window: int = 400) -> List[int]:
+    """
+    Naive heuristic: hits with only one side (buyer or seller) mentioned within `window`
+    characters before or after the match.
+    """
+    out = []
+    for off, end in zip(offsets, ends):
+        span = text[max(0, off - window):end + window]
+        if bool(_BUYER_RE.search(span)) ^ bool(_SELLER_RE.search(span)):
+            out.append(off)
+    return out
+
+
+# A check receives every hit (start offsets and the matching end offsets, not just the
+# first few) and returns the start offsets that count
+CHECKS: Dict[str, Callable[..., List[int]]] = {
+    "one_party_nearby": _one_party_nearby,
+}
+
+
+# ---------------- built-in rules ---------------- #
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "id": "risk_liability_cap_missing",
+        "target": "risks",
+        "title": "No liability cap",
+        "severity": "high",
+        "finding": "Limitation of Liability is absent or no monetary cap detected.",
+        "recommendation": "Add an aggregate cap (e.g., 12x monthly fees or fees paid in the preceding 12 months) with standard carve-outs.",
+        "signals": {
+            "liability": {"en": ["liability"], "ar": ["المسؤولية", "المسئولية"]},
+            "cap": {
+                "en": [
+                    r"cap\s+(?:liability|amount)", r"maximum\s+(?:liability|amount)", r"aggregate\s+(?:liability|amount)",
+                    r"\b%\b", r"\bpercent\b", r"\bfee",
+                ],
+                "ar": ["الحد الأقصى", "حد أقصى", "سقف"],
+            },
+        },
+    },
+    {
+        "id": "missing_confidentiality",
+        "target": "missing_clauses",
+        "title": "Confidentiality",
+        "finding": "Typical baseline NDA/confidentiality clause is missing; risk of uncontrolled disclosure.",
+        "signals": {
+            "confidentiality": {
+                "en": ["confidentiality", "non-disclosure", "nondisclosure", r"\bnda\b"],
+                "ar": ["سرية", "عدم الإفصاح", "عدم الافصاح"],
+            },
+        },
+    },
+    {
+        "id": "missing_indemnity",
+        "target": "missing_clauses",
+        "title": "Indemnification",
+        "finding": "No indemnity for third-party claims (e.g., IP infringement).",
+        "signals": {"indemnity": {"en": [r"indemnif(?:y|ication)", "hold harmless"], "ar": ["تعويض"]}},
+    },
+    {
+        "id": "missing_termination",
+        "target": "missing_clauses",
+        "title": "Termination",
+        "finding": "Termination for cause with cure periods should be defined.",
+        "signals": {"termination": {"en": ["termination"], "ar": ["إنهاء", "انهاء", "فسخ"]}},
+    },
+    {
+        "id": "missing_force_majeure",
+        "target": "missing_clauses",
+        "title": "Force Majeure",
+        "finding": "Standard protection for events outside parties' control is missing.",
+        "signals": {"force_majeure": {"en": ["force majeure", "acts of god"], "ar": ["القوة القاهرة"]}},
+    },
+    {
+        "id": "missing_dispute_resolution",
+        "target": "missing_clauses",
+        "title": "Dispute Resolution / Governing Law",
+        "finding": "Governing law and forum/arbitration should be explicit and consistent.",
+        "signals": {
+            "dispute_resolution": {
+                "en": ["dispute resolution", "arbitration", "governing law", "jurisdiction", "venue"],
+                "ar": ["المنازعات", "النزاعات", "تحكيم", "القانون الواجب التطبيق", "الاختصاص القضائي"],
+            },
+        },
+    },
+    {
+        "id": "missing_ip",
+        "target": "missing_clauses",
+        "title": "Intellectual Property",
+        "finding": "Ownership and license scope should be defined.",
+        "signals": {
+            "ip": {
+                "en": ["intellectual property", "ip ownership", "ownership of work", "work product"],
+                "ar": ["الملكية الفكرية"],
+            },
+        },
+    },
+    {
+        "id": "risk_unilateral_termination",
+        "target": "non_standard",
+        "title": "Unilateral termination for convenience",
+        "severity": "medium",
+        "finding": "Termination for convenience appears to be granted to only one party.",
+        "recommendation": "Make termination for convenience mutual or remove it; define notice period and transition.",
+        "when": "present",
+        "signals": {"termination_for_convenience": {"en": [r"terminate\s+for\s+convenience"]}},
+        "check": "one_party_nearby",
+        "check_args": {"window": 400},
+    },
+    {
+        "id": "risk_data_protection_missing",
+        "target": "risks",
+        "title": "Data protection/privacy obligations not found",
+        "severity": "medium",
+        "finding": "No clear personal data/security obligations or breach notice terms.",
+        "recommendation": "Add data protection clause (e.g., GDPR/PDPL compliance, security measures, breach notice).",
+        "signals": {
+            "data_protection": {
+                "en": ["data protection", "privacy", "gdpr", "pdpl", "personal data", r"\bpii\b"],
+                "ar": ["حماية البيانات", "البيانات الشخصية", "الخصوصية"],
+            },
+        },
+    },
+]
+
+
+def load_rules(path: Optional[str] = None) -> List[RiskRule]:
+    """
+    Built-in rules merged with the JSON file at `path` (same id = override). Raises ValueError
+    on a malformed file so a bad deployment fails at startup rather than silently.
+    """
+    raw_rules: Dict[str, Dict[str, Any]] = {r["id"]: r for r in DEFAULT_RULES}
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot load risk rules from {path}: {e}") from e
+        if isinstance(doc, list):
+            doc = {"rules": doc}
+        if doc.get("replace_defaults"):
+            raw_rules = {}
+        for r in doc.get("rules", []):
+            if "id" not in r:
+                raise ValueError(f"Risk rule without an id in {path}")
+            # Same id as an existing rule: only the given fields change
+            raw_rules[r["id"]] = {**raw_rules.get(r["id"], {}), **r}
+    rules = [RiskRule.from_dict(r) for r in raw_rules.values()]
+    return [r for r in rules if r.enabled]
+
+
+class _RuleStats:
+    __slots__ = ("evaluations", "fired", "total_seconds", "max_seconds")
+
+    def __init__(self):
+        self.evaluations = 0
+        self.fired = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, fired: bool) -> None:
+        self.evaluations += 1
+        self.fired += int(fired)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        n = self.evaluations
+        return {
+            "evaluations": n,
+            "fired": self.fired,
+            "hit_rate": round(self.fired / n, 4) if n else 0.0,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "avg_ms": round(self.total_seconds * 1000 / n, 3) if n else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+
+
+class RuleEngine:
+    """
+    Compiled rule set. Scanner signals are keyed "<rule id>/<signal>/<language>".
+    """
+
+    def __init__(self, rules: List[RiskRule]):
+        self.rules = rules
+        patterns: Dict[str, List[str]] = {}
+        for rule in rules:
+            for signal, variants in rule.signals.items():
+                for lang, pats in variants.items():
+                    patterns[f"{rule.id}/{signal}/{lang}"] = list(pats)
+        self.scanner = ClauseScanner(patterns)
+        # Signal patterns of rules with a check, to find where each hit ends
+        self._compiled: Dict[str, List["re.Pattern[str]"]] = {
+            f"{rule.id}/{signal}": [re.compile(p, re.IGNORECASE) for pats in variants.values() for p in pats]
+            for rule in rules if rule.check
+            for signal, variants in rule.signals.items()
+        }
+        self._stats: Dict[str, _RuleStats] = {rule.id: _RuleStats() for rule in rules}
+
+    def checklist(self) -> Dict[str, List[str]]:
+        """
+        Extra LLM checklist questions contributed by rules, by category.
+        """
+        out: Dict[str, List[str]] = {}
+        for rule in self.rules:
+            if rule.question:
+                out.setdefault(rule.category or rule.id, []).append(rule.question)
+        return out
+
+    def _signal_hits(self, rule: RiskRule, signal: str, text: str, lowered: str, limit: Optional[int]) -> List[int]:
+        names = [f"{rule.id}/{signal}/{lang}" for lang in rule.signals[signal]]
+        hits = self.scanner.scan(text, limit=limit, only=names, prepared=lowered)
+        offsets = sorted(off for name in names for off in hits.get(name))
+        return offsets if limit is None else offsets[:limit]
+
+    def _hit_ends(self, rule: RiskRule, signal: str, lowered: str, offsets: List[int]) -> List[int]:
+        ends = []
+        for off in offsets:
+            end = off
+            for pattern in self._compiled[f"{rule.id}/{signal}"]:
+                m = pattern.match(lowered, off)
+                if m is not None:
+                    end = max(end, m.end())
+            ends.append(end)
+        return ends
+
+    def evaluate(self, text: str, doc: ChunkedDocument, language: str = "en") -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run every rule that applies to the contract language;
+        returns {"risks": [...], "non_standard": [...], "missing_clauses": [...]}.
+        """
+        text = text or ""
+        lowered = self.scanner.prepare(text)
+        result: Dict[str, List[Dict[str, Any]]] = {t: [] for t in TARGETS}
+
+        for rule in self.rules:
+            if not rule.applies_to(language):
+                continue
+            t0 = time.perf_counter()
+            limit = None if rule.check else EVIDENCE_HITS
+            matched: List[List[int]] = []
+            missing = False
+            for signal in rule.signals:
+                offsets = self._signal_hits(rule, signal, text, lowered, limit)
+                if rule.check and offsets:
+                    ends = self._hit_ends(rule, signal, lowered, offsets)
+                    offsets = CHECKS[rule.check](text, offsets, ends, **rule.check_args)
+                if offsets:
+                    matched.append(offsets[:EVIDENCE_HITS])
+                else:
+                    missing = True
+                    if rule.when == "present":
+                        break
+
+            fired = missing if rule.when == "missing" else not missing
+            if fired:
+                evidence = doc.locate(sorted(o for offs in matched for o in offs), *RISK_WINDOW)
+                result[rule.target].append(rule.finding_item(evidence))
+            self._stats[rule.id].record(time.perf_counter() - t0, fired)
+
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "by_rule": {rule_id: s.as_dict() for rule_id, s in self._stats.items()},
+        }
+
+
+rule_engine = RuleEngine(load_rules(getattr(settings, "risk_rules_path", None)))
@@ -8,68 +8,16 @@ Identifies and analyzes risks in contracts.
 """
 
 from typing import List, Dict, Optional, Any
-import re
 import json
-import math
 
-import google.generativeai as genai
 from src.config.settings import get_settings
+from src.services.llm import llm_client
+from src.services.chunking import document_cache, RISK_WINDOW
+from src.services.risk_rules import rule_engine
 
 settings = get_settings()
 
 
-_HDR = re.IGNORECASE | re.DOTALL
-
-def _has_heading(pattern: str, text: str) -> bool:
-    return bool(re.search(pattern, text or "", _HDR))
-
-def _has_liability_cap(text: str) -> bool:
-    """
-    Very rough detection of a limitation-of-liability section with a numerical/fee-based cap.
-    """
-    if not _has_heading(r"(limitation of liability|liability)", text):
-        return False
-    return bool(re.search(r"(cap|maximum|aggregate)\s+(?:liability|amount)|\b%\b|\bpercent\b|\bfee", text, _HDR))
-
-def _has_confidentiality(text: str) -> bool:
-    return _has_heading(r"(confidentiality|non-?disclosure|nda)", text)
-
-def _has_indemnity(text: str) -> bool:
-    return _has_heading(r"(indemnif(y|ication)|hold harmless)", text)
-
-def _has_termination(text: str) -> bool:
-    return _has_heading(r"(termination|term and termination|termination for cause|termination for convenience)", text)
-
-def _has_dispute_resolution(text: str) -> bool:
-    return _has_heading(r"(dispute resolution|arbitration|governing law|jurisdiction|venue)", text)
-
-def _has_force_majeure(text: str) -> bool:
-    return _has_heading(r"(force majeure|acts of god)", text)
-
-def _has_ip(text: str) -> bool:
-    return _has_heading(r"(intellectual property|ip ownership|ownership of work|work product)", text)
-
-def _has_data_protection(text: str) -> bool:
-    return _has_heading(r"(data protection|privacy|gdpr|pdpl|personal data|pii)", text)
-
-def _unilateral_termination(text: str) -> bool:
-    """
-    Naive heuristic: looks for 'terminate for convenience' with only one party mentioned.
-    """
-    if not re.search(r"terminate\s+for\s+convenience", text, _HDR):
-        return False
-    window = 400
-    for m in re.finditer(r"terminate\s+for\s+convenience", text, _HDR):
-        start = max(0, m.start() - window)
-        end = m.end() + window
-        span = (text or "")[start:end]
-        has_buyer = bool(re.search(r"(customer|client|buyer)", span, _HDR))
-        has_seller = bool(re.search(r"(supplier|vendor|provider|contractor|licensor)", span, _HDR))
-        if has_buyer ^ has_seller:
-            return True
-    return False
-
-
 SYSTEM_RISK_INSTRUCTIONS = (
     "Act as a senior contracts counsel. Review the provided contract CHUNKS and the already-extracted fields. "
     "Return ONLY JSON with keys: risks, non_standard, missing_clauses. "
@@ -117,20 +65,26 @@ CHECKLIST = {
 }
 
 
+def _checklist() -> Dict[str, List[str]]:
+    extra = rule_engine.checklist()
+    if not extra:
+        return CHECKLIST
+    merged = {k: list(v) for k, v in CHECKLIST.items()}
+    for k, questions in extra.items():
+        merged.setdefault(k, []).extend(questions)
+    return merged
+
+
 class RiskService:
     """
     Service for identifying and analyzing contract risks using AI.
     """
 
     def __init__(self):
-        if settings.gemini_api_key:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(
-                model_name="gemini-2.5-flash",
-                generation_config={"response_mime_type": "application/json"}
-            )
-        else:
-            self.model = None
+        self.model = llm_client.model(
+            "gemini-2.5-flash",
+            generation_config={"response_mime_type": "application/json"}
+        )
 
     async def analyze_risks(
         self,
@@ -141,7 +95,7 @@ class RiskService:
     ) -> Dict[str, Any]:
         """
         Hybrid risk analysis:
-          1) deterministic rules over full text
+          1) deterministic rules over full text (rule registry in risk_rules.py)
           2) Gemini JSON-mode critique over top chunks (here: first ~40 chunks by order)
         Returns:
           {
@@ -154,78 +108,18 @@ class RiskService:
         full_text = text or ""
         result: Dict[str, Any] = {"risks": [], "non_standard": [], "missing_clauses": []}
 
-        if not _has_liability_cap(full_text):
-            result["risks"].append({
-                "id": "risk_liability_cap_missing",
-                "title": "No liability cap",
-                "severity": "high",
-                "finding": "Limitation of Liability is absent or no monetary cap detected.",
-                "evidence_chunks": [],
-                "recommendation": "Add an aggregate cap (e.g., 12x monthly fees or fees paid in the preceding 12 months) with standard carve-outs."
-            })
-
-        if not _has_confidentiality(full_text):
-            result["missing_clauses"].append({
-                "clause": "Confidentiality",
-                "why": "Typical baseline NDA/confidentiality clause is missing; risk of uncontrolled disclosure."
-            })
-
-        if not _has_indemnity(full_text):
-            result["missing_clauses"].append({
-                "clause": "Indemnification",
-                "why": "No indemnity for third-party claims (e.g., IP infringement)."
-            })
+        # Deterministic rules (see risk_rules.py); one scan of the text, evidence from the chunk index
+        doc = document_cache.get(full_text, key=doc_id)
+        for k, items in rule_engine.evaluate(full_text, doc, language).items():
+            result[k].extend(items)
 
-        if not _has_termination(full_text):
-            result["missing_clauses"].append({
-                "clause": "Termination",
-                "why": "Termination for cause with cure periods should be defined."
-            })
-
-        if not _has_force_majeure(full_text):
-            result["missing_clauses"].append({
-                "clause": "Force Majeure",
-                "why": "Standard protection for events outside parties' control is missing."
-            })
-
-        if not _has_dispute_resolution(full_text):
-            result["missing_clauses"].append({
-                "clause": "Dispute Resolution / Governing Law",
-                "why": "Governing law and forum/arbitration should be explicit and consistent."
-            })
-
-        if not _has_ip(full_text):
-            result["missing_clauses"].append({
-                "clause": "Intellectual Property",
-                "why": "Ownership and license scope should be defined."
-            })
-
-        if _unilateral_termination(full_text):
-            result["non_standard"].append({
-                "id": "risk_unilateral_termination",
-                "title": "Unilateral termination for convenience",
-                "severity": "medium",
-                "finding": "Termination for convenience appears to be granted to only one party.",
-                "evidence_chunks": [],
-                "recommendation": "Make termination for convenience mutual or remove it; define notice period and transition."
-            })
-
-        if not _has_data_protection(full_text):
-            result["risks"].append({
-                "id": "risk_data_protection_missing",
-                "title": "Data protection/privacy obligations not found",
-                "severity": "medium",
-                "finding": "No clear personal data/security obligations or breach notice terms.",
-                "evidence_chunks": [],
-                "recommendation": "Add data protection clause (e.g., GDPR/PDPL compliance, security measures, breach notice)."
-            })
         if self.model:
-            llm_chunks = _simple_chunks(full_text, approx_tokens=600, stride=90)[:40]
+            llm_chunks = doc.chunks(*RISK_WINDOW, limit=40)
             payload = {
                 "doc_id": doc_id,
                 "language": language if language in ("en", "ar") else "en",
                 "extracted": extracted or {},
-                "checklist": CHECKLIST,
+                "checklist": _checklist(),
                 "chunks": llm_chunks
             }
             try:
@@ -233,7 +127,7 @@ class RiskService:
                     {"text": SYSTEM_RISK_INSTRUCTIONS},
                     {"text": json.dumps(payload, ensure_ascii=False)}
                 ]
-                resp = self.model.generate_content(contents=[{"role": "user", "parts": prompt_parts}])
+                resp = await self.model.generate_content(contents=[{"role": "user", "parts": prompt_parts}])
                 llm_json = json.loads(resp.text)
 
                 for k in ("risks", "non_standard", "missing_clauses"):
@@ -254,19 +148,6 @@ class RiskService:
         result["overall"] = overall
         return result
 
-def _simple_chunks(text: str, approx_tokens: int = 600, stride: int = 90):
-    words = (text or "").split()
-    if not words:
-        return []
-    chunks, step, i, cidx = [], max(1, approx_tokens - stride), 0, 0
-    while i < len(words):
-        seg = " ".join(words[i : i + approx_tokens])
-        if seg.strip():
-            chunks.append({"chunk_id": f"c_{cidx:05d}", "page": 0, "section": None, "text": seg})
-            cidx += 1
-        i += step
-    return chunks
-
 _SEVERITY_WEIGHTS = {"low": 10, "medium": 25, "high": 45, "critical": 70}
 
 def _score_risks(result: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,265 @@
+"""
+Contract Search Index
+- Full-text index over title, summary, party names and the normalized contract body
+- SQLite: FTS5 virtual table (unicode61 tokenizer, BM25 ranking, snippet())
+- Postgres: table with a weighted tsvector column + GIN index (ts_rank_cd, ts_headline)
+- Arabic is folded before indexing and querying (tashkeel/tatweel removed, alef, hamza,
+  yaa and taa marbuta variants unified), so spelling variants match each other
+- Kept in sync on upload, update_contract and after analysis (see persistence.py)
+- hybrid_search fuses the BM25 ranking with RAG vector hits (reciprocal rank fusion)
+- Snippets are HTML-escaped contract text; only the <mark> highlights are markup
+"""
+
+from typing import Any, Dict, List, Optional
+import html
+import re
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import AsyncSessionLocal, engine
+from src.models.contract import Contract, ContractParty
+from src.services.artifacts import artifact_store, PARSED
+
+_AR_MARKS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")  # tashkeel, Quranic marks, tatweel
+# Hamza seats fold to a bare hamza so e.g. مسؤولية and مسئولية index the same
+_AR_FOLD = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه", "ؤ": "ء", "ئ": "ء"})
+_TOKEN_RE = re.compile(r"\w+")
+
+# Highlight delimiters for snippet()/ts_headline: private-use code points (stripped from
+# indexed text), swapped for <mark> only after the snippet has been escaped
+_HL_START, _HL_STOP = "\ue000", "\ue001"
+_HL_STRIP = str.maketrans({_HL_START: None, _HL_STOP: None})
+
+# Rank fusion constant (Cormack et al.); higher flattens the contribution of top ranks
+RRF_K = 60
+
+# Postgres caps a tsvector at 1MB; index the head of very long bodies there
+_PG_BODY_MAX_CHARS = 250_000
+
+_SQLITE_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contract_fts USING fts5("
+    "contract_id UNINDEXED, owner_id UNINDEXED, title, summary, parties, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+# bm25() weights, one per column in declaration order
+_SQLITE_WEIGHTS = "0, 0, 10.0, 4.0, 4.0, 1.0"
+
+_PG_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS contract_search (
+        contract_id VARCHAR PRIMARY KEY,
+        owner_id VARCHAR NOT NULL,
+        title TEXT, summary TEXT, parties TEXT, body TEXT,
+        document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(parties, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(summary, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(body, '')), 'D')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_contract_search_document ON contract_search USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_contract_search_owner ON contract_search (owner_id)",
+]
+
+
+def normalize(value: Optional[str]) -> str:
+    """
+    Text as stored in / queried against the index.
+    """
+    return _AR_MARKS.sub("", value or "").translate(_AR_FOLD).translate(_HL_STRIP)
+
+
+def snippet_html(snippet: Optional[str]) -> str:
+    """
+    Escaped snippet with the highlight delimiters turned into <mark> tags.
+    """
+    return html.escape(snippet or "").replace(_HL_START, "<mark>").replace(_HL_STOP, "</mark>")
+
+
+def query_terms(query: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(query).lower())
+
+
+class SearchIndex:
+
+    def __init__(self, dialect: str):
+        self.dialect = dialect
+        self.postgres = dialect == "postgresql"
+
+    @property
+    def table(self) -> str:
+        return "contract_search" if self.postgres else "contract_fts"
+
+    async def init(self) -> None:
+        """
+        Create the index if needed and add contracts it does not cover yet
+        (e.g. uploaded before it existed), with their body from the parsed artifact.
+        """
+        async with engine.begin() as conn:
+            if self.postgres:
+                for stmt in _PG_SCHEMA:
+                    await conn.execute(text(stmt))
+            else:
+                await conn.execute(text(_SQLITE_SCHEMA))
+
+        async with AsyncSessionLocal() as db:
+            missing = (await db.execute(
+                select(Contract.id, Contract.content_hash).where(
+                    Contract.id.not_in(text(f"SELECT contract_id FROM {self.table}").columns(contract_id=Contract.id.type))
+                )
+            )).all()
+        for contract_id, content_hash in missing:
+            parsed = artifact_store.get(content_hash, PARSED) or {}
+            await self.refresh(contract_id, body=parsed.get("text", ""))
+
+    # ---------------- query building ---------------- #
+
+    def _match_expr(self, query: str) -> Optional[str]:
+        """
+        Every term must match, each as a prefix (search-as-you-type); None if no terms.
+        User input never reaches the FTS syntax unquoted.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+        if self.postgres:
+            return " & ".join(f"{t}:*" for t in terms)
+        return " ".join(f'"{t}"*' for t in terms)
+
+    def matching_ids(self, query: str):
+        """
+        SELECT of contract ids matching `query` (for IN filters), or None if it has no terms.
+        """
+        expr = self._match_expr(query)
+        if expr is None:
+            return None
+        if self.postgres:
+            stmt = text(
+                "SELECT contract_id FROM contract_search WHERE document @@ to_tsquery('simple', :fts_q)"
+            )
+        else:
+            stmt = text("SELECT contract_id FROM contract_fts WHERE contract_fts MATCH :fts_q")
+        return stmt.bindparams(fts_q=expr).columns(contract_id=Contract.id.type)
+
+    # ---------------- writes ---------------- #
+
+    async def index_contract(self, db: AsyncSession, contract_id: str, body: Optional[str] = None) -> None:
+        """
+        (Re)index one contract from its current row and parties, in the caller's transaction.
+        body=None keeps the body already indexed (metadata-only update).
+        """
+        contract = await db.get(Contract, contract_id)
+        if contract is None:
+            return
+        names = (await db.execute(
+            select(ContractParty.name).where(ContractParty.contract_id == contract_id)
+        )).scalars().all()
+        table = self.table
+        if body is None:
+            row = (await db.execute(
+                text(f"SELECT body FROM {table} WHERE contract_id = :cid"), {"cid": contract_id}
+            )).first()
+            body = row[0] if row else ""
+        else:
+            body = normalize(body)
+            if self.postgres:
+                body = body[:_PG_BODY_MAX_CHARS]
+
+        params = {
+            "cid": contract_id,
+            "owner": contract.uploaded_by,
+            "title": normalize(contract.title),
+            "summary": normalize(contract.summary),
+            "parties": normalize(" ; ".join(names)),
+            "body": body,
+        }
+        # FTS5 has no upsert; delete + insert (the same in Postgres keeps one code path)
+        await db.execute(text(f"DELETE FROM {table} WHERE contract_id = :cid"), {"cid": contract_id})
+        await db.execute(
+            text(
+                f"INSERT INTO {table} (contract_id, owner_id, title, summary, parties, body) "
+                "VALUES (:cid, :owner, :title, :summary, :parties, :body)"
+            ),
+            params,
+        )
+
+    async def refresh(self, contract_id: str, body: Optional[str] = None) -> None:
+        """
+        index_contract in its own session and transaction.
+        """
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                await self.index_contract(db, contract_id, body)
+
+    # ---------------- reads ---------------- #
+
+    async def search(self, db: AsyncSession, owner_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Keyword hits, best first: [{contract_id, score, snippet}]. score is higher-is-better.
+        """
+        expr = self._match_expr(query)
+        if expr is None:
+            return []
+        if self.postgres:
+            stmt = text(
+                "SELECT contract_id, ts_rank_cd(document, q) AS score, "
+                "ts_headline('simple', coalesce(nullif(body, ''), title, ''), q, "
+                f"'StartSel={_HL_START}, StopSel={_HL_STOP}, MaxWords=24, MinWords=8, MaxFragments=1') AS snippet "
+                "FROM contract_search, to_tsquery('simple', :fts_q) AS q "
+                "WHERE owner_id = :owner AND document @@ q "
+                "ORDER BY score DESC LIMIT :limit"
+            )
+        else:
+            stmt = text(
+                f"SELECT contract_id, -bm25(contract_fts, {_SQLITE_WEIGHTS}) AS score, "
+                f"snippet(contract_fts, -1, '{_HL_START}', '{_HL_STOP}', '…', 16) AS snippet "
+                "FROM contract_fts WHERE contract_fts MATCH :fts_q AND owner_id = :owner "
+                "ORDER BY bm25(contract_fts, " + _SQLITE_WEIGHTS + ") LIMIT :limit"
+            )
+        rows = (await db.execute(stmt, {"fts_q": expr, "owner": owner_id, "limit": limit})).all()
+        return [{"contract_id": r[0], "score": float(r[1]), "snippet": snippet_html(r[2])} for r in rows]
+
+    async def hybrid_search(
+        self,
+        db: AsyncSession,
+        owner_id: str,
+        query: str,
+        vector_hits: List[Dict[str, Any]],
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal rank fusion of the keyword ranking with vector chunk hits
+        (RAGService.search_all_contracts output; a contract ranks by its best chunk).
+        """
+        keyword = await self.search(db, owner_id, query, limit=limit * 3)
+
+        fused: Dict[str, Dict[str, Any]] = {}
+        for rank, hit in enumerate(keyword, start=1):
+            fused[hit["contract_id"]] = {
+                "contract_id": hit["contract_id"],
+                "score": 1.0 / (RRF_K + rank),
+                "keyword_rank": rank,
+                "vector_rank": None,
+                "snippet": hit["snippet"],
+            }
+        rank = 0
+        for hit in vector_hits:
+            cid = hit["contract_id"]
+            entry = fused.get(cid)
+            if entry is not None and entry["vector_rank"] is not None:
+                continue  # later chunks of an already ranked contract
+            rank += 1
+            if entry is None:
+                entry = fused[cid] = {
+                    "contract_id": cid, "score": 0.0, "keyword_rank": None, "vector_rank": None,
+                    "snippet": html.escape((hit.get("text") or "")[:240]),
+                }
+            entry["vector_rank"] = rank
+            entry["score"] += 1.0 / (RRF_K + rank)
+
+        return sorted(fused.values(), key=lambda e: e["score"], reverse=True)[:limit]
+
+
+search_index = SearchIndex(engine.dialect.name)
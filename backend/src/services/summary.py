@@ -20,8 +20,9 @@ Return shape:
 from typing import Dict, Optional, Any, List
 import json
 
-import google.generativeai as genai
 from src.config.settings import get_settings
+from src.services.llm import llm_client
+from src.services.chunking import document_cache, SUMMARY_WINDOW
 
 settings = get_settings()
 
@@ -42,20 +43,6 @@ def _to_str_list(seq, maxn=None):
             break
     return out
 
-def _chunk_text(text: str, approx_tokens: int = 650, stride: int = 100):
-    words = (text or "").split()
-    if not words:
-        return []
-    chunks, step, i, cidx = [], max(1, approx_tokens - stride), 0, 0
-    while i < len(words):
-        seg = " ".join(words[i : i + approx_tokens])
-        if seg.strip():
-            chunks.append({"chunk_id": f"c_{cidx:05d}", "page": 0, "section": None, "text": seg})
-            cidx += 1
-        i += step
-    return chunks
-
-
 SYSTEM_SUMMARY_INSTRUCTIONS = (
     "You are an AI contract analyst. Produce a concise, business-friendly executive summary of the contract. "
     "Use ONLY the provided text and extracted data. Do not speculate. "
@@ -73,14 +60,10 @@ class SummaryService:
     """
 
     def __init__(self):
-        if settings.gemini_api_key:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(
-                model_name="gemini-2.5-flash",
-                generation_config={"response_mime_type": "application/json"}
-            )
-        else:
-            self.model = None
+        self.model = llm_client.model(
+            "gemini-2.5-flash",
+            generation_config={"response_mime_type": "application/json"}
+        )
 
     async def generate_summary(
         self,
@@ -100,7 +83,7 @@ class SummaryService:
         if not self.model:
             return self._fallback_summary(extracted_data, risks)
 
-        chunks = _chunk_text(contract_text, approx_tokens=650, stride=100)[:40]
+        chunks = document_cache.get(contract_text).chunks(*SUMMARY_WINDOW, limit=40)
 
         payload = {
             "extracted": extracted_data or {},
@@ -113,7 +96,7 @@ class SummaryService:
                 {"text": SYSTEM_SUMMARY_INSTRUCTIONS},
                 {"text": json.dumps(payload, ensure_ascii=False)}
             ]
-            resp = self.model.generate_content(
+            resp = await self.model.generate_content(
                 contents=[{"role": "user", "parts": prompt_parts}]
             )
             out = json.loads(resp.text)
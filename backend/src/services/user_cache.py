@@ -0,0 +1,76 @@
+"""
+User Cache
+- Per-user TTL cache for derived read results (list totals, dashboard stats)
+- Write paths call invalidate(user_id); a version counter per user keeps a read that
+  raced with a write from storing its (now stale) result
+- Bounded: least recently used users are dropped first
+"""
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+import time
+
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+
+class UserCache:
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl = float(ttl_seconds)
+        self.max_users = max(1, max_users)
+        self._entries: "OrderedDict[str, Dict[Hashable, Tuple[float, Any]]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def version(self, user_id: str) -> int:
+        return self._versions.get(str(user_id), 0)
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        entries = self._entries.get(str(user_id))
+        hit = entries.get(key) if entries else None
+        if hit is None or hit[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(str(user_id))
+        self.hits += 1
+        return hit[1]
+
+    def set(self, user_id: str, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """
+        Store value; skipped when `version` (read before computing it) is no longer current.
+        """
+        if self.ttl <= 0:
+            return
+        user_id = str(user_id)
+        if version is not None and version != self.version(user_id):
+            return
+        self._entries.setdefault(user_id, {})[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            evicted, _ = self._entries.popitem(last=False)
+            self._versions.pop(evicted, None)
+
+    def invalidate(self, user_id: Optional[str]) -> None:
+        if user_id is None:
+            return
+        user_id = str(user_id)
+        self._entries.pop(user_id, None)
+        self._versions[user_id] = self.version(user_id) + 1
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache(settings.user_cache_ttl_seconds, settings.user_cache_max_users)
@@ -0,0 +1,146 @@
+"""
+Vector Store
+- Persists per-contract FAISS indexes and chunk metadata under a directory
+- Atomic writes (build in a temp dir, then swap into place)
+- Memory-mapped, read-only loads so restarts don't need re-embedding
+- Every save/delete replaces <root>/.generation, so other processes sharing the directory
+  (uvicorn/gunicorn workers) notice changes with one stat (see RAGService._refresh)
+
+Layout:
+  <root>/<contract_id>/index.faiss   FAISS index (IndexFlatIP over normalized embeddings)
+  <root>/<contract_id>/chunks.json   {"language", "model", "dim", "chunks": [...]}
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import shutil
+import uuid
+
+import faiss
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+GENERATION_FILE = ".generation"
+
+
+class VectorStore:
+    """
+    File-backed store for per-contract indexes.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _dir(self, contract_id: str) -> str:
+        return os.path.join(self.root, str(contract_id))
+
+    def exists(self, contract_id: str) -> bool:
+        d = self._dir(contract_id)
+        return os.path.isfile(os.path.join(d, INDEX_FILE)) and os.path.isfile(os.path.join(d, CHUNKS_FILE))
+
+    def save(
+        self,
+        contract_id: str,
+        index: faiss.Index,
+        chunks: List[Dict[str, Any]],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Write index + chunk metadata atomically.
+        Readers either see the previous complete version or the new one, never a mix.
+        """
+        final_dir = self._dir(contract_id)
+        tmp_dir = os.path.join(self.root, f".{contract_id}.tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            faiss.write_index(index, os.path.join(tmp_dir, INDEX_FILE))
+            doc = dict(meta or {})
+            doc["chunks"] = chunks
+            with open(os.path.join(tmp_dir, CHUNKS_FILE), "w", encoding="utf-8") as f:
+                json.dump(doc, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+
+            old_dir = None
+            if os.path.exists(final_dir):
+                old_dir = os.path.join(self.root, f".{contract_id}.old-{uuid.uuid4().hex}")
+                os.replace(final_dir, old_dir)
+            os.replace(tmp_dir, final_dir)
+            if old_dir:
+                shutil.rmtree(old_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._bump()
+
+    def _bump(self) -> None:
+        tmp = os.path.join(self.root, f"{GENERATION_FILE}.tmp-{uuid.uuid4().hex}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp, os.path.join(self.root, GENERATION_FILE))
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        # Files are replaced, never rewritten in place, so the inode changes on every write
+        return (st.st_ino, st.st_mtime_ns)
+
+    def generation(self) -> Optional[Tuple[int, int]]:
+        """
+        Changes whenever any contract is saved or deleted (by any process).
+        """
+        return self._stamp(os.path.join(self.root, GENERATION_FILE))
+
+    def version(self, contract_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Changes whenever this contract's index is rewritten; None if it isn't stored.
+        """
+        return self._stamp(os.path.join(self._dir(contract_id), CHUNKS_FILE))
+
+    def load(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a contract's index (memory-mapped, read-only) and chunk metadata.
+        Returns None if nothing is stored or the files are unreadable.
+        """
+        if not self.exists(contract_id):
+            return None
+        d = self._dir(contract_id)
+        try:
+            index = faiss.read_index(
+                os.path.join(d, INDEX_FILE),
+                faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+            )
+            with open(os.path.join(d, CHUNKS_FILE), "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except Exception:
+            return None
+
+        chunks = doc.pop("chunks", [])
+        if index.ntotal != len(chunks):
+            return None
+        return {"index": index, "chunks": chunks, **doc}
+
+    def delete(self, contract_id: str) -> bool:
+        d = self._dir(contract_id)
+        if not os.path.exists(d):
+            return False
+        trash = os.path.join(self.root, f".{contract_id}.del-{uuid.uuid4().hex}")
+        os.replace(d, trash)
+        shutil.rmtree(trash, ignore_errors=True)
+        self._bump()
+        return True
+
+    def list_contract_ids(self) -> List[str]:
+        """
+        All contract ids with a complete index on disk (skips temp/trash dirs).
+        """
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return [n for n in names if not n.startswith(".") and self.exists(n)]
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+PART_SUFFIX = ".part"
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload stream exceeds the configured size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredFile:
+    path: str
+    size: int
+    sha256: str
+
+
+def _write_chunk(f: BinaryIO, digest: "hashlib._Hash", chunk: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so both steps run off the event loop
+    digest.update(chunk)
+    f.write(chunk)
+
+
+def _finish(f: BinaryIO) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+
+
+def _discard(f: BinaryIO, path: str) -> None:
+    f.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(upload: UploadFile, dest_dir: str, ext: str, max_bytes: int, chunk_size: int) -> StoredFile:
+    """
+    Stream an upload to dest_dir in fixed-size chunks, hashing as it goes.
+    Data lands in a <random>.part temp file in the same directory and is renamed
+    to <sha256><ext> only once complete, so readers never see a partial file and
+    identical uploads share one file.
+    Raises UploadTooLarge as soon as more than max_bytes have been read.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=PART_SUFFIX)
+    f = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            await run_in_threadpool(_write_chunk, f, digest, chunk)
+        await run_in_threadpool(_finish, f)
+
+        sha256 = digest.hexdigest()
+        final_path = os.path.join(dest_dir, f"{sha256}{ext}")
+        if os.path.exists(final_path):
+            # Same bytes already stored; keep one copy on disk
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, final_path)
+    except BaseException:
+        await run_in_threadpool(_discard, f, tmp_path)
+        raise
+
+    return StoredFile(path=final_path, size=size, sha256=sha256)
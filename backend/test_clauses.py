@@ -0,0 +1,28 @@
+"""
+Clause scanner: patterns without a literal anchor fall back to a plain regex search
+Run: python -m pytest test_clauses.py
+"""
+import re
+
+from src.services.clauses import ClauseScanner
+
+
+def test_top_level_alternation_matches_every_branch():
+    scanner = ClauseScanner({"x": ["ab|cd"]})
+    assert scanner.scan("zz cd zz").get("x") == [3]
+    assert scanner.scan("ab zz cd").get("x") == [0, 6]
+
+
+def test_leading_group_or_class_is_accepted():
+    scanner = ClauseScanner({"group": ["(?:a|b)x"], "cls": ["[Tt]ermination"]})
+    text = "ax then Termination and bx"
+    hits = scanner.scan(text)
+    assert hits.get("group") == [m.start() for m in re.finditer("(?:a|b)x", text)]
+    assert hits.get("cls") == [text.index("Termination")]
+
+
+def test_anchored_patterns_unchanged():
+    scanner = ClauseScanner({"x": [r"\bliabilit(y|ies)", "indemn"], "y": ["(a|b)c"]})
+    hits = scanner.scan("Liability and INDEMNITY; bc")
+    assert hits.get("x") == [0, 14]
+    assert hits.get("y") == [25]
@@ -0,0 +1,118 @@
+"""
+Upload dedup: content-addressed artifacts, donor lookup and index cloning for the new owner
+Run: python -m pytest test_dedup.py
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import faiss
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config.database import Base
+from src.models.contract import Contract, ContractStatus, FileType
+from src.models.user import User  # noqa: F401  (contracts.uploaded_by -> users)
+from src.services import artifacts
+from src.services.artifacts import ANALYSIS, PARSED, ArtifactStore
+from src.services.ingestion import ingestion_service
+from src.services.rag import RAGService, rag_service
+from src.services.vector_store import VectorStore
+
+HASH = "ab" * 32
+
+
+def _rag(root) -> RAGService:
+    rag = RAGService()
+    rag.vector_store = VectorStore(str(root))
+    rag._generation = rag.vector_store.generation()
+    return rag
+
+
+def _save_source(rag: RAGService, cid: str, owner: str, model: str) -> np.ndarray:
+    vecs = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    faiss.normalize_L2(vecs)
+    index = faiss.IndexFlatIP(8)
+    index.add(vecs)
+    chunks = [{"chunk_id": i, "text": f"clause {i}"} for i in range(3)]
+    rag.vector_store.save(cid, index, chunks, {"language": "ar", "model": model, "dim": 8, "owner_id": owner})
+    return vecs
+
+
+def test_artifact_roundtrip_and_version(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    assert store.get(HASH, PARSED) is None and not store.has(HASH, PARSED)
+
+    store.put(HASH, PARSED, {"text": "نص العقد", "pages": 2})
+    assert store.has(HASH, PARSED) and not store.has(HASH, ANALYSIS)
+    assert store.get(HASH, PARSED) == {"text": "نص العقد", "pages": 2}
+
+    # artifacts written by an older pipeline are ignored
+    path = tmp_path / HASH[:2] / HASH / f"{PARSED}.json"
+    path.write_text(json.dumps({"version": artifacts.ARTIFACT_VERSION - 1, "data": {"text": "old"}}))
+    assert store.get(HASH, PARSED) is None
+
+    # no hash (legacy rows) is a no-op
+    store.put(None, ANALYSIS, {"x": 1})
+    assert store.get(None, ANALYSIS) is None and not store.has("", ANALYSIS)
+
+
+def test_clone_copies_index_for_new_owner(tmp_path):
+    rag = _rag(tmp_path)
+    vecs = _save_source(rag, "src", "alice", rag.model_name)
+
+    assert asyncio.run(rag.clone_contract("src", "dst", "bob")) is True
+    clone = VectorStore(str(tmp_path)).load("dst")
+    assert clone["owner_id"] == "bob" and clone["language"] == "ar"
+    assert clone["chunks"] == rag.vector_store.load("src")["chunks"]
+    np.testing.assert_allclose(clone["index"].reconstruct_n(0, 3), vecs)
+
+    # the copy is searchable in the new owner's portfolio only
+    assert {c for c, _, _ in rag.global_index.search(vecs[0], top_k=10, owner_id="bob")} == {"dst"}
+    assert rag.global_index.search(vecs[0], top_k=10, owner_id="alice") == []
+
+
+def test_clone_refuses_missing_or_foreign_model_source(tmp_path):
+    rag = _rag(tmp_path)
+    assert asyncio.run(rag.clone_contract("missing", "dst", "bob")) is False
+    _save_source(rag, "src", "alice", "some-other-model")
+    assert asyncio.run(rag.clone_contract("src", "dst", "bob")) is False
+    assert not rag.vector_store.exists("dst")
+
+
+def test_find_donor(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_service, "vector_store", VectorStore(str(tmp_path / "indexes")))
+    _save_source(rag_service, "indexed", "alice", rag_service.model_name)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        now = datetime.utcnow()
+
+        def contract(cid, status, minutes, content_hash=HASH):
+            return Contract(
+                id=cid, title=cid, file_name=f"{cid}.pdf", file_path=f"/tmp/{cid}.pdf",
+                file_type=FileType.pdf, content_hash=content_hash, uploaded_by="alice",
+                status=status, upload_date=now + timedelta(minutes=minutes),
+            )
+
+        async with Session() as db:
+            db.add_all([
+                contract("pending", ContractStatus.pending, 0),
+                contract("not-indexed", ContractStatus.completed, 1),
+                contract("indexed", ContractStatus.completed, 2),
+                contract("other-bytes", ContractStatus.completed, 3, content_hash="cd" * 32),
+            ])
+            await db.commit()
+            try:
+                return (
+                    await ingestion_service.find_donor(db, HASH),
+                    await ingestion_service.find_donor(db, HASH, exclude_id="indexed"),
+                    await ingestion_service.find_donor(db, None),
+                )
+            finally:
+                await engine.dispose()
+
+    assert asyncio.run(run()) == ("indexed", None, None)
@@ -0,0 +1,117 @@
+"""
+Embedding batcher: concurrent encode() calls merged into model batches, large requests
+split across batches, and backpressure
+Run: python -m pytest test_embedding_batcher.py
+"""
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.services import embedding_batcher as batcher_module
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.services.executors import BoundedExecutor, ExecutorSaturated
+
+
+class _Model:
+    """Vector of text "t<n>" is [n, 1]; records every batch it is asked to encode."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True, convert_to_numpy=True):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return np.array([[float(t[1:]), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = _Model()
+
+    async def load():
+        return model
+
+    monkeypatch.setattr(batcher_module.model_registry, "load_embedding_model", load)
+    return model
+
+
+@pytest.fixture
+def pool():
+    pool = BoundedExecutor("test-embed", "thread", max_workers=1, max_queue=4)
+    yield pool
+    pool.shutdown()
+
+
+def _texts(start: int, n: int):
+    return [f"t{i}" for i in range(start, start + n)]
+
+
+def _expected(texts):
+    return np.array([[float(t[1:]), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_concurrent_requests_share_a_batch(model, pool):
+    batcher = EmbeddingBatcher("test", pool, max_batch=64, max_wait_ms=50, max_pending=100)
+    requests = [_texts(10 * i, i + 1) for i in range(5)]
+
+    async def run():
+        try:
+            return await asyncio.gather(*(batcher.encode(t) for t in requests))
+        finally:
+            await batcher.close()
+
+    results = asyncio.run(run())
+    for texts, vecs in zip(requests, results):
+        np.testing.assert_array_equal(vecs, _expected(texts))
+    assert len(model.batches) == 1 and len(model.batches[0]) == 15
+    stats = batcher.stats()
+    assert (stats["requests"], stats["batches"], stats["texts"], stats["max_batch"]) == (5, 1, 15, 15)
+
+
+def test_large_request_is_split_and_reassembled(model, pool):
+    batcher = EmbeddingBatcher("test", pool, max_batch=4, max_wait_ms=0, max_pending=100)
+    document, query = _texts(0, 10), _texts(100, 1)
+
+    async def run():
+        try:
+            return await asyncio.gather(batcher.encode(document), batcher.encode(query))
+        finally:
+            await batcher.close()
+
+    doc_vecs, query_vecs = asyncio.run(run())
+    np.testing.assert_array_equal(doc_vecs, _expected(document))
+    np.testing.assert_array_equal(query_vecs, _expected(query))
+    assert all(len(b) <= 4 for b in model.batches)
+    assert sorted(t for b in model.batches for t in b) == sorted(document + query)
+    assert asyncio.run(batcher.encode([])).shape == (0, 0)
+
+
+def test_backpressure_and_model_errors(monkeypatch, pool):
+    model = _Model(fail=True)
+
+    async def load():
+        return model
+
+    monkeypatch.setattr(batcher_module.model_registry, "load_embedding_model", load)
+    batcher = EmbeddingBatcher("test", pool, max_batch=8, max_wait_ms=200, max_pending=1)
+
+    async def run():
+        first = asyncio.ensure_future(batcher.encode(["t1"]))
+        await asyncio.sleep(0)  # queued, still waiting for companions
+        with pytest.raises(ExecutorSaturated):
+            await batcher.encode(["t2"])
+        try:
+            with pytest.raises(RuntimeError, match="model failed"):
+                await first
+        finally:
+            await batcher.close()
+
+    asyncio.run(run())
+    assert batcher.stats()["rejected"] == 1
+    assert model.batches == [["t1"]]
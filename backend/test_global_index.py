@@ -0,0 +1,90 @@
+"""
+Global index: add/replace/remove contracts and owner-scoped search on flat and HNSW indexes
+Run: python -m pytest test_global_index.py
+"""
+import numpy as np
+import pytest
+
+from src.services.global_index import GlobalIndex
+
+DIM = 16
+
+
+def _vecs(n: int, seed: int) -> np.ndarray:
+    v = np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _exact(vecs: dict, query: np.ndarray, top_k: int):
+    scored = [(cid, pos, float(v @ query)) for cid, rows in vecs.items() for pos, v in enumerate(rows)]
+    return sorted(scored, key=lambda r: -r[2])[:top_k]
+
+
+@pytest.fixture(params=["flat", "hnsw"])
+def populated(request):
+    # threshold 1 switches to HNSW on the first add
+    index = GlobalIndex(hnsw_threshold=10**9 if request.param == "flat" else 1, hnsw_m=16, ef_search=64)
+    owners = {"c1": "alice", "c2": "alice", "c3": "bob"}
+    vecs = {cid: _vecs(20, seed) for seed, cid in enumerate(owners)}
+    for cid, owner in owners.items():
+        index.add_contract(cid, owner, vecs[cid])
+    assert index.stats()["type"] == request.param
+    return index, owners, vecs
+
+
+def test_search_matches_brute_force(populated):
+    index, _, vecs = populated
+    q = _vecs(1, 99)[0]
+    hits = index.search(q, top_k=5)
+    assert [(c, p) for c, p, _ in hits] == [(c, p) for c, p, _ in _exact(vecs, q, 5)]
+
+
+def test_owner_scope(populated):
+    index, owners, vecs = populated
+    q = _vecs(1, 7)[0]
+    alice = {c: v for c, v in vecs.items() if owners[c] == "alice"}
+    hits = index.search(q, top_k=5, owner_id="alice")
+    assert [(c, p) for c, p, _ in hits] == [(c, p) for c, p, _ in _exact(alice, q, 5)]
+    assert all(c == "c3" for c, _, _ in index.search(q, top_k=100, owner_id="bob"))
+    assert len(index.search(q, top_k=100, owner_id="bob")) == 20
+    assert index.search(q, top_k=5, owner_id="mallory") == []
+
+
+def test_remove_and_replace(populated):
+    index, _, vecs = populated
+    assert index.remove_contract("c1") is True
+    assert index.remove_contract("c1") is False
+    assert "c1" not in index
+    # the contract's own vectors no longer come back, scoped or not
+    for pos in range(3):
+        assert all(c != "c1" for c, _, _ in index.search(vecs["c1"][pos], top_k=40))
+        assert all(c == "c2" for c, _, _ in index.search(vecs["c1"][pos], top_k=40, owner_id="alice"))
+
+    # re-adding replaces the previous rows instead of duplicating them
+    new = _vecs(4, 42)
+    index.add_contract("c2", "alice", new)
+    hits = index.search(new[2], top_k=100, owner_id="alice")
+    assert len(hits) == 4
+    assert hits[0][:2] == ("c2", 2)
+    assert index.stats()["contracts"] == 2
+    assert index.nlive == 24
+
+
+def test_dim_mismatch_and_empty_add():
+    index = GlobalIndex()
+    index.add_contract("empty", "alice", np.empty((0, DIM), dtype=np.float32))
+    assert "empty" not in index and index.search(_vecs(1, 0)[0]) == []
+    index.add_contract("c1", "alice", _vecs(2, 0))
+    with pytest.raises(ValueError):
+        index.add_contract("c2", "alice", np.ones((1, DIM + 1), dtype=np.float32))
+
+
+def test_tombstoned_rows_are_skipped_before_compaction(populated):
+    index, _, _ = populated
+    tiny = _vecs(2, 5)
+    index.add_contract("c4", "bob", tiny)
+    index.remove_contract("c4")
+    # below COMPACT_RATIO, so the rows are only marked dead
+    assert index.ntotal == 62 and index.nlive == 60
+    assert all(c != "c4" for c, _, _ in index.search(tiny[0], top_k=10))
+    assert all(c != "c4" for c, _, _ in index.search(tiny[0], top_k=10, owner_id="bob"))
@@ -0,0 +1,139 @@
+"""
+Analysis persistence: mapping the analysis JSON onto the derived tables, and re-runs
+replacing only analysis rows
+Run: python -m pytest test_persistence.py
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config.database import Base
+from src.models.clause import Clause, RiskLevel
+from src.models.contract import (
+    Contract, ContractParty, DateType, FileType, FinancialTerm, KeyDate, PartyRole, PartyType, TermType,
+)
+from src.models.risk import Risk, RiskSeverity, RiskSource, RiskType
+from src.models.user import User  # noqa: F401  (contracts.uploaded_by -> users)
+from src.services import search_index as search_module
+from src.services.persistence import analysis_rows, persist_analysis
+
+ANALYSIS = {
+    "extracted": {
+        "parties": [
+            {"name": "Acme LLC", "role": "Supplier"},
+            {"name": "acme llc", "role": "duplicate"},
+            {"name": "Jane Doe", "type": "Individual", "role": "Client"},
+            "Gulf Partners",
+        ],
+        "dates": {
+            "effective_date": "2024-01-15",
+            "expiration_date": {"iso": "2025-01-14T00:00:00Z", "raw": "14 January 2025"},
+            "signing": "sometime next year",
+        },
+        "financial_terms": {
+            "currency": "QAR",
+            "total_value": 120000,
+            "late_payment_penalty": {"amount": "$500", "schedule": "per day"},
+            "security_deposit": "QAR 5,000",
+            "payment_terms": "Net 30",
+        },
+        "governing_law": {"law": "Qatar", "jurisdiction": "Doha courts"},
+        "contract_type": "Supply",
+    },
+    "risks": {
+        "risks": [{"title": "Uncapped liability", "severity": "HIGH", "evidence_chunks": [3, 4]}],
+        "non_standard": [{"title": "Unilateral termination", "severity": "critical", "snippet": "may terminate at will"}],
+        "missing_clauses": ["Force majeure", {"clause": "Confidentiality", "why": "no NDA terms"}],
+    },
+    "summary": {"summary": "Supply of goods", "purpose": "Procurement"},
+}
+
+
+def _by(rows, key):
+    return {r[key]: r for r in rows}
+
+
+def test_analysis_rows_mapping():
+    rows = analysis_rows("c1", ANALYSIS)
+
+    parties = _by(rows[ContractParty], "name")
+    assert list(parties) == ["Acme LLC", "Jane Doe", "Gulf Partners"]
+    assert parties["Acme LLC"]["role"] == PartyRole.vendor
+    assert parties["Jane Doe"]["role"] == PartyRole.client
+    assert parties["Jane Doe"]["type"] == PartyType.individual
+    assert parties["Gulf Partners"]["role"] == PartyRole.other
+
+    dates = _by(rows[KeyDate], "date_type")
+    assert set(dates) == {DateType.effective_date, DateType.expiration_date}
+    assert dates[DateType.effective_date]["date"] == datetime(2024, 1, 15)
+    assert dates[DateType.expiration_date]["date"] == datetime(2025, 1, 14)
+    assert dates[DateType.expiration_date]["description"] == "14 January 2025"
+
+    terms = _by(rows[FinancialTerm], "term_type")
+    assert set(terms) == {TermType.payment, TermType.penalty, TermType.deposit}  # "Net 30" is not an amount
+    assert (terms[TermType.payment]["amount"], terms[TermType.payment]["currency"]) == (120000.0, "QAR")
+    assert (terms[TermType.penalty]["amount"], terms[TermType.penalty]["currency"]) == (500.0, "USD")
+    assert terms[TermType.penalty]["schedule"] == "per day"
+    assert (terms[TermType.deposit]["amount"], terms[TermType.deposit]["currency"]) == (5000.0, "QAR")
+
+    risks = _by(rows[Risk], "title")
+    assert risks["Uncapped liability"]["risk_type"] == RiskType.compliance
+    assert risks["Uncapped liability"]["severity"] == RiskSeverity.high
+    assert risks["Uncapped liability"]["clause_reference"] == "3,4"
+    assert risks["Unilateral termination"]["risk_type"] == RiskType.non_standard
+    assert risks["Missing clause: Force majeure"]["severity"] == RiskSeverity.medium
+    assert risks["Missing clause: Confidentiality"]["description"] == "no NDA terms"
+    assert {r["source"] for r in rows[Risk]} == {RiskSource.analysis}
+
+    [clause] = rows[Clause]
+    assert clause["content"] == "may terminate at will"
+    assert clause["risk_level"] == RiskLevel.high and clause["is_standard"] is False
+
+
+def test_analysis_rows_tolerates_loose_shapes():
+    rows = analysis_rows("c1", {"extracted": {"parties": "Acme", "dates": "soon", "financial_terms": None}, "risks": []})
+    assert [p["name"] for p in rows[ContractParty]] == ["Acme"]
+    assert rows[KeyDate] == rows[FinancialTerm] == rows[Risk] == rows[Clause] == []
+    assert all(v == [] for v in analysis_rows("c1", {}).values())
+
+
+def test_persist_analysis_replaces_only_analysis_rows(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(search_module._SQLITE_SCHEMA))
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with Session() as db:
+                db.add(Contract(id="c1", title="Supply", file_name="c1.pdf", file_path="/tmp/c1.pdf",
+                                file_type=FileType.pdf, uploaded_by="u1"))
+                db.add(Risk(contract_id="c1", risk_type=RiskType.inconsistency, severity=RiskSeverity.low,
+                            title="Reviewer note", description="added by hand"))
+                await db.commit()
+
+            for _ in range(2):  # re-running leaves the same rows
+                async with Session() as db:
+                    async with db.begin():
+                        counts = await persist_analysis(db, "c1", ANALYSIS, body="يلتزم المورد بالتسليم")
+
+            async with Session() as db:
+                risks = (await db.execute(select(Risk.title, Risk.source))).all()
+                parties = (await db.execute(select(func.count(ContractParty.id)))).scalar()
+                contract = await db.get(Contract, "c1")
+                fts = (await db.execute(text("SELECT parties, body FROM contract_fts"))).all()
+            return counts, risks, parties, contract, fts
+        finally:
+            await engine.dispose()
+
+    counts, risks, parties, contract, fts = asyncio.run(run())
+    assert counts == {"contract_parties": 3, "key_dates": 2, "financial_terms": 3, "risks": 4, "clauses": 1}
+    assert parties == 3
+    assert sorted(t for t, s in risks if s == RiskSource.analysis) == sorted(t["title"] for t in analysis_rows("c1", ANALYSIS)[Risk])
+    assert [t for t, s in risks if s == RiskSource.user] == ["Reviewer note"]
+    assert (contract.summary, contract.governing_law, contract.jurisdiction, contract.contract_type) == (
+        "Supply of goods", "Qatar", "Doha courts", "Supply")
+    assert fts == [("Acme LLC ; Jane Doe ; Gulf Partners", "يلتزم المورد بالتسليم")]
+
@@ -0,0 +1,107 @@
+"""
+Principal cache: get_current_user without a User row read per request, and token
+revocation through the per-user version floor
+Run: python -m pytest test_principal_cache.py
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.routes import auth
+from src.models.user import User, UserRole
+from src.services.principal_cache import Principal, PrincipalCache
+
+
+class _DB:
+    """Stands in for the session: counts User loads."""
+
+    def __init__(self, *users: User):
+        self.users = {u.id: u for u in users}
+        self.loads = 0
+
+    async def get(self, model, key):
+        self.loads += 1
+        return self.users.get(key)
+
+
+def _user(version: int = 0, role: UserRole = UserRole.legal_officer) -> User:
+    return User(id="u1", email="a@example.com", name="A", hashed_password="x", role=role, token_version=version)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=100)
+    monkeypatch.setattr(auth, "principal_cache", cache)
+    monkeypatch.setattr(auth.settings, "auth_signed_claims", False)
+    return cache
+
+
+def _current(token: str, db: _DB) -> Principal:
+    return asyncio.run(auth.get_current_user(token=token, db=db))
+
+
+def test_claims_roundtrip():
+    p = Principal(id="u1", email="a@example.com", role=UserRole.admin, token_version=3)
+    assert Principal.from_claims(p.claims()) == p
+    assert Principal.from_claims({"sub": "u1", "ver": 0}) is None  # token from before signed claims
+    assert Principal.from_claims({**p.claims(), "role": "root"}) is None
+
+
+def test_user_row_loaded_once_per_token_version(cache):
+    db = _DB(_user())
+    token = auth.create_user_token(_user())
+    first = _current(token, db)
+    assert _current(token, db) == first == Principal("u1", "a@example.com", UserRole.legal_officer, 0)
+    assert db.loads == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_revoked_and_stale_tokens_refused(cache):
+    old = auth.create_user_token(_user(0))
+    db = _DB(_user(1))
+    # the DB already moved on: the cached path never sees a principal for version 0
+    with pytest.raises(HTTPException):
+        _current(old, db)
+
+    new = auth.create_user_token(_user(1))
+    assert _current(new, db).token_version == 1
+    cache.invalidate("u1", token_version=2)  # logout elsewhere
+    loads = db.loads
+    with pytest.raises(HTTPException):
+        _current(new, db)
+    assert db.loads == loads  # refused without a DB lookup
+    assert cache.stats()["revoked"] == 1
+
+
+def test_invalidate_drops_cached_role(cache):
+    db = _DB(_user())
+    token = auth.create_user_token(_user())
+    _current(token, db)
+    db.users["u1"] = _user(role=UserRole.admin)
+    assert _current(token, db).role == UserRole.legal_officer  # still cached
+    cache.invalidate("u1")
+    assert _current(token, db).role == UserRole.admin
+
+
+def test_signed_claims_mode_skips_db(cache, monkeypatch):
+    monkeypatch.setattr(auth.settings, "auth_signed_claims", True)
+    db = _DB()
+    principal = _current(auth.create_user_token(_user(role=UserRole.admin)), db)
+    assert principal.role == UserRole.admin and db.loads == 0
+    # tokens without email/role fall back to the lookup
+    legacy = auth.create_access_token({"sub": "u1", "ver": 0})
+    with pytest.raises(HTTPException):
+        _current(legacy, db)
+    assert db.loads == 1
+
+
+def test_ttl_and_bound(monkeypatch):
+    cache = PrincipalCache(ttl_seconds=5, max_entries=2)
+    for i in range(3):
+        cache.set(Principal(f"u{i}", "e", UserRole.legal_officer))
+    assert cache.get("u0", 0) is None and cache.get("u2", 0) is not None
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("u2", 0) is None
@@ -0,0 +1,117 @@
+"""
+Contract search index: Arabic folding, query building, FTS5 search with escaped snippets,
+and reciprocal rank fusion with vector hits
+Run: python -m pytest test_search_index.py
+"""
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config.database import Base
+from src.models.clause import Clause  # noqa: F401  (Contract's relationships and foreign keys)
+from src.models.contract import Contract, ContractParty, FileType, PartyRole, PartyType
+from src.models.risk import Risk  # noqa: F401
+from src.models.user import User  # noqa: F401
+from src.services.search_index import (
+    RRF_K, _HL_START, _HL_STOP, _SQLITE_SCHEMA, SearchIndex, normalize, query_terms, snippet_html,
+)
+
+
+def test_normalize_folds_arabic_variants():
+    assert normalize("مسؤولية") == normalize("مسئولية")
+    assert normalize("الإنهاء") == normalize("الانهاء") == normalize("الآنهاء")
+    assert normalize("الشَّرِكَة") == normalize("الشركه")
+    assert normalize("عـــقد") == "عقد"
+    assert normalize(None) == ""
+    # highlight delimiters can't be smuggled in through indexed text
+    assert normalize(f"a{_HL_START}b{_HL_STOP}") == "ab"
+
+
+def test_query_terms_and_match_expr():
+    assert query_terms('Liability "OR" cap*') == ["liability", "or", "cap"]
+    sqlite, pg = SearchIndex("sqlite"), SearchIndex("postgresql")
+    assert sqlite._match_expr("Late fee") == '"late"* "fee"*'
+    assert pg._match_expr("Late fee") == "late:* & fee:*"
+    assert sqlite._match_expr("  -- () ") is None and pg._match_expr("") is None
+
+
+def test_snippet_html_escapes_text_but_keeps_marks():
+    raw = f"<script>x</script> {_HL_START}fee{_HL_STOP} & more"
+    assert snippet_html(raw) == "&lt;script&gt;x&lt;/script&gt; <mark>fee</mark> &amp; more"
+    assert snippet_html(None) == ""
+
+
+async def _seeded(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(_SQLITE_SCHEMA))
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    index = SearchIndex("sqlite")
+    docs = [
+        ("c1", "u1", "Supply agreement", "The supplier pays a late fee of 2% per month."),
+        ("c2", "u1", "عقد توريد", "يتحمل المورد مسؤولية التأخير <b>كاملة</b>"),
+        ("c3", "u1", "Late fee schedule", "Late fee terms."),
+        ("c4", "u2", "Late fee", "Another owner's late fee."),
+    ]
+    async with Session() as db:
+        async with db.begin():
+            for cid, owner, title, _ in docs:
+                db.add(Contract(id=cid, title=title, file_name=f"{cid}.pdf", file_path=f"/tmp/{cid}.pdf",
+                                file_type=FileType.pdf, uploaded_by=owner))
+            db.add(ContractParty(contract_id="c1", name="Acme Trading", type=PartyType.organization, role=PartyRole.vendor))
+            await db.flush()
+            for cid, _, _, body in docs:
+                await index.index_contract(db, cid, body=body)
+    return engine, Session, index
+
+
+def test_search_scoped_ranked_and_escaped(tmp_path):
+    async def run():
+        engine, Session, index = await _seeded(tmp_path)
+        try:
+            async with Session() as db:
+                return (
+                    await index.search(db, "u1", "late fee"),
+                    await index.search(db, "u1", "مسئولية"),
+                    await index.search(db, "u1", "acme"),
+                    await index.search(db, "u1", "lat"),
+                )
+        finally:
+            await engine.dispose()
+
+    late, arabic, party, prefix = asyncio.run(run())
+    # owner u2's contract is never returned; the title match outranks the body-only one
+    assert [h["contract_id"] for h in late] == ["c3", "c1"]
+    assert "<mark>" in late[1]["snippet"]
+    # spelling variant matches, and the body's markup comes back escaped
+    assert [h["contract_id"] for h in arabic] == ["c2"]
+    assert "&lt;b&gt;" in arabic[0]["snippet"] and "<b>" not in arabic[0]["snippet"]
+    assert [h["contract_id"] for h in party] == ["c1"]
+    assert {h["contract_id"] for h in prefix} == {"c1", "c3"}
+
+
+def test_hybrid_search_reciprocal_rank_fusion():
+    index = SearchIndex("sqlite")
+
+    async def keyword(db, owner_id, query, limit=20):
+        return [{"contract_id": c, "score": 1.0, "snippet": f"kw {c}"} for c in ("a", "b")]
+
+    index.search = keyword
+    vector_hits = [
+        {"contract_id": "b", "text": "b best chunk"},
+        {"contract_id": "b", "text": "b second chunk"},
+        {"contract_id": "c", "text": "<i>c</i> chunk"},
+    ]
+    fused = asyncio.run(index.hybrid_search(None, "u1", "q", vector_hits, limit=10))
+
+    by_id = {e["contract_id"]: e for e in fused}
+    assert [e["contract_id"] for e in fused] == ["b", "a", "c"]
+    assert by_id["b"]["score"] == 1 / (RRF_K + 2) + 1 / (RRF_K + 1)
+    assert (by_id["b"]["keyword_rank"], by_id["b"]["vector_rank"]) == (2, 1)
+    # a contract's later chunks don't take a rank, so c is the second vector hit
+    assert (by_id["c"]["keyword_rank"], by_id["c"]["vector_rank"]) == (None, 2)
+    assert by_id["c"]["snippet"] == "&lt;i&gt;c&lt;/i&gt; chunk"
+    assert by_id["b"]["snippet"] == "kw b"
+    assert len(asyncio.run(index.hybrid_search(None, "u1", "q", vector_hits, limit=1))) == 1
@@ -0,0 +1,52 @@
+"""
+User cache: per-user TTL entries, invalidation, and versioned sets that drop results
+computed before a concurrent write
+Run: python -m pytest test_user_cache.py
+"""
+import time
+
+from src.services.user_cache import UserCache
+
+
+def test_get_set_and_invalidate_per_user():
+    cache = UserCache(ttl_seconds=60, max_users=10)
+    assert cache.get("u1", "total") is None
+    cache.set("u1", "total", 7)
+    cache.set("u2", "total", 3)
+    assert cache.get("u1", "total") == 7
+
+    cache.invalidate("u1")
+    assert cache.get("u1", "total") is None
+    assert cache.get("u2", "total") == 3
+    cache.invalidate(None)  # contracts without an owner are a no-op
+    assert cache.stats() == {"users": 1, "hits": 2, "misses": 2, "hit_rate": 0.5, "invalidations": 1}
+
+
+def test_stale_version_is_not_stored():
+    cache = UserCache(ttl_seconds=60, max_users=10)
+    version = cache.version("u1")
+    # a write lands while the read is still computing its result
+    cache.invalidate("u1")
+    cache.set("u1", "total", 7, version=version)
+    assert cache.get("u1", "total") is None
+
+    cache.set("u1", "total", 8, version=cache.version("u1"))
+    assert cache.get("u1", "total") == 8
+
+
+def test_ttl_and_lru_bound(monkeypatch):
+    cache = UserCache(ttl_seconds=5, max_users=2)
+    cache.set("u1", "k", 1)
+    cache.set("u2", "k", 2)
+    cache.get("u1", "k")        # u2 is now least recently used
+    cache.set("u3", "k", 3)
+    assert cache.get("u2", "k") is None
+    assert cache.get("u1", "k") == 1 and cache.get("u3", "k") == 3
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("u1", "k") is None
+
+    disabled = UserCache(ttl_seconds=0, max_users=2)
+    disabled.set("u1", "k", 1)
+    assert disabled.get("u1", "k") is None
@@ -0,0 +1,86 @@
+"""
+Vector store: atomic save/load of per-contract indexes and change stamps for other workers
+Run: python -m pytest test_vector_store.py
+"""
+import os
+
+import faiss
+import numpy as np
+
+from src.services.vector_store import VectorStore
+
+
+def _index(n: int, dim: int = 8) -> faiss.Index:
+    vecs = np.random.default_rng(n).standard_normal((n, dim)).astype(np.float32)
+    faiss.normalize_L2(vecs)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vecs)
+    return index
+
+
+def _chunks(n: int):
+    return [{"text": f"chunk {i}", "start": i * 10, "end": i * 10 + 9} for i in range(n)]
+
+
+def test_save_load_roundtrip(tmp_path):
+    store = VectorStore(str(tmp_path))
+    index = _index(3)
+    store.save("c1", index, _chunks(3), {"language": "en", "dim": 8})
+
+    loaded = store.load("c1")
+    assert loaded["chunks"] == _chunks(3)
+    assert loaded["language"] == "en" and loaded["dim"] == 8
+    assert loaded["index"].ntotal == 3
+    np.testing.assert_allclose(loaded["index"].reconstruct_n(0, 3), index.reconstruct_n(0, 3))
+
+
+def test_missing_or_inconsistent_contract_is_none(tmp_path):
+    store = VectorStore(str(tmp_path))
+    assert store.load("nope") is None
+    # chunk metadata that doesn't match the index rows is treated as corrupt
+    store.save("c1", _index(3), _chunks(2))
+    assert store.load("c1") is None
+
+
+def test_overwrite_delete_and_listing(tmp_path):
+    store = VectorStore(str(tmp_path))
+    store.save("c1", _index(2), _chunks(2))
+    store.save("c2", _index(1), _chunks(1))
+    store.save("c1", _index(4), _chunks(4))
+    # leftovers of an interrupted save are not contracts
+    os.makedirs(tmp_path / ".c3.tmp-dead")
+
+    assert sorted(store.list_contract_ids()) == ["c1", "c2"]
+    assert store.load("c1")["index"].ntotal == 4
+    assert [n for n in os.listdir(tmp_path) if n.startswith(".c1")] == []
+
+    assert store.delete("c1") is True
+    assert store.delete("c1") is False
+    assert not store.exists("c1")
+    assert store.list_contract_ids() == ["c2"]
+
+
+def test_generation_and_version_change_on_writes(tmp_path):
+    store = VectorStore(str(tmp_path))
+    assert store.generation() is None
+    assert store.version("c1") is None
+
+    store.save("c1", _index(2), _chunks(2))
+    gen, ver = store.generation(), store.version("c1")
+    assert gen is not None and ver is not None
+
+    store.save("c2", _index(1), _chunks(1))
+    assert store.generation() != gen
+    assert store.version("c1") == ver
+
+    gen = store.generation()
+    store.save("c1", _index(2), _chunks(2))
+    assert store.generation() != gen
+    assert store.version("c1") != ver
+
+    gen = store.generation()
+    store.delete("c1")
+    assert store.generation() != gen
+    assert store.version("c1") is None
+    # another process sharing the directory sees the same stamps
+    assert VectorStore(str(tmp_path)).generation() == store.generation()
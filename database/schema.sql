@@ -39,6 +39,8 @@ CREATE TABLE IF NOT EXISTS contracts (
 CREATE INDEX idx_contracts_status ON contracts(status);
 CREATE INDEX idx_contracts_industry ON contracts(industry);
 CREATE INDEX idx_contracts_governing_law ON contracts(governing_law);
+CREATE INDEX idx_contracts_owner_upload ON contracts(uploaded_by, upload_date, id);
+CREATE INDEX idx_contracts_owner_status ON contracts(uploaded_by, status);
 
 -- Contract Parties table
 CREATE TABLE IF NOT EXISTS contract_parties (
@@ -64,6 +66,7 @@ CREATE TABLE IF NOT EXISTS key_dates (
 
 CREATE INDEX idx_key_dates_contract_id ON key_dates(contract_id);
 CREATE INDEX idx_key_dates_date ON key_dates(date);
+CREATE INDEX idx_key_dates_type_date ON key_dates(date_type, date, contract_id);
 
 -- Financial Terms table
 CREATE TABLE IF NOT EXISTS financial_terms (
@@ -89,11 +92,13 @@ CREATE TABLE IF NOT EXISTS risks (
     description TEXT NOT NULL,
     recommendation TEXT,
     clause_reference TEXT,
+    source TEXT NOT NULL DEFAULT 'user' CHECK(source IN ('analysis', 'user')),
     FOREIGN KEY (contract_id) REFERENCES contracts(id) ON DELETE CASCADE
 );
 
 CREATE INDEX idx_risks_contract_id ON risks(contract_id);
 CREATE INDEX idx_risks_severity ON risks(severity);
+CREATE INDEX idx_risks_severity_contract ON risks(severity, contract_id);
 
 -- Clauses table
 CREATE TABLE IF NOT EXISTS clauses (
@@ -124,3 +129,5 @@ CREATE TABLE IF NOT EXISTS chat_history (
 CREATE INDEX idx_chat_history_contract_id ON chat_history(contract_id);
 CREATE INDEX idx_chat_history_user_id ON chat_history(user_id);
 CREATE INDEX idx_chat_history_timestamp ON chat_history(timestamp);
+CREATE INDEX idx_chat_history_user_ts ON chat_history(user_id, timestamp);
+CREATE INDEX idx_chat_history_user_contract_ts ON chat_history(user_id, contract_id, timestamp);